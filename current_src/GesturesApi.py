@@ -2,141 +2,222 @@ import cv2
 import numpy as np
 import time
 import os
-import defaultGesturesLoader
-from gesture import Gesture
-import random
-
-
-class GestureProcessor(object):
-    def __init__(self, gestureFile="gestureData.txt"):
-        self.cap = cv2.VideoCapture(0)
-        self.cameraWidth = 1280
-        self.cameraHeight = 720
-        self.cap.set(cv2.cv.CV_CAP_PROP_FRAME_WIDTH, self.cameraWidth)
-        self.cap.set(cv2.cv.CV_CAP_PROP_FRAME_HEIGHT, self.cameraHeight)
-        self.stationary = False
-        self.record = False
-        self.endGesture = False
-        self.gesturePoints = []
-        self.gestureFile = gestureFile
-        self.gestureHeader = "Gesture Name: "
-        self.gestureEnd = "END GESTURE"
-        self.saveNextGesture = False
-        self.lastAction = ""
-        self.handMomentPositions = []
-        self.handCenterPositions = []
-        self.initGestures()
-
-# --------------------------------- Gesture IO --------------------------------
-# Functions associated with loading and saving the gestures, either from the
-# default gestures or the file provided.
-
-    def initGestures(self):
-        if os.path.isfile(self.gestureFile):
-            self.loadGesturesFromFile()
+import defaultPosesLoader
+from gestureLibrary import GestureLibrary
+import processorSnapshot
+from bufferPool import BufferPool
+from overlayRenderer import OverlayRenderer
+from motionGate import MotionGate
+from handTracker import HandTracker
+from contourEngine import ContourEngine
+from handShape import HandShapeAnalyzer
+from poseClassifier import PoseClassifier
+from multiHand import MultiHandTracker
+from frameBus import FrameBus
+from frameTracer import traced, traceCall
+from frameResult import FrameResult
+from gestureCore import GestureCore
+
+
+class GestureProcessor(GestureCore):
+    # The camera half of the pipeline, turning frames into the hand positions
+    # GestureCore (gestureCore.py) segments and classifies. capture can be
+    # anything with the cv2.VideoCapture read/release interface (see
+    # replayCapture.py); by default the first camera is opened. config is a
+    # pipelineConfig.PipelineConfig, the "balanced" preset by default. If
+    # the snapshot file exists, the processor resumes from it (see restore)
+    # instead of loading the gesture file.
+    def __init__(self, gestureFile="gestureData.txt", capture=None,
+                 config=None, snapshot=None):
+        self.ownsCamera = capture is None
+        if capture is None:
+            self.cap = cv2.VideoCapture(0)
         else:
-            self.loadDefaultGestures()
-
-    def loadGesturesFromFile(self):
-        self.gestures = []
-        self.gestureNames = []
-        read = ""
-        with open(self.gestureFile, 'r') as fin:
-            read = fin.read()
-            fin.close()
-        data = read.split('\n')
-        # Basic check, should replace later with bytestream instead
-        if len(data) < len(self.gestureHeader):
-            self.loadDefaultGestures()
+            self.cap = capture
+        # Per-stage image buffers, reused every frame
+        self.buffers = BufferPool()
+        self.renderer = OverlayRenderer()
+        # Skips the image and contour stages while nothing moves; set by
+        # configure from config.motionGate (setting it here directly lasts
+        # until the next configure or restore)
+        self.motionGate = None
+        self.skippedFrame = False
+        # Optional HandTracker (i.e. HandTracker(detectEvery=3)); the full
+        # hand detection then only runs every few frames (config.trackEvery)
+        self.tracker = None
+        # Optional replacement for the greyscale blur + Otsu threshold, with a
+        # segment(image, out, roi=None) method (i.e. skinLut.SkinColorLUT)
+        self.segmenter = None
+        # Follows several hands, each with its own gestures, when
+        # config.maxHands is above 1 (see multiHand.py); the largest hand is
+        # also processed as usual
+        self.multiHand = None
+        self.handIndices = []
+        # Optional frameBus.FrameBus publishing the "original",
+        # "thresholded" and "canvas" images to other threads or processes
+        self.bus = None
+        # What the last process() call returned
+        self.result = None
+        self.contourEngine = ContourEngine()
+        self.handShape = HandShapeAnalyzer()
+        self.poses = PoseClassifier()
+        self.pose = None
+        # Name of the last pose held long enough to fire (lastAction is only
+        # set by gestures)
+        self.lastPose = ""
+        # Counters from the last frame, i.e. contour and point counts
+        self.stats = {}
+        self.clock = time.time
+        # Wall-clock time (self.clock) the last frame was read at. frameTime
+        # is on the capture's clock, which for a ReplayCapture with a frame
+        # rate starts at 0, so latencies are measured from this instead
+        self.readTime = 0.0
+        # Palm center relative to the center of mass, from the last detection
+        self.palmOffset = np.zeros(2)
+        # Trajectory of a restored snapshot, until the next frame
+        self.restoredTrajectory = None
+        warm = snapshot is not None and os.path.isfile(snapshot)
+        GestureCore.__init__(self, gestureFile, config,
+                             GestureLibrary() if warm else None)
+        self.initPoses()
+        if warm:
+            self.restore(snapshot)
+            if config is not None:
+                self.configure(config)
+
+    # Applies a PipelineConfig; can be called at any time to switch presets
+    def configure(self, config):
+        GestureCore.configure(self, config)
+        if self.ownsCamera:
+            self.cap.set(cv2.cv.CV_CAP_PROP_FRAME_WIDTH, self.cameraWidth)
+            self.cap.set(cv2.cv.CV_CAP_PROP_FRAME_HEIGHT, self.cameraHeight)
+        self.contourEngine.epsilonFactor = config.epsilonFactor
+        self.contourEngine.maxPoints = config.maxPoints
+        if not config.motionGate:
+            self.motionGate = None
+        elif self.motionGate is None:
+            self.motionGate = MotionGate()
+        if config.trackEvery is None:
+            self.tracker = None
+        elif self.tracker is None:
+            self.tracker = HandTracker(detectEvery=config.trackEvery)
         else:
-            gestureName = ""
-            gesturePoints = []
-            cutoff = len(self.gestureHeader)
-            for item in data:
-                if item[:cutoff] == self.gestureHeader:
-                    gestureName = item[cutoff:]
-                elif item == self.gestureEnd:
-                    self.gestures.append(Gesture(gesturePoints, gestureName))
-                    self.gestureNames.append(gestureName)
-                    gestureName = ""
-                    gesturePoints = []
-                else:
-                    gesturePoints.append(map(float, item.split()))
-
-    # Initiate some default gesures in the event that no gesture file was found
-    def loadDefaultGestures(self):
-        self.gestures = defaultGesturesLoader.defaultGestures
-        self.gestureNames = []
-        for gesture in self.gestures:
-            self.gestureNames.append(gesture.name)
-
-    def bind(self, gestureIndex, fn):
-        if type(gestureIndex) == int:
-            if gestureIndex < len(self.gestures):
-                self.gestures[gestureIndex].action = fn
-                return True
-            else:
-                raise IndexError("Gesture Index Out Of Bounds")
-        elif type(gestureIndex) == str:
-            if gestureIndex in self.gestureNames:
-                self.gestures[self.gestureNames.index(gestureIndex)].action = fn
-                return True
-            else:
-                raise IndexError("Gesture Name Not Found")
+            self.tracker.detectEvery = config.trackEvery
+        if config.maxHands <= 1:
+            self.multiHand = None
+        elif self.multiHand is None:
+            self.multiHand = MultiHandTracker(config.maxHands)
         else:
-            raise TypeError("Unsupported Key Type")
+            self.multiHand.maxHands = config.maxHands
 
-    def getGestureNames(self):
-        return [gesture.name for gesture in self.gestures]
+# --------------------------------- Gesture IO --------------------------------
+# Functions associated with loading the poses and saving and restoring the
+# processor; the gestures themselves are loaded and saved by GestureCore.
+
+    # Static hand poses, recognized by self.poses
+    def initPoses(self):
+        for name, features in defaultPosesLoader.defaultPoses:
+            self.poses.addPose(name, features)
 
-    def saveGestures(self):
-        with open(self.gestureFile, 'w+') as fout:
-            for gesture in self.gestures:
-                fout.write(self.gestureHeader + gesture.name + '\n')
-                for i in xrange(len(gesture.points)):
-                    fout.write(str(gesture.points[i][0]) + ' ' +
-                               str(gesture.points[i][1]) + '\n')
-                fout.write(self.gestureEnd + '\n')
-            fout.close()
+    # Gestures as GestureCore.bind, and poses by name
+    def bind(self, gestureIndex, fn):
+        if (type(gestureIndex) == str and
+                gestureIndex not in self.gestures.nameIndex and
+                gestureIndex in self.poses.nameIndex):
+            self.poses.bind(gestureIndex, fn)
+            return True
+        return GestureCore.bind(self, gestureIndex, fn)
+
+    # Saves what a restarted processor needs to pick up where this one is:
+    # the packed gestures, poses, configuration, calibration, tracker and
+    # recent trajectory (see processorSnapshot.py)
+    @traced
+    def snapshot(self, path):
+        processorSnapshot.saveProcessor(self, path)
+
+    # Resumes from a snapshot. Actions are not saved: returns the names of
+    # the gestures and poses that were bound then and need binding again.
+    def restore(self, path):
+        return processorSnapshot.restoreProcessor(self, path)
 
 # ------------------------------ Image Processing ------------------------------
 # Functions associated with reading the image from the camera, modifying it
 # to make processing easier, and ultimately extracting the contour.
+# Every stage writes into a buffer from self.buffers rather than allocating,
+# so the images are overwritten by the next frame; copy them to keep them.
 
+    @traced
     def readCamera(self):
-        _, self.original = self.cap.read()
-        self.original = cv2.flip(self.original, 1)
-
+        frame = self.buffers.get("capture", (self.cameraHeight,
+                                             self.cameraWidth, 3))
+        _, captured = self.cap.read(frame)
+        self.readTime = self.clock()
+        if captured is not frame:
+            # Camera ignored the requested size, reuse its array from now on
+            self.buffers.adopt("capture", captured)
+            self.cameraHeight, self.cameraWidth = captured.shape[:2]
+        if self.bus is None:
+            self.original = self.buffers.like("original", captured)
+        else:
+            # Flipped straight into the bus' shared memory
+            self.original = self.bus.claim("original", captured.shape)
+        cv2.flip(captured, 1, dst=self.original)
+        self.frameTime = self.captureTime()
+        if self.bus is not None:
+            self.bus.commit("original", self.frameTime)
+
+    # When the current frame was captured, in seconds: from the capture if it
+    # keeps timestamps (see ReplayCapture), otherwise when it was read
+    def captureTime(self):
+        if hasattr(self.cap, "timestamp"):
+            return self.cap.timestamp()
+        return self.readTime
+
+    @traced
     def threshold(self):
-        grey = cv2.cvtColor(self.original, cv2.COLOR_BGR2GRAY)
-        value = (31, 31)
-        blurred = cv2.GaussianBlur(grey, value, 0)
-        _, self.thresholded = cv2.threshold(blurred, 0, 255,
-                                            cv2.THRESH_BINARY+cv2.THRESH_OTSU)
-
+        if self.segmenter is not None:
+            self.thresholded = self.buffers.get("thresholded",
+                                                self.original.shape[:2])
+            self.segmenter.segment(self.original, self.thresholded)
+            return
+        grey = self.buffers.get("grey", self.original.shape[:2])
+        cv2.cvtColor(self.original, cv2.COLOR_BGR2GRAY, dst=grey)
+        value = (self.config.blurSize, self.config.blurSize)
+        blurred = self.buffers.like("blurred", grey)
+        cv2.GaussianBlur(grey, value, 0, dst=blurred)
+        self.thresholded = self.buffers.like("thresholded", grey)
+        self.thresholdValue, _ = cv2.threshold(blurred, 0, 255,
+                                    cv2.THRESH_BINARY+cv2.THRESH_OTSU,
+                                    dst=self.thresholded)
+
+    @traced
     def extractContours(self):
-        self.contours, _ = cv2.findContours(self.thresholded.copy(),
-                                            cv2.RETR_TREE,
-                                            cv2.CHAIN_APPROX_SIMPLE)
+        # findContours modifies its input, so work on a scratch copy
+        scratch = self.buffers.like("contourScratch", self.thresholded)
+        np.copyto(scratch, self.thresholded)
+        self.contours = self.contourEngine.extract(scratch)
 
     # Currently just finds the largest contour,
     # Should be able to replace this with a "matching" algorithm from here:
     # http://docs.opencv.org/trunk/doc/py_tutorials/py_imgproc/py_contours/
     #py_contours_more_functions/py_contours_more_functions.html
+    @traced
     def extractHandContour(self):
-        maxArea, index = 0, 0
-        for i in xrange(len(self.contours)):
-            area = cv2.contourArea(self.contours[i])
-            if area > maxArea:
-                maxArea = area
-                index = i
+        # The other hands' contours come out of the same pass
+        hands = 1 if self.multiHand is None else self.multiHand.maxHands
+        self.handIndices = self.contourEngine.largestK(self.contours, hands)
+        if len(self.handIndices) > 0:
+            index = self.handIndices[0]
+        else:  # nothing above the minimum area: still the largest one
+            index = max(xrange(len(self.contours)),
+                        key=lambda i: cv2.contourArea(self.contours[i]))
         self.realHandContour = self.contours[index]
-        self.realHandLen = cv2.arcLength(self.realHandContour, True)
         # reduce hand contour to manageable number of points
         # Thanks to http://opencvpython.blogspot.com/2012/06/
         #                                           contours-2-brotherhood.html
-        self.handContour = cv2.approxPolyDP(self.realHandContour,
-                                            0.001 * self.realHandLen, True)
+        self.handContour, self.realHandLen = \
+            self.contourEngine.simplify(self.realHandContour)
+        self.stats.update(self.contourEngine.stats)
 
 # ----------------------------- Contour Processing -----------------------------
 # Functions to process the contour to determine various data, such as
@@ -146,17 +227,18 @@ class GestureProcessor(object):
         self.minX, self.minY, self.handWidth, self.handHeight = \
             cv2.boundingRect(self.handContour)
 
+    @traced
     def findHullAndDefects(self):
         self.hullHandContour = cv2.convexHull(self.handContour,
                                                 returnPoints = False)
-        self.hullPoints = [self.handContour[i[0]] for i in self.hullHandContour]
-        self.hullPoints = np.array(self.hullPoints, dtype = np.int32)
+        self.hullPoints = self.handContour[self.hullHandContour[:, 0]]
         self.defects = cv2.convexityDefects(self.handContour,
                                             self.hullHandContour)
 
     # Documentation:
     # http://docs.opencv.org/doc/tutorials/imgproc/shapedescriptors/moments/
     # moments.html
+    @traced
     def findCenterWithMoments(self):
         self.handMoments = cv2.moments(self.handContour)
         self.handXCenterMoment = int(self.handMoments["m10"] /
@@ -169,7 +251,7 @@ class GestureProcessor(object):
     # Credit for this algorithm goes to the paper which can be found at the
     # description in this link: https://www.youtube.com/watch?v=xML2S6bvMwI
     def centerWithReduction(self):
-        scaleFactor = 0.3
+        scaleFactor = self.config.centerScale
         shrunk = np.array(self.handContour * scaleFactor, dtype=np.int32)
         tx, ty, w, h = cv2.boundingRect(shrunk)
         maxPoint = None
@@ -193,148 +275,248 @@ class GestureProcessor(object):
                     maxRadius = rad
         return np.array(maxPoint)
 
+    @traced
     def findCenterCircleAndRadius(self):
         self.palmCenter = self.centerWithReduction()
         self.palmRadius = cv2.pointPolygonTest(self.handContour,
                                                tuple(self.palmCenter), True)
         self.handCenterPositions += [tuple(self.palmCenter)]
 
-    def getDistance(self):
-        self.handDistance = (self.cameraWidth + self.cameraHeight) / \
-            float(self.palmRadius)
-
-    def analyzeHandCenter(self):
-        # makes sure that there is actually sufficient data to trace over
-        if len(self.handCenterPositions) > 10:
-            self.recentPositions = sorted(self.handCenterPositions[-30:])
-            self.x = [pos[0] for pos in self.recentPositions]
-            self.y = [pos[1] for pos in self.recentPositions]
+    # Finger count and fingertips from the convexity defects, see handShape.py
+    @traced
+    def analyzeHandShape(self):
+        self.handShape.analyze(self.handContour, self.hullPoints, self.defects,
+                               self.palmCenter, self.palmRadius)
+        self.fingerCount = self.handShape.fingerCount
+        self.fingertips = self.handShape.fingertips
+        self.valleys = self.handShape.valleys
+
+    # Pose features from the moments, finger count and hull already computed
+    def findPoseFeatures(self):
+        self.poseFeatures = PoseClassifier.features(
+            self.handMoments, self.fingerCount,
+            cv2.contourArea(self.hullPoints))
+
+    # The full detection, from the camera image to the palm center
+    @traced
+    def detectHand(self):
+        self.threshold()
+        self.extractContours()
+        self.extractHandContour()
+        self.setHandDimensions()
+        self.findHullAndDefects()
+        self.findCenterWithMoments()
+        self.findCenterCircleAndRadius()
+        self.analyzeHandShape()
+        self.findPoseFeatures()
+        # Where the palm center is relative to the center of mass
+        self.palmOffset = self.palmCenter - np.array(self.handMoment)
+        if self.tracker is not None:
+            self.tracker.detected(self.palmCenter, (self.minX, self.minY,
+                                                    self.handWidth,
+                                                    self.handHeight),
+                                  self.handMoments["m00"],
+                                  None if self.segmenter is not None
+                                  else self.thresholdValue)
+        if self.multiHand is not None:
+            self.multiHand.update([self.contours[i] for i in self.handIndices],
+                                  self.original.shape, self.frameTime)
+
+    # Hand position in camera pixels from only the stages it needs, for
+    # pointerMode.PointerMode: the center of mass of the hand contour, plus
+    # the palm offset measured by the last full detection (if any)
+    def locateHand(self):
+        self.threshold()
+        self.extractContours()
+        self.extractHandContour()
+        moments = cv2.moments(self.handContour)
+        if moments["m00"] == 0:
+            return np.array(self.handContour[0, 0], dtype=np.float64)
+        return np.array([moments["m10"] / moments["m00"],
+                         moments["m01"] / moments["m00"]]) + self.palmOffset
+
+    # Cheap stand-in for detectHand() between full detections: only the
+    # region the tracker predicts the hand in is segmented (by the segmenter,
+    # or at the threshold the tracker kept from the last detection), and the
+    # center of mass of the mask there, plus the last palm offset, corrects
+    # the tracker. The contour and hull from the last detection move along
+    # with the palm.
+    @traced
+    def trackLocally(self):
+        x0, y0, x1, y1 = self.tracker.predictedRect(self.original.shape)
+        # Nothing to threshold with when the last detection was made by a
+        # segmenter which has since been removed
+        if (x1 - x0 < 2 or y1 - y0 < 2 or
+                (self.segmenter is None and self.tracker.threshold is None)):
+            self.detectHand()
+            return
+        roi = (slice(y0, y1), slice(x0, x1))
+        self.thresholded = self.buffers.get("thresholded",
+                                            self.original.shape[:2])
+        # Only the region is segmented; the rest of the published mask would
+        # otherwise still show the last full detection
+        self.thresholded.fill(0)
+        if self.segmenter is not None:
+            mask = self.segmenter.segment(self.original, self.thresholded, roi)
+        else:
+            grey = self.buffers.like("grey", self.thresholded)
+            blurred = self.buffers.like("blurred", grey)
+            cv2.cvtColor(self.original[roi], cv2.COLOR_BGR2GRAY, dst=grey[roi])
+            # Blurred like threshold() did, so its Otsu level still applies
+            value = (self.config.blurSize, self.config.blurSize)
+            cv2.GaussianBlur(grey[roi], value, 0, dst=blurred[roi])
+            _, mask = cv2.threshold(blurred[roi], self.tracker.threshold, 255,
+                                    cv2.THRESH_BINARY,
+                                    dst=self.thresholded[roi])
+        moments = cv2.moments(mask, True)
+        area = moments["m00"]
+        if area > 0:
+            measured = np.array([x0 + moments["m10"] / area,
+                                 y0 + moments["m01"] / area]) + self.palmOffset
         else:
-            self.recentPositions = []
+            measured = self.tracker.predict()
+        self.tracker.tracked(measured, area, self.palmRadius)
+        shift = (np.round(self.tracker.position).astype(np.int32) -
+                 self.palmCenter).astype(np.int32)
+        self.palmCenter = self.palmCenter + shift
+        self.handMoment = (self.handMoment[0] + shift[0],
+                           self.handMoment[1] + shift[1])
+        self.handContour = self.handContour + shift
+        self.hullPoints = self.hullPoints + shift
+        self.fingertips = self.fingertips + shift
+        self.valleys = self.valleys + shift
+        self.minX, self.minY = self.minX + shift[0], self.minY + shift[1]
+        self.handMomentPositions += [self.handMoment]
+        self.handCenterPositions += [tuple(self.palmCenter)]
+
+    # Used instead of the stages above when the motion gate found the scene
+    # unchanged: the hand is where it was, so only the history moves on
+    @traced
+    def reuseHandState(self):
+        self.handMomentPositions += [self.handMoment]
+        self.handCenterPositions += [tuple(self.palmCenter)]
+        if self.multiHand is not None:
+            self.multiHand.hold(self.frameTime)
+
+    # Continues the trajectory of a restored snapshot as if it had ended one
+    # gesture sample before this frame, whatever clock the capture runs on
+    def resumeTrajectory(self):
+        moments, centers, times = self.restoredTrajectory
+        self.restoredTrajectory = None
+        if len(times) == 0:
+            return
+        shift = (self.frameTime - self.config.gestureSampleMs / 1000.0 -
+                 times[-1])
+        self.handMomentPositions = map(tuple, moments)
+        self.handCenterPositions = map(tuple, centers)
+        self.handPositionTimes = [at + shift for at in times]
 
 # ----------------------------- Gesture Detection -----------------------------
 # Functions associated with determining gestures
 
-    def checkCanDoGestures(self):
-        if len(self.handCenterPositions) > 10:
-            self.canDoGestures = True
-        else:
-            self.canDoGestures = False
-
-    def detemineStationary(self):
-        # Figure out of the past few points have been at roughly same position
-        # If they have and there is suddenly movement,
-        # trigger the start of a gesture search
-        searchLength = 3 # 3 frames should be enough
-        val = -1 * (searchLength + 1)
-        self.prevRecordState = self.record
-        if self.canDoGestures:
-            xPoints = [pt[0] for pt in self.handMomentPositions[val:-1]]
-            yPoints = [pt[1] for pt in self.handMomentPositions[val:-1]]
-            xAvg = np.average(xPoints)
-            yAvg = np.average(yPoints)
-            factor = 0.04
-            for x, y in self.handMomentPositions[-(searchLength + 1):-1]:
-                # if any point is further further from the average:
-                if (x-xAvg)**2 + (y-yAvg)**2 > factor * min(self.cameraWidth,
-                                                            self.cameraHeight):
-                    # If previous not moving, start recording
-                    if self.stationary:
-                        self.record = True
-                    self.stationary = False
-                    self.stationaryTimeStart = time.time()
-                    return
-            # Not previously stationary but stationary now
-            if not self.stationary:
-                self.record = False
-            self.stationary = True
-
-    def classifyGesture(self):
-        minError = 2**31 - 1 # a large value
-        minErrorIndex = -1
-        self.humanGesture = Gesture(self.gesturePoints, "Human Gesture")
-        likelihoodScores = [0] * len(self.gestures)
-        assessments = [{}] * len(self.gestures)
-        for i in xrange(len(self.gestures)):
-            assessments[i] = Gesture.compareGestures(self.gestures[i],
-                                                        self.humanGesture)
-        errorList = [assessments[i][Gesture.totalError] \
-                        for i in xrange(len(assessments))]
-        index = errorList.index(min(errorList))
-        # Basic elimination to figure out if result is valid
-        templateGestureRatio = max((self.gestures[index].distance /\
-                                    self.humanGesture.distance), 
-                                    (self.humanGesture.distance /\
-                                        self.gestures[index].distance))
-        distanceDiffRatio = assessments[index][Gesture.totalDistance] /\
-                                min(self.gestures[index].distance,
-                                    self.humanGesture.distance)
-        if templateGestureRatio < 1.25 and distanceDiffRatio < 2:
-            return index
-
-    def determineIfGesture(self):
-        if self.record:
-            self.gesturePoints += [self.handCenterPositions[-1]]
-        elif self.prevRecordState == True and not self.record:
-            minGesturePoints = 5  # Should last a few frames at least
-            if len(self.gesturePoints) > minGesturePoints:
-                gestureIndex = self.classifyGesture()
-                if gestureIndex != None:
-                    self.gestures[gestureIndex].action()
-                    self.lastAction = self.gestures[gestureIndex].name
-                elif gestureIndex == None and self.saveNextGesture:
-                    self.addRecordedGesture()
-                    self.saveNextGesture = False
-            self.gesturePoints = []
+    # Gestures of every hand followed by self.multiHand, but for the largest
+    # one: that is the processor's own trajectory, and its gestures are
+    # already recognized by updateGestures
+    @traced
+    def determineHandGestures(self):
+        if self.multiHand is not None:
+            for hand in self.multiHand.hands:
+                if hand is self.multiHand.primary:
+                    hand.updated = False
+                else:
+                    hand.segment(self)
+
+    # Static poses fire once they have been held for a few frames
+    @traced
+    def determineIfPose(self):
+        index = self.poses.update(self.poseFeatures)
+        self.pose = None
+        if self.poses.pose is not None:
+            self.pose = self.poses.names[self.poses.pose]
+        if index is not None:
+            traceCall(self.tracer, self.poses.names[index], "action",
+                      self.poses.fire, index)
+            self.lastPose = self.poses.names[index]
 
 # --------------------------------- Main Loop ---------------------------------
 # All of the processing is initiated from this function. Everything is laid
 # out in the proper order and named so that the algorithm is easy to follow.
 
-    # importantly, changed so that it works on a tick instead
+    # importantly, changed so that it works on a tick instead. Returns what
+    # was found in the frame as a frameResult.FrameResult.
     def process(self):
+        if self.tracer is not None:
+            self.tracer.beginFrame()
         self.readCamera()
-        self.threshold()
-        self.extractContours()
-        self.extractHandContour()
-        self.setHandDimensions()
-        self.findHullAndDefects()
-        self.findCenterWithMoments()
-        self.findCenterCircleAndRadius()
-        self.getDistance()
-        self.analyzeHandCenter()
-        self.checkCanDoGestures()
-        self.detemineStationary()
-        self.determineIfGesture()
+        if self.restoredTrajectory is not None:
+            self.resumeTrajectory()
+        self.skippedFrame = (self.motionGate is not None and
+                             not self.motionGate.changed(self.original))
+        if self.skippedFrame:
+            self.reuseHandState()
+        elif (self.tracker is not None and self.multiHand is None and
+              not self.tracker.due()):
+            # Tracking follows a single hand; with several, every frame is a
+            # full detection so that the other hands move too
+            self.trackLocally()
+        else:
+            self.detectHand()
+        self.handPositionTimes += [self.frameTime]
+        self.updateGestures()
+        self.determineHandGestures()
+        self.determineIfPose()
+        if self.bus is not None and not self.skippedFrame:
+            self.bus.publish("thresholded", self.thresholded, self.frameTime)
+        self.result = FrameResult(
+            timestamp=self.frameTime, skipped=self.skippedFrame,
+            palmCenter=self.palmCenter, palmRadius=self.palmRadius,
+            cameraSize=(self.cameraWidth, self.cameraHeight),
+            hullPoints=self.hullPoints, defects=self.defects,
+            fingertips=self.fingertips, fingerCount=self.fingerCount,
+            pose=self.pose, lastAction=self.lastAction,
+            positions=self.handCenterPositions,
+            positionCount=len(self.handCenterPositions),
+            historyLength=self.config.historyLength)
+        if self.tracer is not None:
+            self.tracer.endFrame()
+        return self.result
 
     def close(self):
         self.cap.release()
-        self.saveGestures()
+        if self.bus is not None:
+            self.bus.close()
+        GestureCore.close(self)
         cv2.destroyAllWindows()
 
 # --------------------------- Gestures API Functions --------------------------
 # Various other things necessary to make this a more complete API.
 
-    def saveNext(self):
-        self.saveNextGesture = True
-
-    def addRecordedGesture(self):
-        gestureName = ""
-        while True:
-            gestureName = "".join([chr(random.randint(ord('a'), ord('z'))) \
-                                  for i in xrange(20)])
-            if gestureName not in self.getGestureNames():
-                break
-        newGesture = Gesture(self.gesturePoints, name=gestureName)
-        self.gestures.append(newGesture)
-        print "RECORDED NEW ONE", gestureName
-        self.lastAction = gestureName
-        return gestureName
+    # Adds the current hand shape as a new static pose, which can then be bound
+    def savePose(self, name):
+        self.poses.addPose(name, self.poseFeatures)
 
+    # Palm center of the last frame as a fraction of the camera size
     def getScaledCenter(self):
-        return (self.palmCenter / np.array([self.cameraWidth,
-                                            self.cameraHeight],
-                                            dtype=np.float32)).round(3)
+        return self.result.scaledCenter
+
+    # Values process() used to compute every frame, now read from the last
+    # frame's result (and computed only when read); use gp.result instead
+    def getHandDistance(self):
+        return self.result.distance
+
+    def getRecentPositions(self):
+        return self.result.recentPositions
+
+    def getX(self):
+        return [position[0] for position in self.result.recentPositions]
+
+    def getY(self):
+        return [position[1] for position in self.result.recentPositions]
+
+    handDistance = property(getHandDistance)
+    recentPositions = property(getRecentPositions)
+    x = property(getX)
+    y = property(getY)
 
 # ---------------------------------- Graphics ----------------------------------
 # Functions associated with being able to draw the data in a human friendly
@@ -342,8 +524,9 @@ class GestureProcessor(object):
     
     @staticmethod
     def getRGBAFromBGR(image, width, height):
-        resized = cv2.resize(image, (width, height))
-        return cv2.cvtColor(resized, cv2.COLOR_BGR2RGBA)
+        if image.shape[:2] != (height, width):
+            image = cv2.resize(image, (width, height))
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGBA)
 
     @staticmethod
     def getRGBAFromGray(image, width, height):
@@ -371,50 +554,49 @@ class GestureProcessor(object):
         return cv2.cvtColor(self.drawingCanvas, cv2.COLOR_BGR2RGBA)
 
     def drawCenter(self):
-        cv2.circle(self.drawingCanvas, tuple(self.palmCenter),
-                   10, (255, 0, 0), -2)
-        if len(self.recentPositions) != 0:
-            for i in xrange(len(self.recentPositions)):
-                cv2.circle(self.drawingCanvas, self.recentPositions[i], 5,
-                           (255, 25*i, 25*i), -1)
+        self.renderer.discs(self.palmCenter, (255, 0, 0), 10)
+        recentPositions = self.result.recentPositions
+        if len(recentPositions) != 0:
+            shade = np.minimum(25 * np.arange(len(recentPositions)), 255)
+            colors = np.column_stack((np.full_like(shade, 255), shade, shade))
+            self.renderer.discs(recentPositions, colors, 5)
 
     def drawCircles(self):
-        cv2.circle(self.drawingCanvas, tuple(self.palmCenter),
-                   int(self.palmRadius), (0, 255, 0), 10)
+        self.renderer.circle(self.palmCenter, int(self.palmRadius),
+                             (0, 255, 0), 10)
 
     def drawHandContour(self, bubbles = False):
-        cv2.drawContours(self.drawingCanvas, [self.handContour],
-                         0, (0, 255, 0), 1)
+        self.renderer.contour(self.handContour, (0, 255, 0), 1)
         if bubbles:
             self.drawBubbles(self.handContour, (255, 255, 0))
 
     def drawHullContour(self, bubbles = False):
-        cv2.drawContours(self.drawingCanvas, [self.hullPoints], 0,
-                         (0, 0, 255), 2)
+        self.renderer.contour(self.hullPoints, (0, 0, 255), 2)
         if bubbles:
             self.drawBubbles(self.hullPoints, (255, 255, 255))
 
+    # Valleys between the fingers, as found by analyzeHandShape
     def drawDefects(self, bubbles = False):
-        defectPoints = []
-        minDistance = 1000
-        if self.defects != None:
-            for i in self.defects:
-                if i[0][3] > minDistance:
-                    defectPoints.append(self.handContour[i[0][2]])
-            defectPoints = np.array(defectPoints, dtype=np.int32)
-            if bubbles:
-                self.drawBubbles(defectPoints, (0, 0, 255), width=10)
+        if bubbles:
+            self.drawBubbles(self.valleys, (0, 0, 255), width=10)
 
-    def drawBubbles(self, pointsList, color=(255, 255, 255), width=2):
-        for i in xrange(len(pointsList)):
-            for j in xrange(len(pointsList[i])):
-                cv2.circle(self.drawingCanvas, (pointsList[i][j][0],
-                           pointsList[i][j][1]), width, color)
+    def drawFingertips(self):
+        self.renderer.discs(self.fingertips, (0, 255, 255), 8)
 
-    def draw(self):
-        self.drawingCanvas = np.zeros(self.original.shape, np.uint8)
+    def drawBubbles(self, pointsList, color=(255, 255, 255), width=2):
+        self.renderer.markers(pointsList, color, width)
+
+    # Renders the overlay into self.drawingCanvas, at the camera resolution
+    # unless a display size is given. The canvas is reused between frames.
+    @traced
+    def draw(self, width=None, height=None):
+        self.drawingCanvas = self.renderer.begin(self.original.shape,
+                                                 width, height)
         self.drawHandContour(True)
         self.drawHullContour(True)
         self.drawDefects(True)
+        self.drawFingertips()
         self.drawCenter()
         self.drawCircles()
+        if self.bus is not None:
+            self.bus.publish("canvas", self.drawingCanvas, self.frameTime)
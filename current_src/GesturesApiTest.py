@@ -0,0 +1,161 @@
+import unittest
+import cv2
+import numpy as np
+from GesturesApi import GestureProcessor
+from pipelineConfig import PipelineConfig
+from replayCapture import ReplayCapture, syntheticHandFrames
+from skinLut import SkinColorLUT
+
+frames = syntheticHandFrames(640, 360, 12)
+
+# A processor on replayed synthetic frames, with the default gestures and
+# nothing written back (empty gesture file name)
+def makeProcessor(config=None):
+    gp = GestureProcessor("", capture=ReplayCapture(frames, frameRate=30),
+                          config=config or PipelineConfig(
+                              cameraWidth=640, cameraHeight=360))
+    return gp
+
+# Skin color table of the synthetic hand's color
+def handColorTable():
+    return SkinColorLUT.fromSamples([np.full((8, 8, 3), 220, np.uint8)])
+
+
+class PoseTest(unittest.TestCase):
+    # The synthetic hand is an open palm, held from the first frame
+    def testUnboundPoseLeavesLastActionAlone(self):
+        gp = makeProcessor()
+        for i in xrange(gp.poses.holdFrames):
+            gp.process()
+        self.assertEqual(gp.pose, "Open Palm")
+        self.assertEqual(gp.lastPose, "Open Palm")
+        self.assertEqual(gp.lastAction, "")
+
+    def testBoundPoseFiresOnce(self):
+        gp = makeProcessor()
+        fired = []
+        gp.bind("Open Palm", lambda: fired.append(gp.frameTime))
+        for i in xrange(gp.poses.holdFrames * 2):
+            gp.process()
+        self.assertEqual(len(fired), 1)
+
+
+class ResultTest(unittest.TestCase):
+    # The attributes process() used to set read the last frame's result
+    def testFormerAttributes(self):
+        gp = makeProcessor()
+        for frame in frames:
+            result = gp.process()
+        self.assertIs(gp.result, result)
+        self.assertEqual(gp.handDistance, result.distance)
+        self.assertGreater(len(result.recentPositions), 0)
+        self.assertEqual(gp.recentPositions, result.recentPositions)
+        self.assertEqual(zip(gp.x, gp.y), list(result.recentPositions))
+
+
+class HandContourTest(unittest.TestCase):
+    # Below the minimum area, the largest contour is still taken as the hand
+    # rather than whichever came first
+    def testSmallContoursFallBackToLargest(self):
+        gp = makeProcessor()
+        gp.contours = [cv2.ellipse2Poly((x, 50), (radius, radius), 0, 0, 360,
+                                        30).reshape(-1, 1, 2)
+                       for x, radius in [(20, 2), (60, 4), (100, 3)]]
+        gp.extractHandContour()
+        self.assertEqual(gp.handIndices, [])
+        self.assertIs(gp.realHandContour, gp.contours[1])
+
+
+class MultiHandTest(unittest.TestCase):
+    # Still for a second, a horizontal swipe, then still again
+    @staticmethod
+    def swipe(i):
+        return 0.3 + 0.4 * min(max(i - 30, 0), 20) / 20.0, 0.5
+
+    # The largest hand is the processor's own, and its gestures are not
+    # recognized a second time as one of the hands followed
+    def testActionFiresOnce(self):
+        swipe = syntheticHandFrames(640, 360, 80, path=self.swipe)
+        for hands in [1, 2]:
+            gp = GestureProcessor("", capture=ReplayCapture(
+                swipe, loop=False, frameRate=30), config=PipelineConfig(
+                    cameraWidth=640, cameraHeight=360, maxHands=hands))
+            calls = []
+            for name in set(gp.getGestureNames()):
+                gp.bind(name, lambda name=name: calls.append(name))
+            for frame in swipe:
+                gp.process()
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(gp.lastAction, calls[0])
+
+
+class TrackingTest(unittest.TestCase):
+    def setUp(self):
+        self.gp = makeProcessor(PipelineConfig("low-latency"))
+
+    def testTrackedFramesBetweenDetections(self):
+        self.gp.process()
+        self.assertFalse(self.gp.tracker.due())
+        self.gp.process()
+        self.assertEqual(self.gp.tracker.framesSinceDetection, 1)
+
+    # Outside the tracked region, the mask of a tracked frame is empty rather
+    # than left over from the last full detection
+    def testTrackedMaskIsClearedOutsideRegion(self):
+        self.gp.process()
+        x0, y0, x1, y1 = self.gp.tracker.predictedRect(self.gp.original.shape)
+        self.gp.thresholded.fill(255)  # stands in for an older mask
+        self.gp.process()
+        outside = self.gp.thresholded.copy()
+        outside[y0:y1, x0:x1] = 0
+        self.assertEqual(np.count_nonzero(outside), 0)
+        self.assertGreater(np.count_nonzero(self.gp.thresholded), 0)
+
+    # The tracked region is thresholded like a full detection, with the
+    # preset's blur (away from the region's edges, where blurring the
+    # region alone sees less of the image)
+    def testTrackedMaskMatchesFullThreshold(self):
+        self.gp.process()
+        x0, y0, x1, y1 = self.gp.tracker.predictedRect(self.gp.original.shape)
+        self.gp.process()
+        grey = cv2.cvtColor(self.gp.original, cv2.COLOR_BGR2GRAY)
+        size = self.gp.config.blurSize
+        blurred = cv2.GaussianBlur(grey, (size, size), 0)
+        _, expected = cv2.threshold(blurred, self.gp.thresholdValue, 255,
+                                    cv2.THRESH_BINARY)
+        inner = (slice(y0 + size, y1 - size), slice(x0 + size, x1 - size))
+        np.testing.assert_array_equal(self.gp.thresholded[inner],
+                                      expected[inner])
+
+    # The last detection was made by a segmenter that is then removed: there
+    # is no threshold to track with, so the next frame is a full detection
+    def testTrackingAfterSegmenterRemoved(self):
+        self.gp.segmenter = handColorTable()
+        self.gp.process()
+        self.assertIsNone(self.gp.tracker.threshold)
+        self.gp.segmenter = None
+        self.gp.process()
+        self.assertEqual(self.gp.tracker.framesSinceDetection, 0)
+        self.assertEqual(self.gp.tracker.threshold, self.gp.thresholdValue)
+
+    # Tracked frames use the segmenter on the predicted region
+    def testTrackedWithSegmenter(self):
+        self.gp.segmenter = handColorTable()
+        self.gp.process()
+        self.gp.process()
+        self.assertEqual(self.gp.tracker.framesSinceDetection, 1)
+        self.assertGreater(np.count_nonzero(self.gp.thresholded), 0)
+
+    # Other hands would not move on tracked frames, so with several hands
+    # every frame is a full detection
+    def testSeveralHandsAreNotTracked(self):
+        gp = makeProcessor(PipelineConfig("low-latency", maxHands=2))
+        for i in xrange(3):
+            gp.process()
+            self.assertEqual(gp.tracker.framesSinceDetection, 0)
+        self.assertEqual(len(gp.multiHand.hands), 1)
+        self.assertEqual(gp.multiHand.hands[0].time, gp.frameTime)
+
+
+if __name__ == "__main__":
+    unittest.main()
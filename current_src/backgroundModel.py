@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+from bufferPool import BufferPool
+
+# Segments the hand as whatever differs from a model of the static
+# background, which removes the bright-but-static regions (lamps, windows,
+# white walls) the global threshold picks up. Follows on from the experiment
+# in old/bgSub.py, but all of the work is vectorized and done on a frame
+# shrunk by scale, with the model only updated every updateEvery frames.
+# method is one of:
+#   "average" - running average (cv2.accumulateWeighted); pixels currently
+#               in the foreground are learned foregroundRate times slower so
+#               a resting hand is not absorbed straight away
+#   "mog2"    - OpenCV's Gaussian mixture subtractor
+#   "knn"     - OpenCV's k-nearest neighbours subtractor (OpenCV 3+)
+# Plug into the processor with gp.segmenter = BackgroundModel().
+class BackgroundModel(object):
+    def __init__(self, method="average", scale=0.25, updateEvery=1,
+                 learningRate=0.05, foregroundRate=0.1, threshold=25,
+                 cleanupSize=3):
+        self.method = method
+        self.scale = scale
+        self.updateEvery = updateEvery
+        self.learningRate = learningRate
+        self.foregroundRate = foregroundRate
+        self.threshold = threshold
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
+                                                (cleanupSize, cleanupSize))
+        self.buffers = BufferPool()
+        self.subtractor = None
+        if method != "average":
+            self.subtractor = BackgroundModel.createSubtractor(method)
+        self.background = None
+        self.frames = 0
+
+    @staticmethod
+    def createSubtractor(method):
+        if method == "mog2":
+            if hasattr(cv2, "createBackgroundSubtractorMOG2"):
+                return cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+            return cv2.BackgroundSubtractorMOG2()  # OpenCV 2.4
+        elif method == "knn":
+            return cv2.createBackgroundSubtractorKNN(detectShadows=False)
+        raise ValueError("Unknown Background Method")
+
+    def shrink(self, image):
+        height, width = image.shape[:2]
+        size = (max(int(width * self.scale), 1),
+                max(int(height * self.scale), 1))
+        small = self.buffers.get("small", (size[1], size[0]) + image.shape[2:])
+        cv2.resize(image, size, dst=small, interpolation=cv2.INTER_AREA)
+        return small
+
+    # Foreground mask of the shrunk frame, learning from it if update is set
+    def subtract(self, small, update):
+        mask = self.buffers.get("mask", small.shape[:2])
+        if self.subtractor is not None:
+            rate = -1 if update else 0  # -1 lets OpenCV choose
+            if update and self.learningRate is not None:
+                rate = self.learningRate
+            self.subtractor.apply(small, mask, rate)
+            cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY, dst=mask)
+            return mask
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small.astype(np.float32)
+        background = self.buffers.like("background", small)
+        cv2.convertScaleAbs(self.background, dst=background)
+        difference = self.buffers.like("difference", small)
+        cv2.absdiff(small, background, dst=difference)
+        if difference.ndim == 3:
+            grey = self.buffers.get("grey", small.shape[:2])
+            cv2.cvtColor(difference, cv2.COLOR_BGR2GRAY, dst=grey)
+            difference = grey
+        cv2.threshold(difference, self.threshold, 255, cv2.THRESH_BINARY,
+                      dst=mask)
+        if update:
+            still = self.buffers.like("still", mask)
+            cv2.bitwise_not(mask, dst=still)
+            cv2.accumulateWeighted(small, self.background, self.learningRate,
+                                   mask=still)
+            cv2.accumulateWeighted(small, self.background,
+                                   self.learningRate * self.foregroundRate,
+                                   mask=mask)
+        return mask
+
+    # Writes the foreground mask of image into out. With a roi (a pair of
+    # slices, as used between tracker detections) the model is not updated
+    # and only out[roi] is returned, though all of out is written.
+    def segment(self, image, out, roi=None):
+        update = roi is None and self.frames % self.updateEvery == 0
+        if roi is None:
+            self.frames += 1
+        mask = self.subtract(self.shrink(image), update)
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, dst=mask)
+        cv2.resize(mask, (out.shape[1], out.shape[0]), dst=out,
+                   interpolation=cv2.INTER_LINEAR)
+        cv2.threshold(out, 127, 255, cv2.THRESH_BINARY, dst=out)
+        if roi is not None:
+            return out[roi]
+        return out
+
+    # Forget the background, i.e. after the camera moved
+    def reset(self):
+        self.background = None
+        if self.subtractor is not None:
+            self.subtractor = BackgroundModel.createSubtractor(self.method)
@@ -0,0 +1,1229 @@
+# Headless benchmarks for the processing pipeline. Frames come from
+# replayCapture, so no camera (or display) is needed.
+# Usage: python benchmarks.py [name ...]   (runs everything by default)
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import multiprocessing
+import cv2
+import numpy as np
+from PIL import Image
+import defaultGesturesLoader
+import templateConsolidation
+from gesture import Gesture
+from gestureLibrary import GestureLibrary
+from GesturesApi import GestureProcessor
+from gestureCore import GestureCore
+from pipelineConfig import PipelineConfig
+from contourEngine import ContourEngine
+from motionGate import MotionGate
+from handTracker import HandTracker
+from skinLut import SkinColorLUT
+from backgroundModel import BackgroundModel
+from poseClassifier import PoseClassifier
+from shardedClassifier import ShardedClassifier
+from protractorMatcher import ProtractorMatcher
+from rgbaConverter import RGBAConverter
+from frameScheduler import FrameScheduler
+from pointerMode import PointerMode
+from frameBus import FrameBus, FrameSubscriber
+from frameTracer import FrameTracer, traceCall
+from frameResult import FrameResult
+from replayCapture import ReplayCapture, syntheticHandFrames, \
+    syntheticHandMasks, drawSyntheticHand, defaultPath
+
+
+def makeProcessor(width=1280, height=720, count=30, frames=None):
+    if frames is None:
+        frames = syntheticHandFrames(width, height, count)
+    # Empty file name so that the default gestures are used and nothing is
+    # ever written back
+    gp = GestureProcessor("", capture=ReplayCapture(frames))
+    gp.cameraHeight, gp.cameraWidth = frames[0].shape[:2]
+    return gp
+
+def timeCalls(fn, repeat):
+    fn()  # warm up
+    start = time.time()
+    for i in xrange(repeat):
+        fn()
+    return (time.time() - start) * 1000.0 / repeat
+
+def printTable(header, rows):
+    widths = [max(len(str(row[i])) for row in [header] + rows)
+              for i in xrange(len(header))]
+    for row in [header] + rows:
+        print "  ".join(str(row[i]).rjust(widths[i])
+                        for i in xrange(len(row)))
+
+# ------------------------------- Allocations ---------------------------------
+
+# The image stages as they were before the buffer pool: every call returns a
+# freshly allocated array.
+def legacyImageStages(cap):
+    _, captured = cap.read()
+    original = cv2.flip(captured, 1)
+    grey = cv2.cvtColor(original, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(grey, (31, 31), 0)
+    _, thresholded = cv2.threshold(blurred, 0, 255,
+                                   cv2.THRESH_BINARY+cv2.THRESH_OTSU)
+    scratch = thresholded.copy()
+    cv2.findContours(scratch, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    return [captured, original, grey, blurred, thresholded, scratch]
+
+def pooledImageStages(gp):
+    gp.readCamera()
+    gp.threshold()
+    gp.extractContours()
+    return gp.buffers.buffers.values()
+
+# Counts the stage outputs which live in memory that was not used by the
+# previous frame. The previous outputs are kept alive while the next frame
+# runs, so a reused address really is a reused buffer.
+def countAllocations(stages, frames):
+    previous = []
+    allocations, allocatedBytes = 0, 0
+    for i in xrange(frames + 1):
+        outputs = stages()
+        known = set(arr.__array_interface__["data"][0] for arr in previous)
+        if i > 0:  # first frame always allocates
+            for arr in outputs:
+                if arr.__array_interface__["data"][0] not in known:
+                    allocations += 1
+                    allocatedBytes += arr.nbytes
+        previous = outputs
+    return allocations / float(frames), allocatedBytes / float(frames)
+
+# Pooling takes the allocations out of the loop, not the work: the 31x31
+# blur dominates the time per frame either way. The two versions are timed
+# in turns and the median of the rounds kept, so that neither is favoured by
+# running first (i.e. while the CPU clocks up).
+def benchmarkAllocations(frames=30, rounds=5):
+    print "Image stage allocations per frame (read -> contours)"
+    rows = []
+    for width, height in [(640, 480), (1280, 720), (1920, 1080)]:
+        source = syntheticHandFrames(width, height, 10)
+        cap = ReplayCapture(source)
+        gp = makeProcessor(frames=source)
+        versions = [("before", lambda: legacyImageStages(cap)),
+                    ("pooled", lambda: pooledImageStages(gp))]
+        timings = dict((name, []) for name, stages in versions)
+        for i in xrange(rounds):
+            for name, stages in versions:
+                timings[name].append(timeCalls(stages, frames))
+        for name, stages in versions:
+            count, nbytes = countAllocations(stages, frames)
+            rows.append(["%dx%d" % (width, height), name, "%.1f" % count,
+                         "%.2f" % (nbytes / 2.0**20),
+                         "%.0f" % (nbytes * 30 / 2.0**20),
+                         "%.2f" % np.median(timings[name])])
+    printTable(["size", "stages", "allocs/frame", "MB/frame", "MB/s@30fps",
+                "ms/frame"], rows)
+
+# --------------------------------- Overlay ----------------------------------
+
+# The overlay as it was drawn before OverlayRenderer: a new canvas every frame
+# and one cv2.circle call per marker.
+def legacyDraw(gp):
+    canvas = np.zeros(gp.original.shape, np.uint8)
+    def bubbles(points, color, width=2):
+        for point in np.asarray(points).reshape(-1, 2):
+            cv2.circle(canvas, tuple(point), width, color)
+    cv2.drawContours(canvas, [gp.handContour], 0, (0, 255, 0), 1)
+    bubbles(gp.handContour, (255, 255, 0))
+    cv2.drawContours(canvas, [gp.hullPoints], 0, (0, 0, 255), 2)
+    bubbles(gp.hullPoints, (255, 255, 255))
+    if gp.defects is not None:
+        bubbles([gp.handContour[d[0][2]] for d in gp.defects
+                 if d[0][3] > 1000], (0, 0, 255), 10)
+    cv2.circle(canvas, tuple(gp.palmCenter), 10, (255, 0, 0), -2)
+    recentPositions = gp.result.recentPositions
+    for i in xrange(len(recentPositions)):
+        cv2.circle(canvas, recentPositions[i], 5, (255, 25*i, 25*i), -1)
+    cv2.circle(canvas, tuple(gp.palmCenter), int(gp.palmRadius),
+               (0, 255, 0), 10)
+    return canvas
+
+def benchmarkOverlay(frames=30):
+    print "Overlay drawing, ms per frame (including resize to display size)"
+    rows = []
+    for width, height in [(1280, 720), (1920, 1080)]:
+        gp = makeProcessor(width, height)
+        for i in xrange(15):  # fill up the position history
+            gp.process()
+        displayWidth, displayHeight = 960, 540
+        legacy = lambda: GestureProcessor.getRGBAFromBGR(
+            legacyDraw(gp), displayWidth, displayHeight)
+        def full():
+            gp.draw()
+            GestureProcessor.getRGBAFromBGR(gp.drawingCanvas,
+                                            displayWidth, displayHeight)
+        def display():
+            gp.draw(displayWidth, displayHeight)
+            GestureProcessor.getRGBAFromBGR(gp.drawingCanvas,
+                                            displayWidth, displayHeight)
+        rows.append(["%dx%d" % (width, height),
+                     "%.2f" % timeCalls(legacy, frames),
+                     "%.2f" % timeCalls(full, frames),
+                     "%.2f" % timeCalls(display, frames)])
+    printTable(["size", "before", "renderer", "at display size"], rows)
+
+# --------------------------------- Display ----------------------------------
+
+# Conversion of the three demo images to PIL images at the demo's display
+# size. The PhotoImage upload itself needs a Tk display, so it is left out.
+def benchmarkDisplay(frames=30):
+    print "Display conversion of three images to 960x540, ms per frame"
+    width, height = 960, 540
+    rows = []
+    for sourceWidth, sourceHeight in [(1280, 720), (1920, 1080)]:
+        gp = makeProcessor(sourceWidth, sourceHeight)
+        gp.process()
+        gp.draw(width, height)
+        def legacy():
+            for image in [GestureProcessor.getRGBAFromBGR(gp.original,
+                                                          width, height),
+                          GestureProcessor.getRGBAFromBGR(gp.drawingCanvas,
+                                                          width, height),
+                          GestureProcessor.getRGBAFromGray(gp.thresholded,
+                                                           width, height)]:
+                Image.fromarray(image)
+        converter = RGBAConverter()
+        def reused():
+            for name, image in [("original", gp.original),
+                                ("canvas", gp.drawingCanvas),
+                                ("thresholded", gp.thresholded)]:
+                rgba = converter.convert(name, image, width, height)
+                Image.frombuffer("RGBA", (width, height), rgba,
+                                 "raw", "RGBA", 0, 1)
+        rows.append(["%dx%d" % (sourceWidth, sourceHeight),
+                     "%.2f" % timeCalls(legacy, frames),
+                     "%.2f" % timeCalls(reused, frames)])
+    printTable(["camera", "before", "reused buffers"], rows)
+
+# -------------------------------- Scheduling --------------------------------
+
+# Runs the demo loop (process, then draw and convert for display) with sleeps
+# standing in for the Tk timer, once with the fixed delay after every frame
+# and once with FrameScheduler.
+def benchmarkScheduler(frames=60, deadline=1000 / 30.0):
+    print "Demo loop at 1280x720 with a %.1f ms deadline" % deadline
+    gp = makeProcessor(1280, 720)
+    converter = RGBAConverter()
+    def redraw():
+        gp.draw(960, 540)
+        for name, image in [("original", gp.original),
+                            ("canvas", gp.drawingCanvas),
+                            ("thresholded", gp.thresholded)]:
+            converter.convert(name, image, 960, 540)
+    rows = []
+    start = time.time()
+    for i in xrange(frames):
+        gp.process()
+        redraw()
+        time.sleep(deadline / 1000.0)
+    fps = frames / (time.time() - start)
+    rows.append(["fixed delay", "%.1f" % fps, "%.1f" % fps, "-"])
+    scheduler = FrameScheduler(deadline)
+    for i in xrange(frames):
+        time.sleep(scheduler.tick(gp.process, redraw) / 1000.0)
+    rows.append(["scheduler", "%.1f" % scheduler.fps,
+                 "%.1f" % scheduler.displayFps, scheduler.deadlineMisses])
+    printTable(["loop", "process fps", "display fps", "deadline misses"],
+               rows)
+    print "process %.1f ms, redraw %.1f ms" % (scheduler.processCost,
+                                               scheduler.redrawCost)
+
+# ------------------------------- Motion gate --------------------------------
+
+def benchmarkMotionGate(frames=60):
+    print "Motion gate at 1280x720, ms per process() call"
+    rows = []
+    scenes = [("idle hand", lambda i: (0.5, 0.5)),
+              ("moving hand", None)]
+    for scene, path in scenes:
+        source = syntheticHandFrames(1280, 720, 30, path=path)
+        for gated in [False, True]:
+            gp = makeProcessor(frames=source)
+            gp.motionGate = MotionGate() if gated else None
+            ms = timeCalls(gp.process, frames)
+            rows.append([scene, "on" if gated else "off", "%.2f" % ms,
+                         "%.0f%%" % (100 * gp.motionGate.skipRate)
+                         if gated else "-"])
+    printTable(["scene", "gate", "ms/frame", "skipped"], rows)
+
+# --------------------------------- Tracking ---------------------------------
+
+# Palm center error of the tracked pipeline against full detection on every
+# frame, on the same replayed frames
+def benchmarkTracker(frames=60):
+    print "Hand tracker at 1280x720 vs full detection every frame"
+    source = syntheticHandFrames(1280, 720, frames)
+    def run(tracker):
+        gp = makeProcessor(frames=source)
+        gp.motionGate = None
+        gp.tracker = tracker
+        centers, start = [], time.time()
+        for i in xrange(frames):
+            gp.process()
+            centers.append(gp.palmCenter.copy())
+        return np.array(centers), (time.time() - start) * 1000.0 / frames
+    reference, referenceMs = run(None)
+    rows = [["full", "0.0", "0.0", "0.0", "%.2f" % referenceMs]]
+    for detectEvery in [2, 3, 5, 10]:
+        centers, ms = run(HandTracker(detectEvery=detectEvery))
+        error = np.sqrt(((centers - reference) ** 2).sum(1))
+        rows.append(["every %d" % detectEvery, "%.1f" % error.mean(),
+                     "%.1f" % np.percentile(error, 95),
+                     "%.1f" % error.max(), "%.2f" % ms])
+    printTable(["detection", "mean err px", "p95 err px", "max err px",
+                "ms/frame"], rows)
+
+# ------------------------------- Segmentation -------------------------------
+
+# Intersection over union of a mask with the ground truth
+def maskIoU(mask, truth):
+    mask, truth = mask > 0, truth > 0
+    return (mask & truth).sum() / float(max((mask | truth).sum(), 1))
+
+# Runs threshold() and extractContours() with the given segmenter over the
+# frames, reporting time, contours found and mask quality
+def segmentationRow(name, gp, segmenter, frames, masks):
+    gp.segmenter = segmenter
+    ms, contours, iou = 0.0, 0, 0.0
+    for frame, mask in zip(frames, masks):
+        gp.original = cv2.flip(frame, 1)
+        start = time.time()
+        gp.threshold()
+        ms += (time.time() - start) * 1000.0
+        iou += maskIoU(gp.thresholded, cv2.flip(mask, 1))
+        gp.extractContours()
+        contours += len(gp.contours)
+    count = float(len(frames))
+    return [name, "%.2f" % (ms / count), "%.1f" % (contours / count),
+            "%.2f" % (iou / count)]
+
+def benchmarkSkinLut(frames=30):
+    print "Skin color LUT vs blur + Otsu at 1280x720, cluttered background"
+    skin = (110, 140, 200)
+    source = syntheticHandFrames(1280, 720, frames, color=skin, clutter=12)
+    masks = syntheticHandMasks(1280, 720, frames)
+    lut = SkinColorLUT.fromLabeledFrames(source[:10], masks[:10])
+    gp = makeProcessor(frames=source)
+    rows = [segmentationRow("blur + Otsu", gp, None, source, masks),
+            segmentationRow("skin LUT", gp, lut, source, masks)]
+    printTable(["segmentation", "ms/frame", "contours", "mask IoU"], rows)
+
+def benchmarkBackground(frames=20):
+    print "Background model segmentation, cluttered background"
+    rows = []
+    for width, height in [(640, 480), (1280, 720), (1920, 1080)]:
+        source = syntheticHandFrames(width, height, frames, clutter=12)
+        masks = syntheticHandMasks(width, height, frames)
+        # Same scene with the hand out of view, to learn the background from
+        empty = syntheticHandFrames(width, height, 5, path=lambda i: (-1, -1),
+                                    clutter=12)
+        gp = makeProcessor(frames=source)
+        size = "%dx%d" % (width, height)
+        rows.append([size] + segmentationRow("blur + Otsu", gp, None,
+                                             source, masks))
+        for method in ["average", "mog2", "knn"]:
+            model = BackgroundModel(method)
+            scratch = np.empty((height, width), np.uint8)
+            for frame in empty:
+                model.segment(cv2.flip(frame, 1), scratch)
+            rows.append([size] + segmentationRow(method, gp, model,
+                                                 source, masks))
+    printTable(["size", "segmentation", "ms/frame", "contours", "mask IoU"],
+               rows)
+
+# --------------------------------- Contours ---------------------------------
+
+# Contour selection as it was before ContourEngine
+def legacyContours(mask):
+    contours, _ = cv2.findContours(mask.copy(), cv2.RETR_TREE,
+                                   cv2.CHAIN_APPROX_SIMPLE)
+    maxArea, index = 0, 0
+    for i in xrange(len(contours)):
+        area = cv2.contourArea(contours[i])
+        if area > maxArea:
+            maxArea, index = area, i
+    length = cv2.arcLength(contours[index], True)
+    return len(contours), cv2.approxPolyDP(contours[index], 0.001 * length,
+                                           True)
+
+def benchmarkContours(frames=20):
+    print "Contour selection on noisy 1280x720 masks"
+    rng = np.random.RandomState(0)
+    masks = syntheticHandMasks(1280, 720, frames)
+    for mask in masks:
+        # speckles in the background and ragged edges on the hand
+        noise = rng.rand(*mask.shape)
+        mask[noise < 0.01] = 255
+        mask[(noise > 0.99) & (mask > 0)] = 0
+    rows = []
+    counts = [legacyContours(mask) for mask in masks]
+    rows.append(["before", "%.0f" % np.mean([c for c, h in counts]),
+                 "%.0f" % np.mean([c for c, h in counts]),
+                 "%.0f" % np.mean([len(h) for c, h in counts]),
+                 "%.2f" % (timeCalls(lambda: [legacyContours(m)
+                                              for m in masks], 1)
+                           / len(masks))])
+    engine = ContourEngine(maxPoints=128)
+    def select(mask):
+        contours = engine.extract(mask.copy())
+        return engine.simplify(contours[engine.largest(contours)])
+    stats = []
+    for mask in masks:
+        select(mask)
+        stats.append(dict(engine.stats))
+    rows.append(["engine", "%.0f" % np.mean([s["contours"] for s in stats]),
+                 "%.0f" % np.mean([s["exactAreas"] for s in stats]),
+                 "%.0f" % np.mean([s["handPoints"] for s in stats]),
+                 "%.2f" % (timeCalls(lambda: [select(m) for m in masks], 1)
+                           / len(masks))])
+    printTable(["selection", "contours", "exact areas", "hand points",
+                "ms/frame"], rows)
+
+# ---------------------------------- Poses -----------------------------------
+
+def benchmarkPoses(repeat=1000):
+    print "Static pose recognition per frame, microseconds"
+    gp = makeProcessor(640, 480, 5)
+    gp.process()
+    rows = [["features", "-", "%.1f" % (timeCalls(gp.findPoseFeatures,
+                                                  repeat) * 1000)]]
+    rng = np.random.RandomState(0)
+    for count in [4, 100, 1000]:
+        poses = PoseClassifier()
+        for i in xrange(count):
+            poses.addPose(str(i), rng.rand(len(PoseClassifier.featureWeights)))
+        rows.append(["update", count, "%.1f" % (timeCalls(
+            lambda: poses.update(gp.poseFeatures), repeat) * 1000)])
+    printTable(["step", "templates", "us/frame"], rows)
+
+# --------------------------------- Library ----------------------------------
+
+# Random smooth strokes to fill template libraries with
+def randomStrokes(count, points=64, seed=0):
+    rng = np.random.RandomState(seed)
+    steps = rng.randn(count, points, 2).cumsum(1)
+    return [steps[i] for i in xrange(count)]
+
+# Gesture as it was stored before: float64 arrays and a per instance __dict__
+class LegacyGesture(object):
+    def __init__(self, gesture):
+        self.points = gesture.points.astype(np.float64)
+        self.distance = float(gesture.distance)
+        self.distanceIndices = gesture.distanceIndices.astype(np.float64)
+        self.name = gesture.name
+
+def gestureBytes(gesture):
+    size = sys.getsizeof(gesture) + sys.getsizeof(gesture.name)
+    size += sys.getsizeof(gesture.points)
+    size += sys.getsizeof(gesture.distanceIndices)
+    if hasattr(gesture, "__dict__"):
+        size += sys.getsizeof(gesture.__dict__)
+    return size
+
+def benchmarkLibrary(count=10000):
+    print "Memory of %d templates of 64 points" % count
+    gestures = [Gesture(stroke, str(i))
+                for i, stroke in enumerate(randomStrokes(count))]
+    legacy = [LegacyGesture(gesture) for gesture in gestures]
+    legacyNames = [gesture.name for gesture in legacy]
+    library = GestureLibrary(gestures)
+    rows = []
+    legacyBytes = (sum(gestureBytes(g) for g in legacy) +
+                   sys.getsizeof(legacy) + sys.getsizeof(legacyNames))
+    rows.append(["float64 + __dict__", "%.2f" % (legacyBytes / 2.0**20)])
+    compactBytes = sum(gestureBytes(g) for g in gestures) + \
+        sys.getsizeof(gestures)
+    rows.append(["float32 + __slots__", "%.2f" % (compactBytes / 2.0**20)])
+    # PackedGestures have no arrays of their own (reading them makes views)
+    libraryBytes = (sum(sys.getsizeof(g) + sys.getsizeof(g.name)
+                        for g in library) +
+                    sys.getsizeof(library.gestures) +
+                    sys.getsizeof(library.nameIndex) +
+                    sys.getsizeof(library.classIndices) +
+                    sum(sys.getsizeof(indices)
+                        for indices in library.classIndices.values()) +
+                    sum(arr.nbytes for arr in [library.points,
+                                               library.distanceIndices,
+                                               library.distances,
+                                               library.offsets]))
+    rows.append(["packed library", "%.2f" % (libraryBytes / 2.0**20)])
+    printTable(["layout", "MB"], rows)
+    lookup = lambda: [legacyNames.index(name) for name in legacyNames[-100:]]
+    print "name lookup, last 100 names: list.index %.2f ms, dict %.3f ms" % (
+        timeCalls(lookup, 3),
+        timeCalls(lambda: [library.index(name)
+                           for name in legacyNames[-100:]], 3))
+
+# ------------------------------- Consolidation -------------------------------
+
+# Noisy, rescaled copies of every default gesture, as if recorded by a user
+def recordedSamples(perClass, seed=0, points=None):
+    rng = np.random.RandomState(seed)
+    samples = []
+    for gesture in defaultGesturesLoader.defaultGestures:
+        for i in xrange(perClass):
+            stroke = gesture.points * rng.uniform(0.8, 1.2)
+            stroke = stroke + rng.randn(*stroke.shape).cumsum(0) * 2
+            if points is not None:
+                stroke = stroke[np.linspace(0, len(stroke) - 1,
+                                            points).astype(int)]
+            samples.append((gesture.name, stroke))
+    return samples
+
+def benchmarkConsolidation(perClass=20, queriesPerClass=3):
+    gp = makeProcessor(count=1)
+    library = GestureLibrary([Gesture(stroke, name) for name, stroke in
+                              recordedSamples(perClass)])
+    # Human gestures are short, a second or so of hand positions
+    queries = recordedSamples(queriesPerClass, seed=1, points=30)
+    print "Classifying %d gestures, %d recorded samples per gesture" % (
+        len(queries), perClass)
+    rows = []
+    for maxPerClass in [None, 3, 1]:
+        if maxPerClass is None:
+            gp.gestures, label = library, "none"
+        else:
+            start = time.time()
+            gp.gestures = templateConsolidation.consolidate(library,
+                                                            maxPerClass)
+            label = "%d per class (%.0f ms)" % (
+                maxPerClass, (time.time() - start) * 1000)
+        correct = [0]
+        def classifyAll():
+            correct[0] = 0
+            for name, stroke in queries:
+                index = gp.classifyGesture(stroke)
+                if index is not None and gp.gestures[index].name == name:
+                    correct[0] += 1
+        ms = timeCalls(classifyAll, 1) / len(queries)
+        rows.append([label, len(gp.gestures), "%.1f" % ms,
+                     "%d/%d" % (correct[0], len(queries))])
+    printTable(["consolidation", "templates", "ms/gesture", "correct"], rows)
+
+# --------------------------------- Sharding ----------------------------------
+
+# A library of count random templates, built straight from arrays since the
+# Gesture constructor is too slow for this many
+def randomLibrary(count, points=64):
+    gestures = []
+    for i, stroke in enumerate(randomStrokes(count, points)):
+        stroke = (stroke - stroke[0]).astype(np.float32)
+        steps = np.sqrt((np.diff(stroke, axis=0) ** 2).sum(1))
+        indices = np.concatenate(([0], steps.cumsum())).astype(np.float32)
+        gestures.append(Gesture.fromArrays(stroke, indices,
+                                           float(indices[-1]), str(i)))
+    return GestureLibrary(gestures)
+
+def benchmarkSharding(count=50000, loopCount=500):
+    library = randomLibrary(count)
+    human = Gesture(randomStrokes(1, 30, seed=1)[0], "Human Gesture")
+    print "Classifying one 30 point gesture against %d templates" % count
+    print "(%d cores)" % multiprocessing.cpu_count()
+    loop = lambda: [Gesture.compareGestures(library[i], human)
+                    for i in xrange(loopCount)]
+    rows = [["compareGestures loop (extrapolated)",
+             "%.0f" % (timeCalls(loop, 1) * count / loopCount)]]
+    rows.append(["vectorized, 1 process",
+                 "%.1f" % timeCalls(lambda: library.topK(human), 5)])
+    for processes in [2, 4]:
+        classifier = ShardedClassifier(processes, minTemplates=0)
+        rows.append(["sharded, %d processes" % processes,
+                     "%.1f" % timeCalls(lambda: classifier.topK(library,
+                                                                human), 5)])
+        classifier.close()
+    printTable(["backend", "ms/gesture"], rows)
+
+# ---------------------------------- Timing -----------------------------------
+
+# A hand holding still, drawing the gesture in a second (slow at both ends)
+# and holding still again, as positions captured at 30 fps
+def handTrajectory(gesture, rng, size=300, center=(640, 360), still=0.6):
+    fractions = (1 - np.cos(np.linspace(0, np.pi, 31))) / 2
+    at = fractions * gesture.distanceIndices[-1]
+    stroke = np.column_stack((np.interp(at, gesture.distanceIndices,
+                                        gesture.points[:, 0]),
+                              np.interp(at, gesture.distanceIndices,
+                                        gesture.points[:, 1])))
+    stroke = stroke * size / 1024.0 + center
+    stillFrames = int(still * 30)
+    positions = np.concatenate(([stroke[0]] * stillFrames, stroke,
+                                [stroke[-1]] * stillFrames))
+    positions += rng.randn(*positions.shape)
+    return positions, np.arange(len(positions)) / 30.0
+
+# Runs positions captured at times (in seconds) through the gesture stages
+# of process(), returning the names of the gestures that fired
+def feedTrajectory(gp, positions, times):
+    fired = []
+    for name in set(gp.getGestureNames()):
+        gp.bind(name, lambda name=name: fired.append(name))
+    gp.handMomentPositions, gp.handCenterPositions = [], []
+    gp.handPositionTimes = []
+    gp.stationary = gp.record = False
+    gp.gesturePoints, gp.gestureTimes = [], []
+    for position, at in zip(positions, times):
+        position = tuple(np.round(position).astype(int))
+        gp.handMomentPositions.append(position)
+        gp.handCenterPositions.append(position)
+        gp.handPositionTimes.append(at)
+        gp.checkCanDoGestures()
+        gp.detemineStationary()
+        gp.determineIfGesture()
+    return fired
+
+def benchmarkTiming(trials=5):
+    gp = makeProcessor(count=1)  # with the default gestures
+    rng = np.random.RandomState(0)
+    cases = [(gesture.name,) + handTrajectory(gesture, rng)
+             for gesture in gp.gestures for i in xrange(trials)]
+    print "Recognizing %d default gestures drawn in 1 s at 30 fps," % len(
+        cases), "with frames dropped"
+    drops = [("none", lambda n: np.arange(n)),
+             ("every 2nd", lambda n: np.arange(0, n, 2)),
+             ("every 3rd", lambda n: np.arange(0, n, 3)),
+             ("bursts, 40%", lambda n: np.flatnonzero(
+                 np.repeat(rng.rand(n / 4 + 1) > 0.4, 4)[:n]))]
+    rows = []
+    for label, kept in drops:
+        row = [label]
+        for timestamps in [False, True]:
+            correct = 0
+            for name, positions, times in cases:
+                keep = kept(len(positions))
+                # Without timestamps, frames are assumed 1/30 s apart
+                if timestamps:
+                    keptTimes = times[keep]
+                else:
+                    keptTimes = np.arange(len(keep)) / 30.0
+                correct += feedTrajectory(gp, positions[keep],
+                                          keptTimes) == [name]
+            row.append("%d/%d" % (correct, len(cases)))
+        rows.append(row)
+    printTable(["dropped frames", "frame counting", "timestamps"], rows)
+
+# -------------------------------- Classifier ---------------------------------
+
+# How far along the stroke the hand is over time (fractions in, out)
+speedProfiles = [lambda t: t,                           # constant
+                 lambda t: (1 - np.cos(np.pi * t)) / 2,  # slow at both ends
+                 lambda t: t ** 2,                      # speeding up
+                 lambda t: 1 - (1 - t) ** 2]            # slowing down
+
+# The gesture as a user might draw it: timestamped hand positions at 30 fps,
+# at a random speed profile, duration, size and tilt, with jitter and
+# possibly the start cut off
+def perturbedStroke(gesture, rng):
+    duration = rng.uniform(0.6, 1.5)
+    times = np.arange(0, duration, 1 / 30.0)
+    profile = speedProfiles[rng.randint(len(speedProfiles))]
+    start = rng.uniform(0, 0.1) if rng.rand() < 0.5 else 0.0
+    fractions = start + (1 - start) * profile(times / times[-1])
+    at = fractions * gesture.distanceIndices[-1]
+    stroke = np.column_stack((np.interp(at, gesture.distanceIndices,
+                                        gesture.points[:, 0]),
+                              np.interp(at, gesture.distanceIndices,
+                                        gesture.points[:, 1])))
+    angle = rng.uniform(-0.15, 0.15)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                         [np.sin(angle), np.cos(angle)]])
+    stroke = stroke.dot(rotation.T) * rng.uniform(150, 450) / 1024.0
+    return stroke + rng.randn(*stroke.shape) * 2, times
+
+# Hand movement which is not a gesture: a smooth random wander
+def randomStroke(rng):
+    times = np.arange(0, rng.uniform(0.6, 1.5), 1 / 30.0)
+    velocity = np.cumsum(rng.randn(len(times), 2) * 40, axis=0)
+    stroke = np.cumsum(velocity, axis=0) / 30.0
+    return stroke + rng.randn(*stroke.shape) * 2, times
+
+# classifyGesture as it was, comparing against one template at a time
+def legacyClassify(gp):
+    human = Gesture(gp.resampledGesturePoints(), "Human Gesture")
+    errors = [Gesture.compareGestures(template, human)[Gesture.totalError]
+              for template in gp.gestures]
+    index = errors.index(min(errors))
+    template = gp.gestures[index]
+    totalDistance = Gesture.compareGestures(template, human)[
+        Gesture.totalDistance]
+    ratio = max(template.distance / human.distance,
+                human.distance / template.distance)
+    if ratio < 1.25 and totalDistance / min(template.distance,
+                                            human.distance) < 2:
+        return index
+
+# classifyGesture with the given GestureProcessor.classifier
+def withClassifier(classifier):
+    def classify(gp):
+        gp.classifier = classifier
+        return gp.classifyGesture()
+    return classify
+
+# Matchers to compare: (name, classify(gp), largest library to run on). The
+# compareGestures loop is too slow for more than the default gestures.
+classifierMatchers = [("compareGestures", legacyClassify, 11),
+                      ("vectorized", withClassifier(None), None),
+                      ("protractor", withClassifier(ProtractorMatcher()),
+                       None)]
+
+# The smallest library is the 11 default gestures (rather than 10, so that
+# every drawn gesture has its template); larger ones add random strokes
+def benchmarkClassifier(perClass=100, nonGestures=100, seed=0,
+                        sizes=(11, 100, 1000, 10000)):
+    gp = makeProcessor(count=1)
+    templates = defaultGesturesLoader.defaultGestures
+    rng = np.random.RandomState(seed)
+    strokes = [(i,) + perturbedStroke(templates[i], rng)
+               for i in xrange(len(templates)) for j in xrange(perClass)]
+    strokes += [(None,) + randomStroke(rng) for j in xrange(nonGestures)]
+    fillers = [Gesture(stroke, "Random %d" % i) for i, stroke in
+               enumerate(randomStrokes(max(sizes) - len(templates), 64,
+                                       seed + 1))]
+    print "%d perturbed default gestures and %d random movements" % (
+        len(strokes) - nonGestures, nonGestures)
+    rows = []
+    for size in sizes:
+        gp.gestures = GestureLibrary(templates +
+                                     fillers[:size - len(templates)])
+        for name, classify, largest in classifierMatchers:
+            if largest is not None and size > largest:
+                continue
+            # Rows are the drawn gesture (None last), columns the result
+            # (another template, then None, last)
+            confusion = np.zeros((len(templates) + 1, len(templates) + 2),
+                                 np.int64)
+            latencies = []
+            for truth, points, times in strokes:
+                gp.gesturePoints, gp.gestureTimes = list(points), list(times)
+                start = time.time()
+                index = classify(gp)
+                latencies.append(time.time() - start)
+                if index is None:
+                    column = len(templates) + 1
+                else:
+                    column = min(index, len(templates))
+                row = len(templates) if truth is None else truth
+                confusion[row, column] += 1
+            latencies = np.array(latencies) * 1000
+            gestures = confusion[:-1]
+            rows.append([size, name, "%.0f" % (1000 / latencies.mean()),
+                         "%.2f" % np.percentile(latencies, 99),
+                         "%.1f%%" % (100.0 * np.trace(gestures) /
+                                     gestures.sum()),
+                         "%.1f%%" % (100.0 * confusion[-1, :-1].sum() /
+                                     max(nonGestures, 1))])
+            print
+            print "%s, %d templates" % (name, size)
+            labels = [str(i) for i in xrange(len(templates))]
+            printTable(["drawn"] + labels + ["other", "none"],
+                       [[label] + list(counts) for label, counts in
+                        zip(labels + ["none"], confusion)])
+    print
+    for i in xrange(len(templates)):
+        print "%2d: %s" % (i, templates[i].name)
+    print
+    printTable(["templates", "matcher", "per s", "p99 ms", "correct",
+                "false positives"], rows)
+
+# --------------------------------- Presets -----------------------------------
+
+def benchmarkPresets(frames=60):
+    print "Pipeline presets on a synthetic hand moving in a circle"
+    gp = None
+    rows = []
+    for name in ["low-latency", "balanced", "accurate"]:
+        config = PipelineConfig(name)
+        width, height = config.cameraWidth, config.cameraHeight
+        source = syntheticHandFrames(width, height, frames)
+        if gp is None:
+            gp = makeProcessor(frames=source)
+        # Switched at runtime on the same processor
+        gp.cap = ReplayCapture(source)
+        gp.configure(config)
+        path = defaultPath(frames)
+        palmRadius = max(min(width, height) / 12, 4)
+        errors, fingers = [], []
+        start = time.time()
+        for i in xrange(frames):
+            gp.process()
+            x, y = path(i)
+            truth = np.array([(1 - x) * width, y * height])  # mirrored
+            errors.append(np.sqrt(((gp.palmCenter - truth) ** 2).sum()) /
+                          palmRadius)
+            fingers.append(gp.fingerCount == 5)
+        ms = (time.time() - start) * 1000.0 / frames
+        rows.append([name, "%dx%d" % (width, height), "%.2f" % ms,
+                     "%.2f" % np.mean(errors), "%.0f%%" % (100.0 *
+                                                        np.mean(fingers))])
+    printTable(["preset", "camera", "ms/frame", "palm err (radii)",
+                "5 fingers"], rows)
+
+# --------------------------------- Pointer -----------------------------------
+
+def benchmarkPointer(frames=60):
+    print "Capture to published position, replayed frames"
+    rows = []
+    for preset in ["balanced", "low-latency"]:
+        config = PipelineConfig(preset, motionGate=False)
+        source = syntheticHandFrames(config.cameraWidth, config.cameraHeight,
+                                     frames)
+        gp = makeProcessor(frames=source)
+        gp.configure(config)
+        latencies = []
+        for i in xrange(frames):
+            gp.process()
+            gp.getScaledCenter()
+            latencies.append(time.time() - gp.readTime)
+        rows.append([preset, "process() + getScaledCenter()"] +
+                    latencyColumns(latencies))
+        pointer = PointerMode(makeProcessor(frames=source))
+        pointer.processor.configure(config)
+        latencies = []
+        for i in xrange(frames):
+            pointer.step()
+            latencies.append(pointer.latency)
+        rows.append([preset, "PointerMode.step()"] + latencyColumns(latencies))
+    printTable(["preset", "mode", "mean ms", "p99 ms"], rows)
+    print
+    width, height = 1280, 720
+    # Jitter of a still hand shaking by a pixel or two, and lag following
+    # the default circle, with frames 1/30 s apart
+    rng = np.random.RandomState(0)
+    shake = rng.randn(frames, 2) * 1.5 / (width, height)
+    paths = [("still hand", lambda i: (0.5 + shake[i][0], 0.5 + shake[i][1])),
+             ("moving hand", defaultPath(frames))]
+    rows = []
+    for name, path in paths:
+        source = syntheticHandFrames(width, height, frames, path=path)
+        pointer = PointerMode(makeProcessor(frames=source))
+        pointer.processor.cap = ReplayCapture(source, frameRate=30)
+        raw, smoothed, truth = [], [], []
+        for i in xrange(frames):
+            timestamp, x, y = pointer.step()
+            raw.append(pointer.position)
+            smoothed.append((x * width, y * height))
+            x, y = path(i)
+            truth.append(((1 - x) * width, y * height))  # mirrored
+        raw, smoothed = np.array(raw), np.array(smoothed)
+        if name == "still hand":
+            rows.append([name, "jitter (std px)",
+                         "%.2f" % raw[10:].std(0).mean(),
+                         "%.2f" % smoothed[10:].std(0).mean()])
+        else:
+            rows.append([name, "tracking err (px)",
+                         "%.2f" % trackingError(raw, truth),
+                         "%.2f" % trackingError(smoothed, truth)])
+    printTable(["input", "measure", "raw", "One Euro"], rows)
+
+# The center of mass sits off the palm center, so the error is taken around
+# its mean to leave only the noise and lag
+def trackingError(positions, truth):
+    error = positions - np.array(truth)
+    error -= error.mean(0)
+    return np.sqrt((error ** 2).sum(1)).mean()
+
+def latencyColumns(latencies):
+    latencies = np.array(latencies) * 1000
+    return ["%.2f" % latencies.mean(), "%.2f" % np.percentile(latencies, 99)]
+
+# ---------------------------------- Hands ------------------------------------
+
+# Frames of hands side by side, each on a small circle of its own; returns
+# the frames, the palm radius and the (mirrored) palm centers per frame
+def multiHandFrames(width, height, count, hands, seed=0):
+    rng = np.random.RandomState(seed)
+    palmRadius = min(width / (hands * 6), height / 12)
+    frames, truths = [], []
+    for i in xrange(count):
+        frame = rng.randint(20, 40, (height, width, 3)).astype(np.uint8)
+        truth = []
+        for hand in xrange(hands):
+            angle = 2 * np.pi * i / count + hand
+            x = (hand + 0.5) * width / hands + palmRadius * np.cos(angle)
+            y = height * 0.55 + palmRadius * np.sin(angle)
+            drawSyntheticHand(frame, (x, y), palmRadius)
+            truth.append((width - 1 - x, y))
+        frames.append(frame)
+        truths.append(np.array(truth))
+    return frames, palmRadius, truths
+
+def benchmarkHands(frames=30):
+    width, height = 1280, 720
+    print "K hands at %dx%d, one processor following 1 or K of them" % (
+        width, height)
+    rows = []
+    for hands in xrange(1, 5):
+        source, palmRadius, truths = multiHandFrames(width, height, frames,
+                                                     hands)
+        row = [hands]
+        for maxHands in [1, hands]:
+            gp = makeProcessor(frames=source)
+            gp.configure(PipelineConfig(motionGate=False, maxHands=maxHands))
+            labels, switches, errors = {}, 0, []
+            start = time.time()
+            for i in xrange(frames):
+                gp.process()
+                if gp.multiHand is None:
+                    continue
+                for hand in gp.multiHand.hands:
+                    if hand.missed > 0:
+                        continue
+                    distances = np.sqrt(((truths[i] - hand.palmCenter) ** 2
+                                         ).sum(1))
+                    label = distances.argmin()
+                    errors.append(distances[label] / palmRadius)
+                    if labels.setdefault(hand.id, label) != label:
+                        switches += 1
+                        labels[hand.id] = label
+            row.append("%.2f" % ((time.time() - start) * 1000.0 / frames))
+        if gp.multiHand is None:
+            row += ["-", "-", "-"]
+        else:
+            row += [len(gp.multiHand.hands), switches,
+                    "%.2f" % np.mean(errors)]
+        rows.append(row)
+    printTable(["hands", "ms/frame (1)", "ms/frame (K)", "followed",
+                "id switches", "palm err (radii)"], rows)
+
+# -------------------------------- Frame bus ----------------------------------
+
+busChannels = ["original", "thresholded", "canvas"]
+
+# A viewer in another process, shrinking every image it gets for display:
+# from a queue of pickled copies, or in place from the frame bus
+def queueViewer(frames, results):
+    latencies = []
+    while True:
+        item = frames.get()
+        if item is None:
+            break
+        timestamp, images = item
+        for image in images:
+            cv2.resize(image, (640, 360))
+        latencies.append(time.time() - timestamp)
+    results.put((latencies, 0))
+
+def busViewer(directory, stop, results):
+    subscriber = FrameSubscriber(directory)
+    latencies = []
+    while not stop.is_set():
+        frame = subscriber.latest("original")
+        if frame is None:
+            time.sleep(0.001)
+            continue
+        cv2.resize(frame[2], (640, 360))
+        for name in busChannels[1:]:
+            other = subscriber.latest(name)
+            if other is not None:
+                cv2.resize(other[2], (640, 360))
+        latencies.append(time.time() - frame[1])
+    results.put((latencies, subscriber.dropped.get("original", 0)))
+
+def benchmarkBus(frames=60):
+    width, height = 1280, 720
+    source = syntheticHandFrames(width, height, frames)
+    print "Processor publishing %s at %dx%d to a viewer process (%d cores)" \
+        % ("/".join(busChannels), width, height, multiprocessing.cpu_count())
+    rows = []
+    for transport in ["none", "queue", "bus"]:
+        gp = makeProcessor(frames=source)
+        gp.motionGate = None
+        results = multiprocessing.Queue()
+        viewer = None
+        if transport == "queue":
+            queue = multiprocessing.Queue(maxsize=3)
+            viewer = multiprocessing.Process(target=queueViewer,
+                                             args=(queue, results))
+        elif transport == "bus":
+            gp.bus = FrameBus()
+            stop = multiprocessing.Event()
+            viewer = multiprocessing.Process(target=busViewer,
+                                             args=(gp.bus.directory, stop,
+                                                   results))
+        if viewer is not None:
+            viewer.start()
+        start = time.time()
+        for i in xrange(frames):
+            gp.process()
+            gp.draw(width / 2, height / 2)
+            if transport == "queue":
+                queue.put((gp.frameTime, [gp.original.copy(),
+                                          gp.thresholded.copy(),
+                                          gp.drawingCanvas.copy()]))
+        producer = (time.time() - start) * 1000.0 / frames
+        if viewer is None:
+            rows.append([transport, "%.2f" % producer, "-", "-", "-", "-"])
+            continue
+        if transport == "queue":
+            queue.put(None)
+        else:
+            time.sleep(0.1)
+            stop.set()
+        latencies, dropped = results.get()
+        viewer.join()
+        if gp.bus is not None:
+            gp.bus.close()
+        rows.append([transport, "%.2f" % producer, len(latencies), dropped] +
+                    latencyColumns(latencies))
+    printTable(["transport", "producer ms/frame", "viewed", "skipped",
+                "mean latency ms", "p99 latency ms"], rows)
+
+# -------------------------------- Snapshots ----------------------------------
+
+# Frames processed until the processor can classify gestures, from its
+# construction
+def framesUntilGestures(gp, limit=60):
+    for i in xrange(limit):
+        gp.process()
+        if gp.canDoGestures:
+            return i + 1
+    return None
+
+def benchmarkSnapshot(frames=30):
+    directory = tempfile.mkdtemp(prefix="snapshot")
+    gestureFile = os.path.join(directory, "gestures.txt")
+    snapshotFile = os.path.join(directory, "processor.snapshot")
+    source = syntheticHandFrames(1280, 720, frames)
+    print "Restarting a processor: loading the gesture file, or a snapshot"
+    rows = []
+    for count in [11, 1000, 10000]:
+        randomLibrary(count).write(gestureFile)
+        start = time.time()
+        gp = GestureProcessor(gestureFile,
+                              ReplayCapture(source, frameRate=30))
+        cold = (time.time() - start) * 1000.0
+        coldFrames = framesUntilGestures(gp)
+        gp.snapshot(snapshotFile)
+        start = time.time()
+        warm = GestureProcessor(gestureFile,
+                                ReplayCapture(source, frameRate=30),
+                                snapshot=snapshotFile)
+        restored = (time.time() - start) * 1000.0
+        warmFrames = framesUntilGestures(warm)
+        assert len(warm.gestures) == len(gp.gestures)
+        rows.append([count, "%.1f" % cold, coldFrames, "%.1f" % restored,
+                     warmFrames, "%.1f" % (os.path.getsize(snapshotFile) /
+                                            1024.0 ** 2)])
+    printTable(["templates", "cold start ms", "frames to gestures",
+                "restore ms", "frames to gestures", "snapshot MB"], rows)
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+# --------------------------------- Tracing -----------------------------------
+
+# (name, category, start, milliseconds) of every begin/end pair of a trace
+def traceSpans(trace):
+    pending, spans = [], []
+    for event in trace["traceEvents"]:
+        if event["ph"] == "B":
+            pending.append(event)
+        elif event["ph"] == "E":
+            begin = pending.pop()
+            spans.append((begin["name"], begin["cat"], begin["ts"],
+                          (event["ts"] - begin["ts"]) / 1000.0))
+    return spans
+
+def benchmarkTrace(frames=60):
+    source = syntheticHandFrames(1280, 720, frames)
+    directory = tempfile.mkdtemp(prefix="trace")
+    print "process() + draw(), untraced and traced; every 20th frame is " \
+        "followed by a 100 ms stall in a fake redraw"
+    rows = []
+    for traced in [False, True]:
+        gp = makeProcessor(frames=source)
+        gp.motionGate = None
+        if traced:
+            gp.tracer = FrameTracer(slowFrameMs=80, slowPath=os.path.join(
+                directory, "frame%d.json"))
+        times = []
+        for i in xrange(frames):
+            start = time.time()
+            gp.process()
+            gp.draw(640, 360)
+            times.append(time.time() - start)
+            if i % 20 == 10:
+                traceCall(gp.tracer, "redraw", "display", time.sleep, 0.1)
+        row = ["traced" if traced else "untraced",
+               "%.2f" % (np.median(times) * 1000)]
+        if traced:
+            tracer = gp.tracer
+            dumpStart = time.time()
+            tracer.dump(os.path.join(directory, "all.json"))
+            row += ["%.0f" % (len(tracer.events) / float(frames)),
+                    "%.1f" % ((time.time() - dumpStart) * 1000),
+                    tracer.slowFrames, len(os.listdir(directory)) - 1]
+        else:
+            row += ["-", "-", "-", "-"]
+        rows.append(row)
+    printTable(["mode", "median ms/frame", "events/frame", "dump ms",
+                "slow frames", "slow dumps"], rows)
+    # What the first slow frame dump shows
+    with open(os.path.join(directory, "frame10.json")) as fin:
+        spans = traceSpans(json.load(fin))
+    print
+    print "Longest spans in frame10.json, besides whole frames:"
+    spans = [span for span in spans if span[1] != "frame"]
+    spans.sort(key=lambda span: -span[3])
+    printTable(["name", "category", "ms"],
+               [[name, category, "%.2f" % ms]
+                for name, category, at, ms in spans[:5]])
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+# --------------------------------- Results -----------------------------------
+
+# The per-frame work as it was before FrameResult: the trail and distance
+# computed every frame, and the scaled center once per call
+def legacyDerived(gp, reads):
+    recent = []
+    if len(gp.handCenterPositions) > 10:
+        recent = sorted(gp.handCenterPositions[-gp.config.historyLength:])
+        xs = [pos[0] for pos in recent]
+        ys = [pos[1] for pos in recent]
+    distance = (gp.cameraWidth + gp.cameraHeight) / float(gp.palmRadius)
+    for i in xrange(reads):
+        (gp.palmCenter / np.array([gp.cameraWidth, gp.cameraHeight],
+                                  dtype=np.float32)).round(3)
+    return recent, distance
+
+def resultDerived(gp, reads):
+    result = FrameResult(
+        timestamp=gp.frameTime, skipped=False, palmCenter=gp.palmCenter,
+        palmRadius=gp.palmRadius, cameraSize=(gp.cameraWidth,
+                                              gp.cameraHeight),
+        hullPoints=gp.hullPoints, defects=gp.defects,
+        fingertips=gp.fingertips, fingerCount=gp.fingerCount, pose=gp.pose,
+        lastAction=gp.lastAction, positions=gp.handCenterPositions,
+        positionCount=len(gp.handCenterPositions),
+        historyLength=gp.config.historyLength)
+    if reads > 0:
+        for i in xrange(reads):
+            result.scaledCenter
+        result.distance
+        result.recentPositions
+    return result
+
+def benchmarkResults(repeat=20000):
+    gp = makeProcessor(count=30)
+    for i in xrange(30):
+        gp.process()
+    print "Derived per-frame values, microseconds per frame"
+    rows = []
+    for reads, consumer in [(0, "nobody reads them"),
+                            (5, "demo: 5 scaled centers, distance, trail")]:
+        rows.append([consumer,
+                     "%.1f" % (timeCalls(lambda: legacyDerived(gp, reads),
+                                         repeat) * 1000),
+                     "%.1f" % (timeCalls(lambda: resultDerived(gp, reads),
+                                         repeat) * 1000)])
+    printTable(["consumer", "eager (before)", "FrameResult"], rows)
+
+# --------------------------------- Imports -----------------------------------
+
+# Run in a fresh interpreter: imports the module and prints the import time,
+# the peak memory (KB) and whether OpenCV and Tkinter came along, as JSON
+importProbe = """
+import sys, time, json, resource
+start = time.time()
+import %s
+ms = (time.time() - start) * 1000.0
+print json.dumps([ms, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "cv2" in sys.modules, "Tkinter" in sys.modules])
+"""
+
+def probeImport(module, runs):
+    probes = [json.loads(subprocess.check_output(
+                  [sys.executable, "-c", importProbe % module]))
+              for i in xrange(runs)]
+    ms = sorted(probe[0] for probe in probes)[runs // 2]
+    kb = sorted(probe[1] for probe in probes)[runs // 2]
+    return [module, "%.1f" % ms, "%.1f" % (kb / 1024.0),
+            "yes" if probes[0][2] else "no", "yes" if probes[0][3] else "no"]
+
+def benchmarkImports(runs=5, trials=5):
+    print "Importing in a fresh interpreter (median of %d)" % runs
+    printTable(["module", "import ms", "peak MB", "cv2", "Tkinter"],
+               [probeImport(module, runs)
+                for module in ["numpy", "gestureCore", "GesturesApi"]])
+    print
+    # Server side: trajectories sent by a client, no camera or OpenCV
+    start = time.time()
+    core = GestureCore("")  # the default gestures, never written back
+    setupMs = (time.time() - start) * 1000.0
+    for name in set(core.getGestureNames()):
+        core.bind(name, lambda: None)  # quiet default actions
+    rng = np.random.RandomState(0)
+    cases = []
+    for gesture in core.gestures:
+        for i in xrange(trials):
+            positions, times = handTrajectory(gesture, rng)
+            cases.append((gesture.name, [tuple(position) for position in
+                                         np.round(positions).astype(int)],
+                          times))
+    streamed, count, start = 0, 0, time.time()
+    for name, positions, times in cases:
+        # One core per client, sharing the library
+        client = GestureCore("", gestures=core.gestures)
+        fired = [client.addPosition(position, at)
+                 for position, at in zip(positions, times)]
+        streamed += [found for found in fired if found] == [name]
+        count += len(positions)
+    streamUs = (time.time() - start) * 1e6 / count
+    # The strokes alone, without the stillness around them
+    strokes = [(name, positions[18:49], times[18:49])
+               for name, positions, times in cases]
+    start = time.time()
+    found = [core.classifyTrajectory(positions, times)
+             for name, positions, times in strokes]
+    strokeMs = (time.time() - start) * 1000.0 / len(strokes)
+    whole = sum(result == name for result, (name, _, _) in zip(found,
+                                                                strokes))
+    print "GestureCore on %d default gestures drawn in 1 s at 30 fps" % len(
+        cases)
+    printTable(["", "value"],
+               [["construction ms", "%.1f" % setupMs],
+                ["addPosition us", "%.1f" % streamUs],
+                ["recognized, streamed", "%d/%d" % (streamed, len(cases))],
+                ["classifyTrajectory ms", "%.2f" % strokeMs],
+                ["recognized, whole strokes", "%d/%d" % (whole, len(cases))]])
+
+
+benchmarks = {"allocations": benchmarkAllocations,
+              "background": benchmarkBackground,
+              "bus": benchmarkBus,
+              "classifier": benchmarkClassifier,
+              "consolidation": benchmarkConsolidation,
+              "contours": benchmarkContours,
+              "display": benchmarkDisplay,
+              "hands": benchmarkHands,
+              "imports": benchmarkImports,
+              "library": benchmarkLibrary,
+              "motion": benchmarkMotionGate,
+              "overlay": benchmarkOverlay,
+              "pointer": benchmarkPointer,
+              "poses": benchmarkPoses,
+              "presets": benchmarkPresets,
+              "results": benchmarkResults,
+              "scheduler": benchmarkScheduler,
+              "sharding": benchmarkSharding,
+              "skin": benchmarkSkinLut,
+              "snapshot": benchmarkSnapshot,
+              "timing": benchmarkTiming,
+              "trace": benchmarkTrace,
+              "tracker": benchmarkTracker}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or sorted(benchmarks)
+    for name in names:
+        benchmarks[name]()
+        print
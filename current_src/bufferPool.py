@@ -0,0 +1,33 @@
+import numpy as np
+
+# Keeps one preallocated array per named image stage so that the processor
+# can hand the same memory to OpenCV (through the dst= arguments) on every
+# frame. A buffer is only reallocated when the requested shape or type changes,
+# which in practice only happens when the camera resolution changes.
+class BufferPool(object):
+    def __init__(self):
+        self.buffers = {}
+        self.allocations = 0
+        self.allocatedBytes = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self.adopt(name, buf)
+        return buf
+
+    # Buffer with the same shape and type as image
+    def like(self, name, image):
+        return self.get(name, image.shape, image.dtype)
+
+    # Used when OpenCV had to allocate for us anyway (i.e. the camera ignored
+    # the requested resolution), so that the next frame reuses its array
+    def adopt(self, name, buf):
+        self.buffers[name] = buf
+        self.allocations += 1
+        self.allocatedBytes += buf.nbytes
+
+    def clear(self):
+        self.buffers = {}
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from bufferPool import BufferPool
+
+
+class BufferPoolTest(unittest.TestCase):
+    def testSameShapeReusesBuffer(self):
+        pool = BufferPool()
+        first = pool.get("grey", (4, 6))
+        self.assertIs(pool.get("grey", (4, 6)), first)
+        self.assertEqual(pool.allocations, 1)
+        self.assertEqual(pool.allocatedBytes, 24)
+
+    def testShapeOrTypeChangeReallocates(self):
+        pool = BufferPool()
+        first = pool.get("grey", (4, 6))
+        resized = pool.get("grey", (8, 6))
+        self.assertIsNot(resized, first)
+        self.assertEqual(resized.shape, (8, 6))
+        retyped = pool.get("grey", (8, 6), np.float32)
+        self.assertEqual(retyped.dtype, np.float32)
+        self.assertEqual(pool.allocations, 3)
+
+    def testLikeMatchesImage(self):
+        pool = BufferPool()
+        image = np.zeros((3, 5, 3), np.uint8)
+        buf = pool.like("original", image)
+        self.assertEqual((buf.shape, buf.dtype), (image.shape, image.dtype))
+        self.assertIs(pool.like("original", image), buf)
+
+    # An adopted array (i.e. from a camera ignoring the requested size) is
+    # handed out for its shape from then on
+    def testAdoptedBufferIsReused(self):
+        pool = BufferPool()
+        captured = np.zeros((2, 2, 3), np.uint8)
+        pool.adopt("capture", captured)
+        self.assertIs(pool.get("capture", (2, 2, 3)), captured)
+        self.assertEqual(pool.allocations, 1)
+
+    def testNamesAreSeparate(self):
+        pool = BufferPool()
+        self.assertIsNot(pool.get("grey", (4, 4)), pool.get("blurred",
+                                                             (4, 4)))
+        pool.clear()
+        self.assertEqual(pool.buffers, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+# Finds the hand contour in the thresholded image with bounded cost:
+#  - only external contours are retrieved, as the hierarchy is never used
+#  - contours of fewer than three points are dropped without looking at them,
+#    then the bounding rect area (an upper bound of the area) is used to
+#    drop tiny blobs and to stop computing exact areas as soon as no
+#    remaining contour can beat the largest one found so far
+#  - the hand contour is simplified with approxPolyDP, raising the epsilon
+#    until it has at most maxPoints points, so noisy contours can't blow up
+#    the cost of the hull, defects and palm center stages
+# Counts from the last frame are kept in self.stats.
+class ContourEngine(object):
+    def __init__(self, minArea=100, maxPoints=256, epsilonFactor=0.001):
+        self.minArea = minArea
+        self.maxPoints = maxPoints
+        # Starting epsilon as a fraction of the contour's arc length
+        self.epsilonFactor = epsilonFactor
+        self.stats = {}
+
+    def extract(self, mask):
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_SIMPLE)
+        self.stats["contours"] = len(contours)
+        return contours
+
+    # Index of the contour with the largest area, or None if all of them are
+    # smaller than minArea
+    def largest(self, contours):
+        indices = self.largestK(contours, 1)
+        if len(indices) == 0:
+            return None
+        return indices[0]
+
+    # Indices of the (at most) k largest contours of at least minArea, largest
+    # first, from the same single pass
+    def largestK(self, contours, k):
+        # Contours of one or two points (single pixel specks, thin lines)
+        # have no area at all; dropping them first only needs their lengths,
+        # so their bounding rects are never computed
+        sizes = np.fromiter(map(len, contours), np.int32, len(contours))
+        bounds = []
+        for i in np.flatnonzero(sizes > 2):
+            x, y, w, h = cv2.boundingRect(contours[i])
+            if w * h >= self.minArea:
+                bounds.append((w * h, i))
+        bounds.sort(reverse=True)
+        best, exactAreas = [], 0  # (area, index), largest first
+        for bound, i in bounds:
+            # No contour left can beat the kth largest so far
+            if len(best) == k and bound <= best[-1][0]:
+                break
+            area = cv2.contourArea(contours[i])
+            exactAreas += 1
+            if area > 0 and (len(best) < k or area > best[-1][0]):
+                best.append((area, i))
+                best.sort(reverse=True)
+                del best[k:]
+        self.stats["candidates"] = len(bounds)
+        self.stats["exactAreas"] = exactAreas
+        return [i for area, i in best]
+
+    # Returns the simplified contour and the arc length of the original
+    def simplify(self, contour):
+        length = cv2.arcLength(contour, True)
+        epsilon = self.epsilonFactor * length
+        simplified = cv2.approxPolyDP(contour, epsilon, True)
+        while len(simplified) > self.maxPoints:
+            epsilon *= 2
+            simplified = cv2.approxPolyDP(contour, epsilon, True)
+        self.stats["contourPoints"] = len(contour)
+        self.stats["handPoints"] = len(simplified)
+        self.stats["epsilon"] = epsilon
+        return simplified, length
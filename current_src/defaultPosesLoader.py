@@ -0,0 +1,49 @@
+import numpy as np
+
+# (name, features) pairs of the default static poses, as measured from drawn
+# hands by measurePose. Kept as constants so that loading them needs neither
+# OpenCV nor the replay helpers; run this file to measure them again.
+defaultPoses = [
+    ("Fist", [-0.798114, -8.0, -8.0, -8.0, -8.0, -8.0, -8.0,
+              0.0, 0.986345]),
+    ("Pointing", [-0.669622, -2.06796, -2.32102, -2.73949, -5.26975,
+                  -3.77348, -8.0, 1.0, 0.809592]),
+    ("Peace", [-0.64201, -1.86765, -2.62856, -2.85212, -5.59246, -3.78596,
+               -8.0, 2.0, 0.74711]),
+    ("Open Palm", [-0.656446, -3.31076, -2.71906, -3.57126, -6.7174,
+                   -5.22666, -7.88978, 5.0, 0.651804]),
+]
+defaultPoses = [(name, np.array(features, np.float32))
+                for name, features in defaultPoses]
+
+# Draws a hand with the given number of fingers and measures it the same way
+# the processor does
+def measurePose(fingers):
+    import cv2
+    from poseClassifier import PoseClassifier
+    from handShape import HandShapeAnalyzer
+    from replayCapture import drawSyntheticHand
+    if hasattr(cv2, "DIST_L2"):
+        distanceType = cv2.DIST_L2
+    else:
+        distanceType = cv2.cv.CV_DIST_L2  # OpenCV 2.4
+    size, palmRadius = 400, 40
+    mask = np.zeros((size, size), np.uint8)
+    drawSyntheticHand(mask, (size / 2, size / 2 + palmRadius), palmRadius,
+                      fingers=fingers, color=255)
+    contours, _ = cv2.findContours(mask.copy(), cv2.RETR_EXTERNAL,
+                                   cv2.CHAIN_APPROX_SIMPLE)
+    contour = max(contours, key=cv2.contourArea)
+    contour = cv2.approxPolyDP(contour, 0.001 * cv2.arcLength(contour, True),
+                               True)
+    # Palm center: the point furthest from the background
+    distances = cv2.distanceTransform(mask, distanceType, 5)
+    palmY, palmX = np.unravel_index(distances.argmax(), distances.shape)
+    return PoseClassifier.featuresFromContour(contour, (palmX, palmY),
+                                              distances.max(),
+                                              HandShapeAnalyzer())
+
+if __name__ == "__main__":
+    for name, fingers in [("Fist", 0), ("Pointing", 1), ("Peace", 2),
+                          ("Open Palm", 5)]:
+        print name, [float("%.6g" % value) for value in measurePose(fingers)]
@@ -15,6 +15,9 @@ class EventBasedAnimationClass(object):
         self.width = width
         self.height = height
         self.timerDelay = 250 # in milliseconds (set to None to turn off timer)
+        # Optional FrameScheduler, which then decides when to redraw and when
+        # the next tick should be (timerDelay still turns the timer on/off)
+        self.scheduler = None
 
     def onMousePressedWrapper(self, event):
         self.onMousePressed(event)
@@ -27,9 +30,13 @@ class EventBasedAnimationClass(object):
     def onTimerFiredWrapper(self):
         if (self.timerDelay == None):
             return # turns off timer
-        self.onTimerFired()
-        self.redrawAll()
-        self.canvas.after(self.timerDelay, self.onTimerFiredWrapper)         
+        if (self.scheduler == None):
+            self.onTimerFired()
+            self.redrawAll()
+            self.canvas.after(self.timerDelay, self.onTimerFiredWrapper)
+        else:
+            delay = self.scheduler.tick(self.onTimerFired, self.redrawAll)
+            self.canvas.after(delay, self.onTimerFiredWrapper)
 
     def run(self):
         # create the root and the canvas
@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+
+# Memory backed directory for the ring files where the system has one, so
+# that frames are only ever in RAM
+sharedMemoryDirectory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Publishes the processor's images (the camera frame, the thresholded mask,
+# the overlay) to any number of readers in other threads or processes,
+# without a copy per reader. Every named channel is a ring of slots in a
+# memory mapped .npy file, next to a small file of sequence numbers: the
+# writer marks the next slot as being written, fills it and then publishes
+# its sequence number, so readers (FrameSubscriber) can map the same files
+# and read the latest slot in place. Producers either fill a slot directly
+# (claim, then commit) or copy a finished image in (publish). A channel whose
+# frame shape changes (i.e. a new camera resolution) moves to a new ring
+# file, its generation. Set as GestureProcessor.bus, and close it (or the
+# processor) when done.
+class FrameBus(object):
+    def __init__(self, directory=None, slots=3):
+        self.ownsDirectory = directory is None
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="frames",
+                                         dir=sharedMemoryDirectory)
+        self.directory = directory
+        self.slots = slots
+        self.channels = {}  # name -> FrameChannel
+        self.claimed = {}  # name -> sequence being written
+
+    # The next slot of the channel, to be filled and then committed; readers
+    # never see a slot while it is claimed
+    def claim(self, name, shape, dtype=np.uint8):
+        channel = self.channels.get(name)
+        if channel is None:
+            channel = FrameChannel.create(self.directory, name, self.slots)
+            self.channels[name] = channel
+        if (channel.ring is None or channel.ring.shape[1:] != tuple(shape) or
+                channel.ring.dtype != dtype):
+            channel.resize(shape, dtype)
+        sequence = int(channel.sequences[1]) + 1
+        channel.sequences[2 + sequence % self.slots] = -1
+        self.claimed[name] = sequence
+        return channel.ring[sequence % self.slots]
+
+    # Publishes the claimed slot, with the capture time of its frame
+    def commit(self, name, timestamp=0.0):
+        channel = self.channels[name]
+        sequence = self.claimed.pop(name)
+        channel.times[sequence % self.slots] = timestamp
+        channel.sequences[2 + sequence % self.slots] = sequence
+        channel.sequences[1] = sequence
+
+    def publish(self, name, frame, timestamp=0.0):
+        np.copyto(self.claim(name, frame.shape, frame.dtype), frame)
+        self.commit(name, timestamp)
+
+    def close(self):
+        self.channels = {}
+        if self.ownsDirectory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+# The files of one channel. sequences holds the generation of the ring file,
+# the latest published sequence number and the sequence number in each slot
+# (-1 while it is written); times the capture time of each slot.
+class FrameChannel(object):
+    def __init__(self, directory, name, sequences, times):
+        self.directory = directory
+        self.name = name
+        self.sequences = sequences
+        self.times = times
+        self.generation = None
+        self.ring = None
+
+    @staticmethod
+    def path(directory, name, part):
+        return os.path.join(directory, "%s.%s.npy" % (name, part))
+
+    # The files are written under a temporary name and renamed into place, so
+    # readers never open a partly written header
+    @staticmethod
+    def create(directory, name, slots):
+        arrays = []
+        for part, dtype, length in [("sequences", np.int64, slots + 2),
+                                    ("times", np.float64, slots)]:
+            path = FrameChannel.path(directory, name, part)
+            array = np.lib.format.open_memmap(path + ".tmp", mode="w+",
+                                              dtype=dtype, shape=(length,))
+            os.rename(path + ".tmp", path)
+            arrays.append(array)
+        return FrameChannel(directory, name, *arrays)
+
+    # Opens a channel published by a FrameBus, or returns None if nothing
+    # has been published to it yet
+    @staticmethod
+    def open(directory, name):
+        paths = [FrameChannel.path(directory, name, part)
+                 for part in ["sequences", "times"]]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        return FrameChannel(directory, name,
+                            *[np.load(path, mmap_mode="r") for path in paths])
+
+    # Writer side: a new ring file for frames of another shape or type
+    def resize(self, shape, dtype):
+        generation = int(self.sequences[0]) + 1
+        path = FrameChannel.path(self.directory, self.name, generation)
+        self.ring = np.lib.format.open_memmap(
+            path, mode="w+", dtype=dtype,
+            shape=(len(self.times),) + tuple(shape))
+        self.sequences[2:] = 0
+        self.sequences[0] = generation
+        if self.generation is not None:
+            os.remove(FrameChannel.path(self.directory, self.name,
+                                        self.generation))
+        self.generation = generation
+
+    # Reader side: maps the current ring file, if it changed
+    def remap(self):
+        generation = int(self.sequences[0])
+        if generation != self.generation:
+            path = FrameChannel.path(self.directory, self.name, generation)
+            try:
+                self.ring = np.load(path, mmap_mode="r")
+            except IOError:  # replaced again since sequences was read
+                return False
+            self.generation = generation
+        return True
+
+# Reads the channels of a FrameBus, from any thread or process, given its
+# directory. latest returns the newest frame as a read only view into the
+# ring, skipping any frames published since the last call (counted in
+# dropped). The view stays valid until the writer comes back around to its
+# slot, slots - 1 frames later; check with valid() before trusting a frame
+# kept longer than that, or copy it.
+class FrameSubscriber(object):
+    def __init__(self, directory):
+        self.directory = directory
+        self.channels = {}
+        self.seen = {}  # name -> last sequence returned
+        self.dropped = {}
+
+    # (sequence, timestamp, frame) of the newest frame on the channel, or
+    # None if there is nothing newer than the last call
+    def latest(self, name):
+        channel = self.channels.get(name)
+        if channel is None:
+            channel = FrameChannel.open(self.directory, name)
+            if channel is None:
+                return None
+            self.channels[name] = channel
+            self.seen[name] = 0
+            self.dropped[name] = 0
+        slots = len(channel.times)
+        for attempt in xrange(slots):
+            sequence = int(channel.sequences[1])
+            if sequence <= self.seen[name] or not channel.remap():
+                return None
+            slot = sequence % slots
+            timestamp = channel.times[slot]
+            if int(channel.sequences[2 + slot]) == sequence:
+                break
+        else:
+            return None  # the writer keeps overtaking this reader
+        if self.seen[name] > 0:
+            self.dropped[name] += sequence - self.seen[name] - 1
+        self.seen[name] = sequence
+        return sequence, timestamp, channel.ring[slot]
+
+    # Whether the slot of a frame from latest still holds that frame
+    def valid(self, name, sequence):
+        channel = self.channels[name]
+        slots = len(channel.times)
+        return int(channel.sequences[2 + sequence % slots]) == sequence
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from frameBus import FrameBus, FrameSubscriber
+
+
+def frame(value, shape=(4, 6)):
+    return np.full(shape, value, np.uint8)
+
+
+class FrameBusTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = FrameBus(slots=3)
+        self.subscriber = FrameSubscriber(self.bus.directory)
+
+    def tearDown(self):
+        self.bus.close()
+
+    def testNothingPublished(self):
+        self.assertIsNone(self.subscriber.latest("original"))
+
+    def testLatestSkipsOlderFrames(self):
+        for value in xrange(1, 5):
+            self.bus.publish("original", frame(value), value / 10.0)
+        sequence, timestamp, image = self.subscriber.latest("original")
+        self.assertEqual(sequence, 4)
+        self.assertAlmostEqual(timestamp, 0.4)
+        self.assertTrue((image == 4).all())
+        self.assertIsNone(self.subscriber.latest("original"))
+        self.bus.publish("original", frame(5))
+        self.bus.publish("original", frame(6))
+        self.assertEqual(self.subscriber.latest("original")[0], 6)
+        self.assertEqual(self.subscriber.dropped["original"], 1)
+
+    # Readers keep the last committed frame while the next one is written
+    def testClaimedSlotIsNotRead(self):
+        self.bus.publish("original", frame(1))
+        slot = self.bus.claim("original", (4, 6))
+        slot.fill(2)
+        self.assertEqual(self.subscriber.latest("original")[0], 1)
+        self.bus.commit("original", 0.5)
+        sequence, timestamp, image = self.subscriber.latest("original")
+        self.assertEqual(sequence, 2)
+        self.assertTrue((image == 2).all())
+
+    def testFrameOverwrittenAfterSlots(self):
+        self.bus.publish("original", frame(1))
+        sequence = self.subscriber.latest("original")[0]
+        self.bus.publish("original", frame(2))
+        self.bus.publish("original", frame(3))
+        self.assertTrue(self.subscriber.valid("original", sequence))
+        self.bus.publish("original", frame(4))
+        self.assertFalse(self.subscriber.valid("original", sequence))
+
+    # A new frame size moves the channel to a new ring file
+    def testResizedFrames(self):
+        self.bus.publish("original", frame(1))
+        self.subscriber.latest("original")
+        self.bus.publish("original", frame(7, (8, 2)))
+        sequence, timestamp, image = self.subscriber.latest("original")
+        self.assertEqual(sequence, 2)
+        self.assertEqual(image.shape, (8, 2))
+        self.assertTrue((image == 7).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
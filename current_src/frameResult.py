@@ -0,0 +1,56 @@
+import numpy as np
+
+# What GestureProcessor.process() found in one frame, as returned by it. The
+# measurements refer to the processor's arrays of that frame rather than
+# copies (the stages replace their arrays every frame instead of writing into
+# them), and the values consumers derive from them (scaledCenter, distance,
+# recentPositions) are computed the first time they are read and kept for
+# the frame, so a frame nobody asks about costs no more than this object.
+# Read only.
+class FrameResult(object):
+    fields = ("timestamp", "skipped", "palmCenter", "palmRadius",
+              "cameraSize", "hullPoints", "defects", "fingertips",
+              "fingerCount", "pose", "lastAction", "positions",
+              "positionCount", "historyLength")
+    __slots__ = fields + ("_scaledCenter", "_distance", "_recentPositions")
+
+    def __init__(self, **values):
+        for name in FrameResult.fields:
+            object.__setattr__(self, name, values[name])
+        for name in ["_scaledCenter", "_distance", "_recentPositions"]:
+            object.__setattr__(self, name, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Frame Results Are Read Only")
+
+    # Palm center as a fraction of the camera size, rounded to 3 places
+    def getScaledCenter(self):
+        if self._scaledCenter is None:
+            center = (self.palmCenter / np.array(self.cameraSize,
+                                                 dtype=np.float32)).round(3)
+            center.flags.writeable = False
+            object.__setattr__(self, "_scaledCenter", center)
+        return self._scaledCenter
+
+    # Grows as the hand gets closer: the camera size over the palm radius
+    def getDistance(self):
+        if self._distance is None:
+            object.__setattr__(self, "_distance", sum(self.cameraSize) /
+                               float(self.palmRadius))
+        return self._distance
+
+    # The palm centers of the last historyLength frames (sorted), for
+    # drawing the trail; empty until there are enough of them
+    def getRecentPositions(self):
+        if self._recentPositions is None:
+            count = self.positionCount
+            recent = ()
+            if count > 10:
+                start = max(count - self.historyLength, 0)
+                recent = tuple(sorted(self.positions[start:count]))
+            object.__setattr__(self, "_recentPositions", recent)
+        return self._recentPositions
+
+    scaledCenter = property(getScaledCenter)
+    distance = property(getDistance)
+    recentPositions = property(getRecentPositions)
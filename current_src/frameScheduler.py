@@ -0,0 +1,92 @@
+import time
+from collections import deque
+
+# Schedules the processing/redraw loop against a frame deadline instead of a
+# fixed delay after each frame. The cost of processing and redrawing is
+# measured every tick, and the next tick is scheduled relative to the start
+# of the current one, so the frame period is the deadline rather than the
+# deadline plus the work. When the loop falls behind, redraws are skipped
+# (never processing, so no frames are lost to gesture detection), and the
+# display can be limited to a lower rate than processing with displayInterval.
+# All times are in milliseconds.
+class FrameScheduler(object):
+    def __init__(self, deadline=1000 / 30.0, displayInterval=None,
+                 maxSkippedRedraws=5, clock=time.time):
+        self.deadline = float(deadline)
+        # Minimum time between redraws, defaults to redrawing every frame
+        self.displayInterval = displayInterval
+        # Redraw anyway after this many skipped redraws in a row
+        self.maxSkippedRedraws = maxSkippedRedraws
+        self.clock = clock
+        self.smoothing = 0.1
+        self.processCost = 0.0
+        self.redrawCost = 0.0
+        self.frames = 0
+        self.redraws = 0
+        self.deadlineMisses = 0
+        self.skippedRedraws = 0
+        self.skippedInARow = 0
+        self.lastRedraw = None
+        self.nextStart = None
+        self.frameTimes = deque(maxlen=30)
+        self.redrawTimes = deque(maxlen=30)
+
+    def now(self):
+        return self.clock() * 1000.0
+
+    def average(self, old, new):
+        return old + self.smoothing * (new - old)
+
+    # Runs one frame and returns the delay (in whole milliseconds, at least 1
+    # so the GUI can still handle events) until the next one should start
+    def tick(self, process, redraw):
+        start = self.now()
+        if self.nextStart is None or start - self.nextStart > self.deadline:
+            # First frame, or so far behind that catching up is pointless
+            self.nextStart = start
+        deadline = self.nextStart + self.deadline
+        process()
+        processed = self.now()
+        self.processCost = self.average(self.processCost, processed - start)
+        self.frames += 1
+        self.frameTimes.append(start)
+        if self.shouldRedraw(processed, deadline):
+            redraw()
+            end = self.now()
+            self.redrawCost = self.average(self.redrawCost, end - processed)
+            self.redraws += 1
+            self.skippedInARow = 0
+            self.lastRedraw = processed
+            self.redrawTimes.append(processed)
+        else:
+            end = self.now()
+            self.skippedRedraws += 1
+            self.skippedInARow += 1
+        if end > deadline:
+            self.deadlineMisses += 1
+        self.nextStart = deadline
+        return max(int(round(self.nextStart - end)), 1)
+
+    def shouldRedraw(self, processed, deadline):
+        if self.lastRedraw is not None and self.displayInterval is not None \
+           and processed - self.lastRedraw < self.displayInterval:
+            return False
+        if processed + self.redrawCost > deadline and \
+           self.skippedInARow < self.maxSkippedRedraws:
+            return False
+        return True
+
+    @staticmethod
+    def rate(times):
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) * 1000.0 / (times[-1] - times[0])
+
+    # Achieved processing rate over the last few frames
+    @property
+    def fps(self):
+        return FrameScheduler.rate(self.frameTimes)
+
+    @property
+    def displayFps(self):
+        return FrameScheduler.rate(self.redrawTimes)
@@ -0,0 +1,80 @@
+import unittest
+from frameScheduler import FrameScheduler
+
+
+# Clock in seconds which only moves when the test says so
+class FakeClock(object):
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, ms):
+        self.time += ms / 1000.0
+
+    # A stage which takes the given number of milliseconds
+    def work(self, ms):
+        return lambda: self.advance(ms)
+
+
+class FrameSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = FrameScheduler(deadline=30, clock=self.clock)
+
+    # Runs a tick with the given costs and waits out the returned delay
+    def tick(self, processMs, redrawMs=0):
+        delay = self.scheduler.tick(self.clock.work(processMs),
+                                    self.clock.work(redrawMs))
+        self.clock.advance(delay)
+        return delay
+
+    # The delay is what is left of the frame period, not a fixed pause
+    def testDelayIsRestOfDeadline(self):
+        self.assertEqual(self.tick(10, 5), 15)
+        self.assertEqual(self.tick(20, 5), 5)
+        self.assertEqual(self.scheduler.deadlineMisses, 0)
+        self.assertAlmostEqual(self.scheduler.fps, 1000 / 30.0)
+
+    # After one slow frame the next starts right away and the loop gets back
+    # onto its original schedule, rather than starting a new one late
+    def testCatchesUpAfterSlowFrame(self):
+        self.assertEqual(self.tick(40), 1)
+        self.assertEqual(self.scheduler.deadlineMisses, 1)
+        self.assertEqual(self.tick(10), 9)  # ends at 50, due at 60
+        self.assertAlmostEqual(self.clock.time * 1000, 60)
+        self.assertEqual(self.tick(10), 20)
+        self.assertAlmostEqual(self.clock.time * 1000, 90)
+
+    # More than a whole frame behind, the schedule restarts from now instead
+    # of running a burst of frames to catch up
+    def testRestartsWhenFarBehind(self):
+        self.tick(10)
+        self.clock.advance(100)  # i.e. a dialog blocked the loop
+        self.assertEqual(self.tick(10), 20)
+        self.assertAlmostEqual(self.clock.time * 1000, 160)
+
+    # Redraws are dropped while they would miss the deadline, but never more
+    # than maxSkippedRedraws in a row; processing always runs
+    def testSkipsRedrawsWhenBehind(self):
+        self.scheduler.maxSkippedRedraws = 2
+        self.tick(5, 200)  # teaches the scheduler that redraws are slow
+        redraws = self.scheduler.redraws
+        for i in xrange(3):
+            self.tick(5, 200)
+        self.assertEqual(self.scheduler.frames, 4)
+        self.assertEqual(self.scheduler.skippedRedraws, 2)
+        self.assertEqual(self.scheduler.redraws, redraws + 1)
+
+    def testDisplayInterval(self):
+        self.scheduler.displayInterval = 100
+        for i in xrange(10):
+            self.tick(5, 1)
+        self.assertEqual(self.scheduler.frames, 10)
+        self.assertEqual(self.scheduler.redraws, 3)  # at 5, 125 and 245 ms
+        self.assertAlmostEqual(self.scheduler.displayFps, 1000 / 120.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
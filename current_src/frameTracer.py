@@ -0,0 +1,110 @@
+import os
+import json
+import functools
+import time
+import threading
+from collections import deque
+
+# Timeline of the processing loop, for finding out what made a particular
+# frame slow, where aggregate timings only show averages. Stages, actions,
+# saves and redraws record begin and end events into a ring of the last
+# capacity events, which dump writes out in the Chrome trace event format
+# (open it in chrome://tracing or ui.perfetto.dev). With slowFrameMs, the
+# ring is also dumped whenever the time from one frame to the next is
+# longer than that, to slowPath % the frame number, at most once every
+# cooldownFrames frames. Set as GestureProcessor.tracer.
+class FrameTracer(object):
+    def __init__(self, capacity=100000, slowFrameMs=None,
+                 path="trace.json", slowPath="trace-frame%d.json",
+                 cooldownFrames=30):
+        # (phase, name, category, microseconds, thread, args) tuples
+        self.events = deque(maxlen=capacity)
+        self.slowFrameMs = slowFrameMs
+        self.path = path
+        self.slowPath = slowPath
+        self.cooldownFrames = cooldownFrames
+        self.clock = time.time
+        self.pid = os.getpid()
+        self.frames = 0
+        self.frameStart = None
+        self.lastDumpFrame = None
+        self.slowFrames = 0
+
+    def record(self, phase, name, category, args=None, at=None):
+        if at is None:
+            at = self.clock()
+        self.events.append((phase, name, category, at * 1e6,
+                            threading.current_thread().ident, args))
+
+    def begin(self, name, category="stage", args=None):
+        self.record("B", name, category, args)
+
+    def end(self, name, category="stage"):
+        self.record("E", name, category)
+
+    # Marks the start of a frame, and dumps the trace if the previous frame
+    # (including whatever ran between the two, i.e. a redraw) was slow
+    def beginFrame(self):
+        now = self.clock()
+        if self.frameStart is not None and self.slowFrameMs is not None:
+            elapsed = (now - self.frameStart) * 1000.0
+            if elapsed > self.slowFrameMs:
+                self.slowFrames += 1
+                self.record("i", "slow frame", "frame",
+                            {"frame": self.frames - 1, "ms": elapsed})
+                if (self.lastDumpFrame is None or self.frames -
+                        self.lastDumpFrame >= self.cooldownFrames):
+                    self.lastDumpFrame = self.frames
+                    self.dump(self.slowPath % (self.frames - 1))
+        self.frameStart = now
+        self.begin("frame", "frame", {"frame": self.frames})
+
+    def endFrame(self):
+        self.end("frame", "frame")
+        self.frames += 1
+
+    # The recorded events as a Chrome trace event dict
+    def trace(self):
+        events = []
+        for phase, name, category, at, thread, args in list(self.events):
+            event = {"ph": phase, "name": name, "cat": category, "ts": at,
+                     "pid": self.pid, "tid": thread}
+            if args is not None:
+                event["args"] = args
+            if phase == "i":
+                event["s"] = "t"
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    # Writes the trace to path (self.path by default) and returns the path.
+    # The dump itself shows up in the next one.
+    def dump(self, path=None):
+        path = path or self.path
+        start = self.clock()
+        with open(path, "w") as fout:
+            json.dump(self.trace(), fout)
+        self.record("B", "dump", "tracer", {"path": path}, start)
+        self.end("dump", "tracer")
+        return path
+
+    def clear(self):
+        self.events.clear()
+
+# Calls fn(*args, **kwargs) between begin and end events of tracer, or just
+# calls it when tracer is None
+def traceCall(tracer, name, category, fn, *args, **kwargs):
+    if tracer is None:
+        return fn(*args, **kwargs)
+    tracer.begin(name, category)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        tracer.end(name, category)
+
+# Method decorator recording a call as a stage of self.tracer, if set
+def traced(method):
+    @functools.wraps(method)
+    def stage(self, *args, **kwargs):
+        return traceCall(self.tracer, method.__name__, "stage", method,
+                         self, *args, **kwargs)
+    return stage
@@ -0,0 +1,50 @@
+import unittest
+from frameTracer import FrameTracer, traced, traceCall
+from gestureCore import GestureCore
+
+
+class Stages(object):
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+
+    # Scales a value
+    @traced
+    def scale(self, value, factor=1):
+        return value * factor
+
+
+class TracedTest(unittest.TestCase):
+    def testKeywordArguments(self):
+        for tracer in [None, FrameTracer()]:
+            stages = Stages(tracer)
+            self.assertEqual(stages.scale(2, factor=3), 6)
+            self.assertEqual(stages.scale(value=2), 2)
+        self.assertEqual([event[:3] for event in tracer.events],
+                         [("B", "scale", "stage"),
+                          ("E", "scale", "stage")] * 2)
+
+    def testKeepsMethodAttributes(self):
+        self.assertEqual(Stages.scale.__name__, "scale")
+        self.assertEqual(GestureCore.classifyGesture.__name__,
+                         "classifyGesture")
+
+    def testTraceCallKeywordArguments(self):
+        tracer = FrameTracer()
+        self.assertEqual(traceCall(tracer, "join", "action", ",".join,
+                                   ["a", "b"]), "a,b")
+        self.assertEqual(traceCall(None, "sorted", "action", sorted, [2, 1],
+                                   reverse=True), [2, 1])
+        self.assertEqual(len(tracer.events), 2)
+
+    # Traced stages of the processor take keywords too
+    def testClassifyGestureByKeyword(self):
+        core = GestureCore("")
+        core.tracer = FrameTracer()
+        template = core.gestures[0]
+        index = core.classifyGesture(points=template.points)
+        self.assertEqual(index, 0)
+        self.assertEqual(core.tracer.events[0][1], "classifyGesture")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import numpy as np
 import sys
 
+# Points are stored as float32 and instances have no __dict__, so that large
+# libraries stay small; see gestureLibrary.py for packing a whole library into
+# one array with each Gesture a view into it.
 class Gesture(object):
+    __slots__ = ("points", "distance", "distanceIndices", "name", "_action")
     __GestureMaxDim = 1024.0 # Nice round number
     # Keys for the return values of classify gesture
     totalError = "totalError"
@@ -12,14 +16,38 @@ class Gesture(object):
     distanceRange = "distanceRange"
 
     def __init__(self, points, name = ""):
-        self.points = np.array(points, dtype = np.float)
+        self.points = np.array(points, dtype = np.float32)
         self.points = Gesture.normalizePoints(self.points)
         scaleFactor = (Gesture.__GestureMaxDim /
                         Gesture.maxDim(self.points)["maxDim"])
         self.points *= scaleFactor
-        self.distance = Gesture.curveLength(self.points)
         self.distance, self.distanceIndices = Gesture.curveLengthDI(self.points)
         self.name = name
+        self._action = None
+
+    # Gesture over already normalized arrays (i.e. views into a library),
+    # skipping the normalization and arc length computation
+    @staticmethod
+    def fromArrays(points, distanceIndices, distance, name, action = None):
+        gesture = Gesture.__new__(Gesture)
+        gesture.points = points
+        gesture.distanceIndices = distanceIndices
+        gesture.distance = distance
+        gesture.name = name
+        gesture._action = action
+        return gesture
+
+    # Points sampled at times (in seconds), linearly interpolated to one point
+    # every interval seconds from the first to the last
+    @staticmethod
+    def resampleByTime(points, times, interval):
+        points = np.asarray(points, dtype = np.float64).reshape(-1, 2)
+        times = np.asarray(times, dtype = np.float64)
+        if len(points) < 2 or times[-1] <= times[0]:
+            return points
+        at = np.append(np.arange(times[0], times[-1], interval), times[-1])
+        return np.column_stack((np.interp(at, times, points[:, 0]),
+                                np.interp(at, times, points[:, 1])))
 
     @staticmethod
     def curveLength(points):
@@ -49,16 +77,17 @@ class Gesture(object):
     # Takes points, returns an array of the same length with indices matching 
     # cumulative distance, to take linearization indices from.
     def curveLengthDI(points):
-        indices = np.empty(len(points))
+        indices = np.empty(len(points), dtype = np.float32)
         cumulativeDistance = 0
         indices[0] = 0
         for i in xrange(1, len(points)):
-            cumulativeDistance += Gesture.distance(points[i], points[i-1])
+            cumulativeDistance += Gesture.pointDistance(points[i],
+                                                        points[i-1])
             indices[i] = cumulativeDistance
         return cumulativeDistance, indices
 
     @staticmethod
-    def distance(point1, point2):
+    def pointDistance(point1, point2):
         return ((point1[0] - point2[0]) ** 2 +
                 (point1[1] - point2[1]) ** 2) ** 0.5
 
@@ -110,7 +139,8 @@ class Gesture(object):
                         humanGesture.distanceIndices[i] /
                         humanGesture.distance) 
             comparePoint = linearizeTemplate(toFind)
-            distance = Gesture.distance(comparePoint, humanGesture.points[i])
+            distance = Gesture.pointDistance(comparePoint,
+                                             humanGesture.points[i])
             totalDistance += distance
             distances += [distance]
             totalError += distance ** 2 # come up with a better error function?
@@ -127,5 +157,16 @@ class Gesture(object):
         # Gesture distance determines number of partitions of the template curve
         # Subsequent distances form indices
 
-    def action(self, *args, **kwargs):
-        print "DEFAULT ACTION:", self.name
\ No newline at end of file
+    def defaultAction(self, *args, **kwargs):
+        print "DEFAULT ACTION:", self.name
+
+    # The function bound with GestureProcessor.bind, or the default action
+    def getAction(self):
+        if self._action is None:
+            return self.defaultAction
+        return self._action
+
+    def setAction(self, fn):
+        self._action = fn
+
+    action = property(getAction, setAction)
\ No newline at end of file
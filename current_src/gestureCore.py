@@ -0,0 +1,326 @@
+import numpy as np
+import os
+import bisect
+import random
+from gesture import Gesture
+from gestureLibrary import GestureLibrary
+import templateConsolidation
+from pipelineConfig import PipelineConfig
+from frameTracer import traced, traceCall
+
+
+class GestureCore(object):
+    # The trajectory half of GestureProcessor: stationarity, segmentation,
+    # classification and the gesture library, fed hand positions rather than
+    # camera frames. Imports nothing but numpy (no OpenCV or Tkinter), so it
+    # can classify trajectories sent by thin clients inside a server process;
+    # see addPosition and classifyTrajectory. config is a
+    # pipelineConfig.PipelineConfig, only its trajectory knobs and camera size
+    # (which the positions are in) are used. gestures is a
+    # gestureLibrary.GestureLibrary to use instead of loading the gesture
+    # file; it then belongs to the caller and is not saved by close(). With
+    # an empty gestureFile, the gestures are never written.
+    def __init__(self, gestureFile="gestureData.txt", config=None,
+                 gestures=None):
+        # Optional shardedClassifier.ShardedClassifier, to score very large
+        # gesture libraries on several processes, or
+        # protractorMatcher.ProtractorMatcher, which tolerates rotation
+        self.classifier = None
+        # Optional frameTracer.FrameTracer recording a timeline of the
+        # stages, actions and saves
+        self.tracer = None
+        self.stationary = False
+        self.record = False
+        self.endGesture = False
+        self.gesturePoints = []
+        self.gestureTimes = []
+        self.gestureFile = gestureFile
+        self.gestureHeader = "Gesture Name: "
+        self.gestureEnd = "END GESTURE"
+        self.saveNextGesture = False
+        self.saveNextName = None
+        self.lastAction = ""
+        self.handMomentPositions = []
+        self.handCenterPositions = []
+        # Capture time of every position above, in seconds
+        self.handPositionTimes = []
+        # Seconds of positions kept (and at least config.historyLength of
+        # them), see trimHistory
+        self.historySeconds = 3.0
+        self.frameTime = 0.0
+        self.configure(config or PipelineConfig())
+        self.ownsGestures = gestures is None
+        if gestures is None:
+            self.initGestures()
+        else:
+            self.gestures = gestures
+
+    # Applies a PipelineConfig; can be called at any time to switch presets
+    def configure(self, config):
+        self.config = config
+        self.cameraWidth = config.cameraWidth
+        self.cameraHeight = config.cameraHeight
+
+# --------------------------------- Gesture IO --------------------------------
+# Functions associated with loading and saving the gestures, either from the
+# default gestures or the file provided.
+
+    def initGestures(self):
+        if os.path.isfile(self.gestureFile):
+            self.loadGesturesFromFile()
+        else:
+            self.loadDefaultGestures()
+
+    def loadGesturesFromFile(self):
+        self.gestures = GestureLibrary.read(self.gestureFile,
+                                            self.gestureHeader,
+                                            self.gestureEnd)
+        if self.gestures is None:
+            self.loadDefaultGestures()
+
+    # Initiate some default gesures in the event that no gesture file was found
+    # (imported here: building them takes a while, which servers loading
+    # their own gesture file should not pay for at startup)
+    def loadDefaultGestures(self):
+        import defaultGesturesLoader
+        self.gestures = GestureLibrary(defaultGesturesLoader.defaultGestures)
+
+    def bind(self, gestureIndex, fn):
+        if type(gestureIndex) == int:
+            if gestureIndex < len(self.gestures):
+                self.gestures[gestureIndex].action = fn
+                return True
+            else:
+                raise IndexError("Gesture Index Out Of Bounds")
+        elif type(gestureIndex) == str:
+            if gestureIndex in self.gestures.nameIndex:
+                # Every sample of the gesture class
+                for index in self.gestures.indicesOf(gestureIndex):
+                    self.gestures[index].action = fn
+                return True
+            else:
+                raise IndexError("Gesture Name Not Found")
+        else:
+            raise TypeError("Unsupported Key Type")
+
+    def getGestureNames(self):
+        return self.gestures.names()
+
+    @traced
+    def saveGestures(self):
+        if not self.gestureFile:
+            return
+        self.gestures.write(self.gestureFile, self.gestureHeader,
+                            self.gestureEnd)
+
+# ----------------------------- Gesture Detection -----------------------------
+# Functions associated with determining gestures
+
+    # Needs a third of a second of hand positions (10 frames at 30 fps)
+    def warmedUp(self, times):
+        return len(times) > 2 and times[-1] - times[0] >= 1 / 3.0
+
+    def checkCanDoGestures(self):
+        self.canDoGestures = self.warmedUp(self.handPositionTimes)
+
+    @traced
+    def detemineStationary(self):
+        # Figure out of the past few points have been at roughly same position
+        # If they have and there is suddenly movement,
+        # trigger the start of a gesture search
+        self.prevRecordState = self.record
+        if self.canDoGestures:
+            start, moved = self.movedInWindow(self.handMomentPositions,
+                                              self.handPositionTimes)
+            if moved:
+                # If previous not moving, start recording
+                if self.stationary:
+                    self.record = True
+                    # The gesture started with the movement in the window
+                    self.recordStart = start
+                self.stationary = False
+                self.stationaryTimeStart = self.frameTime
+                return
+            # Not previously stationary but stationary now
+            if not self.stationary:
+                self.record = False
+            self.stationary = True
+
+    # The points looked at are those of the last stationaryWindowMs before
+    # the current one (at least two), so the window is the same length of
+    # time whether or not frames were dropped. Returns where the window
+    # starts and whether any of its points is far from their average.
+    def movedInWindow(self, positions, times):
+        end = len(positions) - 1
+        since = times[end - 1] - self.config.stationaryWindowMs / 1000.0
+        start = min(bisect.bisect_right(times, since, 0, end), end - 2)
+        recent = positions[start:end]
+        xAvg = np.average([pt[0] for pt in recent])
+        yAvg = np.average([pt[1] for pt in recent])
+        factor = self.config.stationaryFactor
+        for x, y in recent:
+            # if any point is further further from the average:
+            if (x-xAvg)**2 + (y-yAvg)**2 > factor * min(self.cameraWidth,
+                                                        self.cameraHeight):
+                return start, True
+        return start, False
+
+    # The recorded points at one point per gestureSampleMs
+    def resampledGesturePoints(self):
+        return Gesture.resampleByTime(self.gesturePoints, self.gestureTimes,
+                                      self.config.gestureSampleMs / 1000.0)
+
+    # Classifies the recorded gesture, or the given (resampled) points
+    @traced
+    def classifyGesture(self, points=None):
+        if points is None:
+            points = self.resampledGesturePoints()
+        self.humanGesture = Gesture(points, "Human Gesture")
+        if len(self.gestures) == 0:
+            return None
+        # Vectorized compareGestures against every template at once
+        if self.classifier is not None:
+            indices, errors, totalDistances = self.classifier.topK(
+                self.gestures, self.humanGesture)
+        else:
+            indices, errors, totalDistances = self.gestures.topK(
+                self.humanGesture)
+        index = int(indices[0])
+        # Basic elimination to figure out if result is valid
+        templateGestureRatio = max((self.gestures[index].distance /\
+                                    self.humanGesture.distance),
+                                    (self.humanGesture.distance /\
+                                        self.gestures[index].distance))
+        if hasattr(self.classifier, "accepts"):
+            # Scores of its own (i.e. protractorMatcher.ProtractorMatcher)
+            close = self.classifier.accepts(errors[0])
+        else:
+            distanceDiffRatio = totalDistances[0] /\
+                                    min(self.gestures[index].distance,
+                                        self.humanGesture.distance)
+            close = distanceDiffRatio < self.config.maxDistanceRatio
+        if templateGestureRatio < self.config.maxLengthRatio and close:
+            return index
+
+    # Returns the index of the gesture recognized when one ends, if any
+    @traced
+    def determineIfGesture(self):
+        gestureIndex = None
+        if self.record:
+            if not self.prevRecordState:
+                self.gesturePoints = self.handCenterPositions[
+                    self.recordStart:-1]
+                self.gestureTimes = self.handPositionTimes[self.recordStart:-1]
+            self.gesturePoints += [self.handCenterPositions[-1]]
+            self.gestureTimes += [self.handPositionTimes[-1]]
+        elif self.prevRecordState == True and not self.record:
+            minGesturePoints = 5  # Should last a few frames at least
+            if len(self.resampledGesturePoints()) > minGesturePoints:
+                gestureIndex = self.classifyGesture()
+                if gestureIndex != None:
+                    traceCall(self.tracer, self.gestures[gestureIndex].name,
+                              "action", self.gestures[gestureIndex].action)
+                    self.lastAction = self.gestures[gestureIndex].name
+                elif gestureIndex == None and self.saveNextGesture:
+                    self.addRecordedGesture()
+                    self.saveNextGesture = False
+            self.gesturePoints = []
+            self.gestureTimes = []
+        return gestureIndex
+
+    # Segments the gestures of the hand positions handed in so far
+    def updateGestures(self):
+        self.checkCanDoGestures()
+        self.detemineStationary()
+        gestureIndex = self.determineIfGesture()
+        self.trimHistory()
+        return gestureIndex
+
+    # Stillness only looks at the last stationaryWindowMs of positions and a
+    # recorded gesture keeps its own points, so positions older than
+    # historySeconds (beyond the last config.historyLength, for drawing and
+    # snapshots) are dropped. The lists are replaced rather than changed in
+    # place, keeping earlier frameResult.FrameResults intact, and only once
+    # half of them can go, so the copying stays cheap.
+    def trimHistory(self):
+        times = self.handPositionTimes
+        start = min(bisect.bisect_left(times, times[-1] -
+                                       self.historySeconds),
+                    len(times) - self.config.historyLength)
+        if start > 0 and 2 * start >= len(times):
+            keep = len(times) - start
+            self.handMomentPositions = self.handMomentPositions[-keep:]
+            self.handCenterPositions = self.handCenterPositions[-keep:]
+            self.handPositionTimes = times[-keep:]
+
+# --------------------------- Gestures API Functions --------------------------
+# Various other things necessary to make this a more complete API.
+
+    # Feeds one hand position (in camera pixels, taken at timestamp seconds)
+    # of a live trajectory, the way GestureProcessor.process() does for a
+    # camera frame. moment is the position stillness is judged by, the
+    # center of mass of the hand for the processor; center by default.
+    # Returns the name of the gesture recognized when one ends, otherwise
+    # None; its action, if bound, has been called.
+    def addPosition(self, center, timestamp, moment=None):
+        if moment is None:
+            moment = center
+        self.handMomentPositions += [tuple(moment)]
+        self.handCenterPositions += [tuple(center)]
+        self.handPositionTimes += [timestamp]
+        self.frameTime = timestamp
+        gestureIndex = self.updateGestures()
+        if gestureIndex is not None:
+            return self.gestures[gestureIndex].name
+
+    # Name of the gesture a whole, already segmented trajectory matches, or
+    # None. With times (in seconds), the points are first resampled to one
+    # per gestureSampleMs like the recorded gestures; without, they are
+    # taken to be at that rate already. Actions are not called.
+    def classifyTrajectory(self, points, times=None):
+        if times is not None:
+            points = Gesture.resampleByTime(points, times,
+                                            self.config.gestureSampleMs /
+                                            1000.0)
+        gestureIndex = self.classifyGesture(points)
+        if gestureIndex is not None:
+            return self.gestures[gestureIndex].name
+
+    # The next unrecognized gesture is saved as a new template. With a name,
+    # it is added as another sample of that gesture (see consolidateGestures),
+    # otherwise under a new random name.
+    def saveNext(self, name=None):
+        self.saveNextGesture = True
+        self.saveNextName = name
+
+    @traced
+    def addRecordedGesture(self):
+        gestureName = self.saveNextName
+        while gestureName is None:
+            gestureName = "".join([chr(random.randint(ord('a'), ord('z'))) \
+                                  for i in xrange(20)])
+            if gestureName in self.gestures.nameIndex:
+                gestureName = None
+        newGesture = Gesture(self.resampledGesturePoints(), name=gestureName)
+        if gestureName in self.gestures.nameIndex:
+            index = self.gestures.nameIndex[gestureName]
+            newGesture.action = self.gestures[index]._action
+        self.gestures.append(newGesture)
+        print "RECORDED NEW ONE", gestureName
+        self.lastAction = gestureName
+        return gestureName
+
+    # Merges near-duplicate samples of every gesture into at most maxPerClass
+    # templates and writes the result back to the gesture file
+    def consolidateGestures(self, maxPerClass=3, maxError=64.0,
+                            method="medoid"):
+        self.gestures = templateConsolidation.consolidate(
+            self.gestures, maxPerClass, maxError, method)
+        self.saveGestures()
+        return len(self.gestures)
+
+    def close(self):
+        if self.classifier is not None:
+            self.classifier.close()
+        if self.ownsGestures:
+            self.saveGestures()
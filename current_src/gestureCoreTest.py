@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+import defaultGesturesLoader
+from gestureCore import GestureCore
+from multiHandTest import gestureTrajectory
+
+
+def quietCore(gestureFile="", gestures=None):
+    core = GestureCore(gestureFile, gestures=gestures)
+    for name in set(core.getGestureNames()):
+        core.bind(name, lambda: None)
+    return core
+
+
+class AddPositionTest(unittest.TestCase):
+    def testRecognizesDrawnGestures(self):
+        library = quietCore().gestures
+        for template in defaultGesturesLoader.defaultGestures:
+            core = GestureCore("", gestures=library)
+            points, times = gestureTrajectory(template)
+            found = [core.addPosition(point, at)
+                     for point, at in zip(points, times)]
+            self.assertEqual([name for name in found if name],
+                             [template.name])
+            self.assertEqual(core.lastAction, template.name)
+
+    def testActionCalledOnce(self):
+        core = quietCore()
+        template = defaultGesturesLoader.defaultGestures[9]
+        calls = []
+        core.bind(template.name, lambda: calls.append(template.name))
+        for point, at in zip(*gestureTrajectory(template)):
+            core.addPosition(point, at)
+        self.assertEqual(calls, [template.name])
+
+    # A minute of holding still keeps only the last few seconds, and a
+    # gesture after it is still recognized
+    def testHistoryIsBounded(self):
+        core = quietCore()
+        for i in xrange(30 * 60):
+            core.addPosition((200, 150), i / 30.0)
+        kept = len(core.handPositionTimes)
+        self.assertLessEqual(kept, 2 * 30 * core.historySeconds + 1)
+        self.assertEqual(len(core.handCenterPositions), kept)
+        self.assertEqual(len(core.handMomentPositions), kept)
+        self.assertGreaterEqual(core.handPositionTimes[-1] -
+                                core.handPositionTimes[0],
+                                core.historySeconds)
+        template = defaultGesturesLoader.defaultGestures[2]
+        points, times = gestureTrajectory(template)
+        found = [core.addPosition(point, at + 60)
+                 for point, at in zip(points, times)]
+        self.assertEqual([name for name in found if name], [template.name])
+
+
+class CloseTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "gestures.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testSavesItsOwnGestures(self):
+        GestureCore(self.path).close()
+        self.assertTrue(os.path.isfile(self.path))
+
+    # A library handed in belongs to the caller
+    def testLeavesGivenGesturesAlone(self):
+        library = GestureCore("").gestures
+        GestureCore(self.path, gestures=library).close()
+        self.assertFalse(os.path.exists(self.path))
+
+    def testNoGestureFile(self):
+        core = GestureCore("")
+        core.close()
+        core.consolidateGestures()
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
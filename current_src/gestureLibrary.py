@@ -0,0 +1,253 @@
+import numpy as np
+from gesture import Gesture
+
+# Templates [start, end) of packed library arrays, offsets rebased to 0
+def sliceArrays(points, distanceIndices, distances, offsets, start, end):
+    first, last = offsets[start], offsets[end]
+    return (points[first:last], distanceIndices[first:last],
+            distances[start:end], offsets[start:end + 1] - first)
+
+# Gesture.compareGestures of one human gesture against every template of the
+# packed arrays at once. Each template point gets a key of twice its template
+# index plus its fraction of the template length, so one searchsorted over
+# the keys finds, for every template, the segment where each human point's
+# fraction of the human length falls. Works through chunk templates at a
+# time to bound the temporaries. Returns the total error (sum of squared
+# distances) and total distance of each template.
+def compareLibrary(points, distanceIndices, distances, offsets, humanPoints,
+                   humanIndices, humanDistance, chunk=4096):
+    errors = np.empty(len(distances), np.float64)
+    totals = np.empty(len(distances), np.float64)
+    fractions = humanIndices / max(float(humanDistance), 1e-9)
+    for start in xrange(0, len(distances), chunk):
+        end = min(start + chunk, len(distances))
+        chunkPoints, chunkIndices, chunkDistances, chunkOffsets = \
+            sliceArrays(points, distanceIndices, distances, offsets,
+                        start, end)
+        owner = np.repeat(np.arange(end - start), np.diff(chunkOffsets))
+        lengths = np.maximum(chunkDistances, 1e-9).astype(np.float64)
+        keys = owner * 2.0 + chunkIndices / lengths[owner]
+        queries = (np.arange(end - start) * 2.0)[:, np.newaxis] + fractions
+        high = np.searchsorted(keys, queries.ravel(), 'right')
+        high = np.clip(high.reshape(queries.shape),
+                       chunkOffsets[:-1, np.newaxis] + 1,
+                       chunkOffsets[1:, np.newaxis] - 1)
+        low = high - 1
+        span = keys[high] - keys[low]
+        scale = (queries - keys[low]) / np.where(span > 0, span, 1)
+        matched = chunkPoints[low] + ((chunkPoints[high] - chunkPoints[low]) *
+                                      scale[..., np.newaxis])
+        pointDistances = np.sqrt(((matched - humanPoints) ** 2).sum(2))
+        errors[start:end] = (pointDistances ** 2).sum(1)
+        totals[start:end] = pointDistances.sum(1)
+    return errors, totals
+
+# The k lowest errors: (indices, errors, totals) sorted by error
+def lowestErrors(errors, totals, k):
+    k = min(k, len(errors))
+    if k == 0:
+        return (np.zeros(0, np.int64), np.zeros(0), np.zeros(0))
+    best = np.argpartition(errors, k - 1)[:k]
+    best = best[np.argsort(errors[best])]
+    return best, errors[best], totals[best]
+
+# A template of a GestureLibrary. Its points, cumulative distances and length
+# are read from the library's packed arrays when used rather than kept per
+# gesture, so a template costs its name and a few references; this is what
+# makes the packed library smaller than separate float32 Gestures, which
+# each keep two arrays of their own.
+class PackedGesture(Gesture):
+    __slots__ = ("library", "index")
+
+    def __init__(self, library, index, name, action=None):
+        self.library = library
+        self.index = index
+        self.name = name
+        self._action = action
+
+    def getPoints(self):
+        start, end = self.library.offsets[self.index:self.index + 2]
+        return self.library.points[start:end]
+
+    def getDistanceIndices(self):
+        start, end = self.library.offsets[self.index:self.index + 2]
+        return self.library.distanceIndices[start:end]
+
+    def getDistance(self):
+        return float(self.library.distances[self.index])
+
+    points = property(getPoints)
+    distanceIndices = property(getDistanceIndices)
+    distance = property(getDistance)
+
+# A list of gestures packed into single library-wide arrays: the points of all
+# gestures are rows of one float32 array, gesture i owning the rows
+# offsets[i]:offsets[i+1], and likewise for the cumulative distances. The
+# Gesture objects handed out are PackedGestures reading from these arrays, so
+# the whole library can be scored at once (compareLibrary) and saved or
+# memory mapped as it is (see processorSnapshot.py).
+# Behaves like the plain list of gestures it replaces (indexing, iteration,
+# len, append), and keeps name -> index dicts for O(1) lookups. Several
+# templates may share a name (samples of one gesture class); nameIndex then
+# holds the first of them and classIndices all of them (names with a single
+# template are only in nameIndex).
+class GestureLibrary(object):
+    # Markers of the text format the gestures are saved in
+    header = "Gesture Name: "
+    end = "END GESTURE"
+
+    def __init__(self, gestures=()):
+        self.points = np.zeros((0, 2), np.float32)
+        self.distanceIndices = np.zeros(0, np.float32)
+        self.distances = np.zeros(0, np.float32)
+        self.offsets = np.zeros(1, np.int64)
+        self.gestures = []
+        self.nameIndex = {}
+        self.classIndices = {}
+        self.resampledCache = {}
+        self.extend(gestures)
+
+# ------------------------------------ IO -------------------------------------
+
+    # Gestures from a file written by write: a header line with the name, one
+    # "x y" line per point and an end line per gesture. None if the file is
+    # too short to hold any.
+    @staticmethod
+    def read(path, header=header, end=end):
+        with open(path, 'r') as fin:
+            data = fin.read().split('\n')
+        # Basic check, should replace later with bytestream instead
+        if len(data) < len(header):
+            return None
+        gestureName = ""
+        gesturePoints = []
+        gestures = []
+        cutoff = len(header)
+        for item in data:
+            if item[:cutoff] == header:
+                gestureName = item[cutoff:]
+            elif item == end:
+                gestures.append(Gesture(gesturePoints, gestureName))
+                gestureName = ""
+                gesturePoints = []
+            elif item:
+                gesturePoints.append(map(float, item.split()))
+        # Packed in one go rather than one append per gesture
+        return GestureLibrary(gestures)
+
+    def write(self, path, header=header, end=end):
+        with open(path, 'w+') as fout:
+            for gesture in self.gestures:
+                fout.write(header + gesture.name + '\n')
+                for i in xrange(len(gesture.points)):
+                    fout.write(str(gesture.points[i][0]) + ' ' +
+                               str(gesture.points[i][1]) + '\n')
+                fout.write(end + '\n')
+
+    # Library over existing packed arrays (i.e. memory mapped from a
+    # processorSnapshot) rather than copies of them
+    @staticmethod
+    def fromArrays(points, distanceIndices, distances, offsets, names,
+                   actions=None):
+        library = GestureLibrary()
+        library.points = points
+        library.distanceIndices = distanceIndices
+        library.distances = distances
+        library.offsets = offsets
+        library.addViews(names, actions or [None] * len(names))
+        return library
+
+# --------------------------------- Container ---------------------------------
+
+    def __len__(self):
+        return len(self.gestures)
+
+    def __getitem__(self, index):
+        return self.gestures[index]
+
+    def __iter__(self):
+        return iter(self.gestures)
+
+    def __contains__(self, name):
+        return name in self.nameIndex
+
+    def index(self, name):
+        return self.nameIndex[name]
+
+    def names(self):
+        return [gesture.name for gesture in self.gestures]
+
+    # All templates of a gesture class
+    def indicesOf(self, name):
+        if name in self.classIndices:
+            return self.classIndices[name]
+        if name in self.nameIndex:
+            return [self.nameIndex[name]]
+        return []
+
+    def append(self, gesture):
+        self.extend([gesture])
+
+    # Adds the gestures by copying them into the packed arrays. The arrays
+    # are reallocated; add many at once if possible.
+    def extend(self, gestures):
+        gestures = list(gestures)
+        if len(gestures) == 0:
+            return
+        lengths = [len(gesture.points) for gesture in gestures]
+        self.points = np.concatenate([self.points] +
+                                     [g.points for g in gestures]
+                                     ).astype(np.float32)
+        self.distanceIndices = np.concatenate(
+            [self.distanceIndices] + [g.distanceIndices for g in gestures]
+            ).astype(np.float32)
+        self.distances = np.concatenate(
+            (self.distances, [g.distance for g in gestures])
+            ).astype(np.float32)
+        self.offsets = np.concatenate(
+            (self.offsets, self.offsets[-1] + np.cumsum(lengths)))
+        self.resampledCache = {}
+        self.addViews([g.name for g in gestures],
+                      [g._action for g in gestures])
+
+    # Gestures for the templates packed after the current ones
+    def addViews(self, names, actions):
+        for name, action in zip(names, actions):
+            i = len(self.gestures)
+            self.gestures.append(PackedGesture(self, i, name, action))
+            if name not in self.nameIndex:
+                self.nameIndex[name] = i
+            else:
+                self.classIndices.setdefault(name, [self.nameIndex[name]])
+                self.classIndices[name].append(i)
+
+    # Every gesture resampled to count points evenly spaced along its length,
+    # as one (gestures, count, 2) array. This is where compareGestures samples
+    # a template: with the same fractions of the length on both sides, its
+    # total error is a plain sum of squared differences of these rows.
+    def resampled(self, count=64):
+        if count not in self.resampledCache:
+            fractions = np.linspace(0, 1, count)
+            rows = np.empty((len(self.gestures), count, 2), np.float32)
+            for i in xrange(len(self.gestures)):
+                start, end = self.offsets[i], self.offsets[i + 1]
+                lengths = self.distanceIndices[start:end]
+                points = self.points[start:end]
+                at = fractions * lengths[-1]
+                rows[i, :, 0] = np.interp(at, lengths, points[:, 0])
+                rows[i, :, 1] = np.interp(at, lengths, points[:, 1])
+            self.resampledCache[count] = rows
+        return self.resampledCache[count]
+
+    def arrays(self):
+        return (self.points, self.distanceIndices, self.distances,
+                self.offsets)
+
+    # The k templates closest to the human gesture, as returned by
+    # lowestErrors; the vectorized equivalent of compareGestures on each
+    def topK(self, human, k=1):
+        errors, totals = compareLibrary(*(self.arrays() +
+                                          (human.points,
+                                           human.distanceIndices,
+                                           human.distance)))
+        return lowestErrors(errors, totals, k)
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import defaultGesturesLoader
+from gesture import Gesture
+from gestureLibrary import GestureLibrary, PackedGesture, compareLibrary
+from shardedClassifier import ShardedClassifier
+
+
+def strokes(count, points=20, seed=0):
+    rng = np.random.RandomState(seed)
+    return [rng.randn(points, 2).cumsum(0) for i in xrange(count)]
+
+
+class GestureLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.gestures = [Gesture(stroke, name)
+                         for stroke, name in zip(strokes(4),
+                                                 ["a", "b", "a", "c"])]
+        self.library = GestureLibrary(self.gestures)
+
+    def testTemplatesReadFromPackedArrays(self):
+        for gesture, packed in zip(self.gestures, self.library):
+            self.assertIsInstance(packed, PackedGesture)
+            np.testing.assert_array_equal(packed.points, gesture.points)
+            np.testing.assert_array_equal(packed.distanceIndices,
+                                          gesture.distanceIndices)
+            self.assertAlmostEqual(packed.distance, gesture.distance, 3)
+        self.assertEqual(self.library.names(), ["a", "b", "a", "c"])
+
+    def testSamplesOfAName(self):
+        self.assertEqual(self.library.indicesOf("a"), [0, 2])
+        self.assertEqual(self.library.indicesOf("b"), [1])
+        self.assertEqual(self.library.indicesOf("missing"), [])
+        self.assertEqual(self.library.index("a"), 0)
+        self.library.append(Gesture(strokes(1, seed=1)[0], "b"))
+        self.assertEqual(self.library.indicesOf("b"), [1, 4])
+
+    # Templates keep their actions, and read the new arrays, when the library
+    # grows (which reallocates the arrays)
+    def testExtendKeepsTemplates(self):
+        action = lambda: None
+        self.library[1].action = action
+        first = self.library[0]
+        self.library.extend([Gesture(stroke, "d")
+                             for stroke in strokes(3, seed=2)])
+        self.assertIs(self.library[1].action, action)
+        self.assertIs(self.library[0], first)
+        np.testing.assert_array_equal(first.points, self.gestures[0].points)
+        self.assertEqual(len(self.library), 7)
+
+    def testWriteReadRoundTrip(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "gestures.txt")
+            self.library.write(path)
+            read = GestureLibrary.read(path)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(read.names(), self.library.names())
+        for original, copy in zip(self.library, read):
+            np.testing.assert_allclose(copy.points, original.points,
+                                       rtol=1e-4, atol=1e-2)
+
+    def testFromArraysSharesArrays(self):
+        arrays = self.library.arrays()
+        library = GestureLibrary.fromArrays(*(arrays +
+                                              (self.library.names(),)))
+        self.assertIs(library.points, self.library.points)
+        self.assertEqual(library.indicesOf("a"), [0, 2])
+
+
+class CompareLibraryTest(unittest.TestCase):
+    # The vectorized comparison scores every template like compareGestures
+    def testMatchesCompareGestures(self):
+        library = GestureLibrary(defaultGesturesLoader.defaultGestures +
+                                 [Gesture(stroke, "random")
+                                  for stroke in strokes(5, 40, seed=3)])
+        for human in [Gesture(stroke, "human")
+                      for stroke in strokes(3, 30, seed=4)]:
+            errors, totals = compareLibrary(*(library.arrays() + (
+                human.points, human.distanceIndices, human.distance)))
+            for i in xrange(len(library)):
+                expected = Gesture.compareGestures(library[i], human)
+                self.assertAlmostEqual(errors[i] / expected["totalError"],
+                                       1, 5)
+                self.assertAlmostEqual(totals[i] /
+                                       expected["totalDistance"], 1, 5)
+
+    def testChunksDoNotChangeScores(self):
+        library = GestureLibrary([Gesture(stroke, str(i)) for i, stroke
+                                  in enumerate(strokes(10, seed=5))])
+        human = Gesture(strokes(1, seed=6)[0], "human")
+        arguments = library.arrays() + (human.points, human.distanceIndices,
+                                        human.distance)
+        whole = compareLibrary(*arguments)
+        chunked = compareLibrary(*arguments, chunk=3)
+        np.testing.assert_allclose(chunked[0], whole[0])
+        np.testing.assert_allclose(chunked[1], whole[1])
+
+    def testTopKIsSortedByError(self):
+        library = GestureLibrary([Gesture(stroke, str(i)) for i, stroke
+                                  in enumerate(strokes(10, seed=7))])
+        indices, errors, totals = library.topK(library[4], k=3)
+        self.assertEqual(indices[0], 4)
+        self.assertTrue((np.diff(errors) >= 0).all())
+
+
+class ShardedClassifierTest(unittest.TestCase):
+    def testSameResultAsLibrary(self):
+        library = GestureLibrary([Gesture(stroke, str(i)) for i, stroke
+                                  in enumerate(strokes(40, seed=8))])
+        classifier = ShardedClassifier(processes=2, minTemplates=10)
+        try:
+            for human in library[:5]:
+                sharded = classifier.topK(library, human, k=3)
+                single = library.topK(human, k=3)
+                np.testing.assert_array_equal(sharded[0], single[0])
+                np.testing.assert_allclose(sharded[1], single[1])
+        finally:
+            classifier.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
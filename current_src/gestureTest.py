@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+from gesture import Gesture
+
+
+class ResampleByTimeTest(unittest.TestCase):
+    # Dropped samples are filled in by interpolation, one point per interval
+    def testUniformRateAcrossGaps(self):
+        times = [0.0, 0.1, 0.4, 0.5]
+        points = [(0, 0), (10, 0), (40, 0), (50, 0)]
+        resampled = Gesture.resampleByTime(points, times, 0.1)
+        np.testing.assert_allclose(resampled[:, 0], [0, 10, 20, 30, 40, 50],
+                                   atol=1e-9)
+        np.testing.assert_allclose(resampled[:, 1], 0)
+
+    def testEndsAtLastSample(self):
+        resampled = Gesture.resampleByTime([(0, 0), (5, 5)], [0.0, 0.25],
+                                           0.1)
+        np.testing.assert_allclose(resampled[-1], (5, 5))
+        self.assertEqual(len(resampled), 4)
+
+    def testTooShortIsUnchanged(self):
+        resampled = Gesture.resampleByTime([(3, 4)], [1.0], 0.1)
+        np.testing.assert_array_equal(resampled, [[3, 4]])
+
+
+class GestureTest(unittest.TestCase):
+    def testNormalizedToStartAndMaxDimension(self):
+        gesture = Gesture([(10, 10), (20, 10), (30, 10)], "line")
+        np.testing.assert_allclose(gesture.points[0], (0, 0))
+        self.assertAlmostEqual(gesture.distance, 1024.0, 3)
+        np.testing.assert_allclose(gesture.distanceIndices, [0, 512, 1024],
+                                   atol=1e-3)
+
+    def testDefaultAndBoundAction(self):
+        gesture = Gesture([(0, 0), (1, 1)], "diagonal")
+        self.assertEqual(gesture.action, gesture.defaultAction)
+        action = lambda: None
+        gesture.action = action
+        self.assertIs(gesture.action, action)
+
+
+if __name__ == "__main__":
+    unittest.main()
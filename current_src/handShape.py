@@ -0,0 +1,76 @@
+import numpy as np
+
+# Turns the convexity defects of the hand contour into a finger count and
+# fingertip positions. All of the filtering is done with array masks over the
+# defects at once; a defect is kept as the valley between two fingers when
+#  - it is deeper than minDepth palm radii
+#  - the angle at its far point, between its start and end, is below maxAngle
+#  - its far point is within maxValleyDistance palm radii of the palm center
+#  - its start and end lie outside minTipDistance palm radii of the center
+# The start and end points of the kept defects are the fingertips. Without
+# any valleys, a single hull point far enough from the palm is a pointing
+# finger, otherwise the hand is a fist.
+class HandShapeAnalyzer(object):
+    def __init__(self, minDepth=0.3, maxAngle=np.pi / 2, maxValleyDistance=2.0,
+                 minTipDistance=1.2, pointingDistance=1.8, mergeDistance=0.3):
+        self.minDepth = minDepth
+        self.maxAngle = maxAngle
+        self.maxValleyDistance = maxValleyDistance
+        self.minTipDistance = minTipDistance
+        self.pointingDistance = pointingDistance
+        # Tips closer than this (in palm radii) are the same finger
+        self.mergeDistance = mergeDistance
+        self.reset()
+
+    def reset(self):
+        self.fingerCount = 0
+        self.fingertips = np.zeros((0, 2), np.int32)
+        self.valleys = np.zeros((0, 2), np.int32)
+        self.validDefects = np.zeros((0, 4), np.int32)
+
+    # contour is the (n, 1, 2) hand contour, hullPoints its convex hull and
+    # defects the result of cv2.convexityDefects (None when there are none)
+    def analyze(self, contour, hullPoints, defects, palmCenter, palmRadius):
+        self.reset()
+        points = contour.reshape(-1, 2)
+        center = np.asarray(palmCenter, dtype=np.float64)
+        radius = max(float(palmRadius), 1.0)
+        if defects is not None and len(defects) > 0:
+            defects = defects.reshape(-1, 4)
+            start = points[defects[:, 0]].astype(np.float64)
+            end = points[defects[:, 1]].astype(np.float64)
+            far = points[defects[:, 2]].astype(np.float64)
+            depth = defects[:, 3] / 256.0  # fixed point, 8 fractional bits
+            toStart, toEnd = start - far, end - far
+            norms = (np.sqrt((toStart ** 2).sum(1)) *
+                     np.sqrt((toEnd ** 2).sum(1)))
+            cosine = (toStart * toEnd).sum(1) / np.maximum(norms, 1e-9)
+            angle = np.arccos(np.clip(cosine, -1, 1))
+            distance = lambda p: np.sqrt(((p - center) ** 2).sum(1))
+            valid = ((depth > self.minDepth * radius) &
+                     (angle < self.maxAngle) &
+                     (distance(far) < self.maxValleyDistance * radius) &
+                     (distance(start) > self.minTipDistance * radius) &
+                     (distance(end) > self.minTipDistance * radius))
+            self.validDefects = defects[valid]
+            self.valleys = far[valid].astype(np.int32)
+            if valid.any():
+                tips = np.concatenate((start[valid], end[valid]))
+                self.fingertips = self.mergeTips(tips, radius)
+        if len(self.fingertips) == 0:
+            hull = hullPoints.reshape(-1, 2).astype(np.float64)
+            if len(hull) > 0:
+                distances = np.sqrt(((hull - center) ** 2).sum(1))
+                if distances.max() > self.pointingDistance * radius:
+                    self.fingertips = hull[[distances.argmax()]]
+        self.fingertips = self.fingertips[:5].astype(np.int32)
+        self.fingerCount = len(self.fingertips)
+        return self.fingerCount
+
+    # Neighbouring defects share a fingertip (the end of one is the start of
+    # the next), so drop tips close to an earlier one
+    def mergeTips(self, tips, radius):
+        difference = tips[:, np.newaxis, :] - tips[np.newaxis, :, :]
+        close = (difference ** 2).sum(2) < (self.mergeDistance * radius) ** 2
+        duplicate = np.triu(close, 1).any(0)
+        return tips[~duplicate]
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Constant-velocity (alpha-beta) filter over the palm center, used to predict
+# where the hand will be in the next frame so that the full detection
+# (contours -> palm center search) only has to run every detectEvery frames.
+# In between, the processor measures the hand cheaply inside the predicted
+# region (see GestureProcessor.trackLocally) and corrects the estimate here.
+# Positions are in camera pixels, time is in frames.
+class HandTracker(object):
+    def __init__(self, detectEvery=3, alpha=0.7, beta=0.3, minConfidence=0.5,
+                 margin=0.3):
+        self.detectEvery = detectEvery
+        self.alpha = alpha
+        self.beta = beta
+        # Below this the next frame gets a full detection
+        self.minConfidence = minConfidence
+        # Fraction of the hand size added on every side of the predicted rect
+        self.margin = margin
+        self.reset()
+
+    def reset(self):
+        self.position = None
+        self.velocity = np.zeros(2)
+        self.rectOffset = np.zeros(2)  # top left corner relative to position
+        self.rectSize = np.zeros(2)
+        self.handArea = 0.0
+        self.confidence = 0.0
+        self.framesSinceDetection = 0
+        # Level the detection thresholded the image at, for thresholding the
+        # predicted region the same way; None if a segmenter made the mask
+        self.threshold = None
+
+    # Whether the coming frame needs a full detection
+    def due(self):
+        return (self.position is None or
+                self.framesSinceDetection + 1 >= self.detectEvery or
+                self.confidence < self.minConfidence)
+
+    def predict(self):
+        return self.position + self.velocity
+
+    # Region (x0, y0, x1, y1) the hand should be in next frame, clipped to
+    # the image
+    def predictedRect(self, shape):
+        height, width = shape[:2]
+        topLeft = self.predict() + self.rectOffset
+        pad = self.margin * self.rectSize + np.linalg.norm(self.velocity)
+        x0, y0 = np.maximum(topLeft - pad, 0).astype(int)
+        x1, y1 = np.minimum(topLeft + self.rectSize + pad,
+                            [width, height]).astype(int)
+        return x0, y0, max(x1, x0), max(y1, y0)
+
+    def filter(self, measured):
+        measured = np.asarray(measured, dtype=np.float64)
+        if self.position is None:
+            self.position = measured
+            return
+        predicted = self.predict()
+        residual = measured - predicted
+        self.position = predicted + self.alpha * residual
+        self.velocity = self.velocity + self.beta * residual
+
+    # Result of a full detection: trusted completely
+    def detected(self, center, rect, area, threshold=None):
+        previous = self.position
+        self.filter(center)
+        if previous is not None:
+            self.position = np.asarray(center, dtype=np.float64)
+        x, y, w, h = rect
+        self.rectOffset = np.array([x, y]) - self.position
+        self.rectSize = np.array([w, h], dtype=np.float64)
+        self.handArea = float(area)
+        self.confidence = 1.0
+        self.framesSinceDetection = 0
+        self.threshold = threshold
+
+    # Result of a local update. Confidence drops when the measured area
+    # differs from the detected one or the measurement strays from the
+    # prediction by more than the palm radius.
+    def tracked(self, center, area, palmRadius):
+        self.framesSinceDetection += 1
+        if area <= 0 or self.handArea <= 0:
+            self.confidence = 0.0
+            return
+        residual = np.linalg.norm(np.asarray(center) - self.predict())
+        areaRatio = min(area / self.handArea, self.handArea / area)
+        self.confidence = areaRatio * np.exp(-residual / max(palmRadius, 1))
+        self.filter(center)
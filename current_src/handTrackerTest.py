@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from handTracker import HandTracker
+
+
+class HandTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tracker = HandTracker(detectEvery=3)
+
+    # Hand moving right by 10 pixels a frame, its 40x60 rect at (-20, -30)
+    def detect(self, frame):
+        x = 100 + 10 * frame
+        self.tracker.detected((x, 200), (x - 20, 170, 40, 60), 2000.0, 90.0)
+
+    # Two tracked frames between detections
+    def testDetectionEvery(self):
+        self.assertTrue(self.tracker.due())
+        self.detect(0)
+        self.assertFalse(self.tracker.due())
+        self.tracker.tracked((100, 200), 2000.0, 20)
+        self.assertFalse(self.tracker.due())
+        self.tracker.tracked((100, 200), 2000.0, 20)
+        self.assertTrue(self.tracker.due())
+        self.assertEqual(self.tracker.framesSinceDetection, 2)
+        self.detect(3)
+        self.assertFalse(self.tracker.due())
+
+    # The velocity converges to the hand's, so the prediction leads the last
+    # position by one frame of movement
+    def testPredictsConstantVelocity(self):
+        for frame in xrange(30):
+            self.detect(frame)
+        np.testing.assert_allclose(self.tracker.velocity, (10, 0), atol=0.1)
+        np.testing.assert_allclose(self.tracker.predict(), (400, 200),
+                                   atol=0.1)
+
+    def testPredictedRectFollowsHand(self):
+        for frame in xrange(30):
+            self.detect(frame)
+        x0, y0, x1, y1 = self.tracker.predictedRect((480, 640))
+        # The rect of the next frame's hand, padded by the margin and speed
+        self.assertTrue(x0 < 400 - 20 and x1 > 400 + 20)
+        self.assertTrue(y0 < 170 and y1 > 230)
+        self.assertLess(x1 - x0, 40 * (1 + 2 * self.tracker.margin) + 21)
+        # Clipped to the image
+        x0, y0, x1, y1 = self.tracker.predictedRect((220, 390))
+        self.assertEqual((x1, y1), (390, 220))
+
+    # A tracked measurement far from the prediction, or with another area,
+    # is trusted less and brings the next full detection forward
+    def testConfidenceDrops(self):
+        self.tracker.detectEvery = 10
+        self.detect(0)
+        self.tracker.tracked((100, 200), 2000.0, 20)
+        self.assertAlmostEqual(self.tracker.confidence, 1.0)
+        self.assertFalse(self.tracker.due())
+        self.tracker.tracked((100, 200), 500.0, 20)
+        self.assertAlmostEqual(self.tracker.confidence, 0.25)
+        self.assertTrue(self.tracker.due())
+        self.detect(0)
+        self.tracker.tracked((160, 200), 2000.0, 20)
+        self.assertLess(self.tracker.confidence, 0.1)
+        self.detect(0)
+        self.tracker.tracked((100, 200), 0.0, 20)
+        self.assertEqual(self.tracker.confidence, 0.0)
+
+    def testReset(self):
+        self.detect(0)
+        self.assertEqual(self.tracker.threshold, 90.0)
+        self.tracker.reset()
+        self.assertTrue(self.tracker.due())
+        self.assertIsNone(self.tracker.position)
+        self.assertIsNone(self.tracker.threshold)
+        np.testing.assert_array_equal(self.tracker.velocity, (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
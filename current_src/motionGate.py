@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+
+# Cheap change detector run before the expensive image stages. Each frame is
+# shrunk to a tiny greyscale thumbnail and compared with the thumbnail of the
+# last frame which was fully processed; if only a handful of pixels changed
+# by more than pixelThreshold, the frame can reuse the previous hand state.
+class MotionGate(object):
+    def __init__(self, width=64, pixelThreshold=20, changedFraction=0.002):
+        self.width = width
+        self.pixelThreshold = pixelThreshold
+        # Fraction of thumbnail pixels which must change to count as motion
+        self.changedFraction = changedFraction
+        self.reference = None
+        self.hasReference = False
+        self.thumbnail = None
+        self.grey = None
+        self.difference = None
+        self.checks = 0
+        self.skips = 0
+
+    def makeThumbnail(self, frame):
+        height = max(int(round(self.width * frame.shape[0] /
+                               float(frame.shape[1]))), 1)
+        if self.thumbnail is None or \
+           self.thumbnail.shape[:2] != (height, self.width):
+            self.thumbnail = np.empty((height, self.width) + frame.shape[2:],
+                                      np.uint8)
+            self.grey = np.empty((height, self.width), np.uint8)
+            self.difference = np.empty((height, self.width), np.uint8)
+            self.reference = np.empty((height, self.width), np.uint8)
+            self.hasReference = False
+        cv2.resize(frame, (self.width, height), dst=self.thumbnail,
+                   interpolation=cv2.INTER_AREA)
+        if self.thumbnail.ndim == 3:
+            cv2.cvtColor(self.thumbnail, cv2.COLOR_BGR2GRAY, dst=self.grey)
+        else:
+            np.copyto(self.grey, self.thumbnail)
+        return self.grey
+
+    # True if the frame has to be processed. The frame then becomes the new
+    # reference, so slow drift still triggers processing eventually.
+    def changed(self, frame):
+        grey = self.makeThumbnail(frame)
+        self.checks += 1
+        if self.hasReference:
+            cv2.absdiff(grey, self.reference, dst=self.difference)
+            moved = np.count_nonzero(self.difference > self.pixelThreshold)
+            if moved <= self.changedFraction * grey.size:
+                self.skips += 1
+                return False
+        np.copyto(self.reference, grey)
+        self.hasReference = True
+        return True
+
+    # Forces the next frame to be processed
+    def reset(self):
+        self.hasReference = False
+
+    @property
+    def skipRate(self):
+        if self.checks == 0:
+            return 0.0
+        return self.skips / float(self.checks)
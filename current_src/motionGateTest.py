@@ -0,0 +1,67 @@
+import unittest
+import cv2
+import numpy as np
+from GesturesApi import GestureProcessor
+from motionGate import MotionGate
+from pipelineConfig import PipelineConfig
+from replayCapture import ReplayCapture, syntheticHandFrames
+
+
+def scene(x=100, brightness=30, shape=(240, 320, 3)):
+    frame = np.full(shape, brightness, np.uint8)
+    cv2.circle(frame, (x, 120), 30, (220, 220, 220), -1)
+    return frame
+
+
+class MotionGateTest(unittest.TestCase):
+    def setUp(self):
+        self.gate = MotionGate()
+
+    def testStillSceneIsSkipped(self):
+        self.assertTrue(self.gate.changed(scene()))
+        for i in xrange(3):
+            self.assertFalse(self.gate.changed(scene()))
+        self.assertAlmostEqual(self.gate.skipRate, 0.75)
+
+    def testMovementIsProcessed(self):
+        self.gate.changed(scene())
+        self.assertTrue(self.gate.changed(scene(x=140)))
+        self.assertFalse(self.gate.changed(scene(x=140)))
+
+    # Changes are measured against the last processed frame, so a slow drift
+    # too small to notice from one frame to the next is still caught
+    def testDriftAddsUp(self):
+        self.gate.changed(scene(brightness=30))
+        processed = [self.gate.changed(scene(brightness=30 + 5 * i))
+                     for i in xrange(1, 11)]
+        self.assertEqual(processed, [False] * 4 + [True] + [False] * 4 +
+                         [True])
+
+    def testResetAndNewSizeAreProcessed(self):
+        self.gate.changed(scene())
+        self.gate.reset()
+        self.assertTrue(self.gate.changed(scene()))
+        self.assertTrue(self.gate.changed(scene(shape=(120, 320, 3))))
+        self.assertFalse(self.gate.changed(scene(shape=(120, 320, 3))))
+
+
+class GatedProcessorTest(unittest.TestCase):
+    # A held hand is measured once, then its frames are skipped with the
+    # hand left where it was
+    def testHeldHandIsSkipped(self):
+        still = syntheticHandFrames(640, 360, 1) * 5
+        gp = GestureProcessor("", capture=ReplayCapture(still, frameRate=30),
+                              config=PipelineConfig(cameraWidth=640,
+                                                    cameraHeight=360,
+                                                    motionGate=True))
+        skipped = []
+        for frame in still:
+            result = gp.process()
+            skipped.append(result.skipped)
+        self.assertEqual(skipped, [False] + [True] * 4)
+        self.assertEqual(len(gp.handCenterPositions), 5)
+        self.assertEqual(len(set(gp.handCenterPositions)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
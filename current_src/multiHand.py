@@ -0,0 +1,154 @@
+import cv2
+import numpy as np
+from gestureCore import GestureCore
+
+if hasattr(cv2, "DIST_L2"):
+    distanceType = cv2.DIST_L2
+else:
+    distanceType = cv2.cv.CV_DIST_L2  # OpenCV 2.4
+
+# Palm center and radius of a hand contour: the maximum of the distance
+# transform of its filled mask. The mask only covers the contour's bounding
+# rect, shrunk to at most maxSide pixels, so the cost per hand is bounded no
+# matter how large the hand appears.
+def palmOfContour(contour, maxSide=96):
+    x, y, w, h = cv2.boundingRect(contour)
+    scale = min(1.0, float(maxSide) / max(w, h, 1))
+    mask = np.zeros((int(h * scale) + 3, int(w * scale) + 3), np.uint8)
+    shifted = np.round((contour - (x, y)) * scale + 1).astype(np.int32)
+    cv2.drawContours(mask, [shifted], 0, 255, -1)
+    distances = cv2.distanceTransform(mask, distanceType, 5)
+    cy, cx = np.unravel_index(distances.argmax(), distances.shape)
+    center = np.array([x + (cx - 1) / scale, y + (cy - 1) / scale])
+    return center, distances[cy, cx] / scale
+
+# One tracked hand: its latest measurements and its own gesture
+# segmentation, a GestureCore fed its positions and sharing the processor's
+# library, configuration, classifier and tracer.
+class Hand(object):
+    def __init__(self, handId):
+        self.id = handId
+        self.contour = None
+        self.moment = None
+        self.palmCenter = None
+        self.palmRadius = 0.0
+        self.time = 0.0
+        self.missed = 0  # frames since the hand was last seen
+        self.updated = False
+        self.core = None  # created by the first segment()
+        self.lastAction = ""
+
+    def observe(self, contour, moment, palmCenter, palmRadius, timestamp):
+        self.contour = contour
+        self.moment = moment
+        self.palmCenter = palmCenter
+        self.palmRadius = palmRadius
+        self.missed = 0
+        self.hold(timestamp)
+
+    # Not measured this frame (nothing moved): it stays where it was
+    def hold(self, timestamp):
+        self.time = timestamp
+        self.updated = True
+
+    # Adds the position of this frame to the hand's trajectory, calling the
+    # action of the gesture recognized if one ends
+    def segment(self, gp):
+        if not self.updated:
+            return
+        self.updated = False
+        if self.core is None:
+            self.core = GestureCore("", gp.config, gp.gestures)
+        # The processor may have been reconfigured or its library replaced
+        if self.core.config is not gp.config:
+            self.core.configure(gp.config)
+        self.core.gestures = gp.gestures
+        self.core.classifier = gp.classifier
+        self.core.tracer = gp.tracer
+        name = self.core.addPosition(tuple(self.palmCenter), self.time,
+                                     tuple(self.moment))
+        if name is not None:
+            self.lastAction = name
+            gp.lastAction = name
+
+# Follows up to maxHands hands from frame to frame. Each frame, the largest
+# contours (see ContourEngine.largestK) are matched to the known hands by
+# nearest palm center: all pairs at once in one distance matrix, closest
+# pairs first, and no further than matchDistance (a fraction of the larger
+# frame dimension). Hands unseen for more than maxMissed frames are dropped,
+# and unmatched contours become new hands, replacing the hand unseen for the
+# longest once maxHands are followed.
+class MultiHandTracker(object):
+    def __init__(self, maxHands=2, matchDistance=0.2, maxMissed=5,
+                 maxSide=96):
+        self.maxHands = maxHands
+        self.matchDistance = matchDistance
+        self.maxMissed = maxMissed
+        self.maxSide = maxSide
+        self.hands = []
+        self.nextId = 0
+        # The hand of the largest contour, whose gestures the processor
+        # recognizes itself
+        self.primary = None
+
+    def update(self, contours, frameShape, timestamp):
+        centers, measurements = [], []
+        for contour in contours[:self.maxHands]:
+            moments = cv2.moments(contour)
+            if moments["m00"] == 0:
+                continue
+            moment = (moments["m10"] / moments["m00"],
+                      moments["m01"] / moments["m00"])
+            palmCenter, palmRadius = palmOfContour(contour, self.maxSide)
+            centers.append(palmCenter)
+            measurements.append((contour, moment, palmCenter, palmRadius))
+        limit = self.matchDistance * max(frameShape[:2])
+        matches = self.associate(np.array(centers).reshape(-1, 2), limit)
+        for hand in self.hands:
+            hand.missed += 1
+        for handIndex, detection in matches:
+            self.hands[handIndex].observe(*(measurements[detection] +
+                                            (timestamp,)))
+        self.hands = [hand for hand in self.hands
+                      if hand.missed <= self.maxMissed]
+        matched = set(detection for handIndex, detection in matches)
+        for detection in xrange(len(measurements)):
+            if detection not in matched:
+                if len(self.hands) >= self.maxHands:
+                    self.hands.remove(max(self.hands,
+                                          key=lambda hand: hand.missed))
+                hand = Hand(self.nextId)
+                self.nextId += 1
+                hand.observe(*(measurements[detection] + (timestamp,)))
+                self.hands.append(hand)
+        self.primary = None
+        for hand in self.hands:
+            if len(contours) > 0 and hand.contour is contours[0]:
+                self.primary = hand
+
+    # (hand index, detection index) pairs, closest first
+    def associate(self, centers, limit):
+        known = [i for i in xrange(len(self.hands))
+                 if self.hands[i].palmCenter is not None]
+        if len(known) == 0 or len(centers) == 0:
+            return []
+        previous = np.array([self.hands[i].palmCenter for i in known])
+        distances = np.sqrt(((previous[:, np.newaxis, :] -
+                              centers[np.newaxis, :, :]) ** 2).sum(2))
+        matches, usedHands, usedDetections = [], set(), set()
+        for flat in np.argsort(distances, axis=None):
+            row, column = np.unravel_index(flat, distances.shape)
+            if distances[row, column] > limit:
+                break
+            if row in usedHands or column in usedDetections:
+                continue
+            usedHands.add(row)
+            usedDetections.add(column)
+            matches.append((known[row], column))
+        return matches
+
+    # Frame skipped because nothing moved: every hand stays where it was
+    def hold(self, timestamp):
+        for hand in self.hands:
+            if hand.missed == 0:
+                hand.hold(timestamp)
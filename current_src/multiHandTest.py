@@ -0,0 +1,67 @@
+import unittest
+import cv2
+import numpy as np
+import defaultGesturesLoader
+from gestureCore import GestureCore
+from multiHand import Hand, MultiHandTracker
+
+
+def disc(center, radius=30):
+    return cv2.ellipse2Poly(center, (radius, radius), 0, 0, 360,
+                            10).reshape(-1, 1, 2)
+
+# Still for a second, a default gesture drawn in 2/3 s at 30 fps, then still
+# again
+def gestureTrajectory(template, origin=(200, 150), scale=0.25):
+    points = [tuple(np.asarray(origin) + scale * np.asarray(point))
+              for point in template.points[::12]]
+    points = [points[0]] * 30 + points + [points[-1]] * 30
+    return points, [i / 30.0 for i in xrange(len(points))]
+
+
+class MultiHandTrackerTest(unittest.TestCase):
+    def testHandsFollowedByNearestPalm(self):
+        tracker = MultiHandTracker(maxHands=2)
+        tracker.update([disc((100, 100)), disc((400, 100))], (360, 640), 0.0)
+        ids = [hand.id for hand in tracker.hands]
+        tracker.update([disc((410, 105)), disc((105, 100))], (360, 640), 0.1)
+        self.assertEqual([hand.id for hand in tracker.hands], ids)
+        self.assertLess(tracker.hands[1].palmCenter[0], 420)
+        # The hand of the first (largest) contour
+        self.assertIs(tracker.primary, tracker.hands[1])
+
+    # A new hand takes the place of the one unseen for the longest, so no
+    # more than maxHands are ever followed
+    def testNewHandReplacesMostMissed(self):
+        tracker = MultiHandTracker(maxHands=2)
+        tracker.update([disc((100, 100)), disc((400, 100))], (360, 640), 0.0)
+        first, second = [hand.id for hand in tracker.hands]
+        tracker.update([disc((400, 100))], (360, 640), 0.1)
+        tracker.update([disc((400, 100)), disc((250, 300))], (360, 640), 0.2)
+        self.assertEqual(len(tracker.hands), 2)
+        self.assertNotIn(first, [hand.id for hand in tracker.hands])
+        self.assertIn(second, [hand.id for hand in tracker.hands])
+
+
+class HandTest(unittest.TestCase):
+    # A hand recognizes the gestures the processor would, with its library
+    def testSegmentsLikeGestureCore(self):
+        gp = GestureCore("")
+        core = GestureCore("", gestures=gp.gestures)
+        hand = Hand(0)
+        template = defaultGesturesLoader.defaultGestures[8]  # CW Circle
+        gp.bind(template.name, lambda: None)
+        points, times = gestureTrajectory(template)
+        expected = None
+        for point, at in zip(points, times):
+            hand.observe(None, point, np.array(point), 30.0, at)
+            hand.segment(gp)
+            expected = core.addPosition(point, at) or expected
+        self.assertIsNotNone(expected)
+        self.assertEqual(hand.lastAction, expected)
+        self.assertEqual(gp.lastAction, expected)
+        self.assertIs(hand.core.gestures, gp.gestures)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import math
+import numpy as np
+
+# One Euro filter (Casiez et al., CHI 2012): a low-pass filter whose cutoff
+# frequency rises with the speed of the signal, so a still hand is smoothed
+# heavily (no jitter) while a fast one is followed closely (little lag).
+# minCutoff (Hz) sets the smoothing at rest, beta how quickly the cutoff
+# rises with speed (in units per second). Works on scalars or arrays, i.e.
+# (x, y) positions, with timestamps in seconds.
+class OneEuroFilter(object):
+    def __init__(self, minCutoff=1.0, beta=0.05, derivativeCutoff=1.0):
+        self.minCutoff = minCutoff
+        self.beta = beta
+        self.derivativeCutoff = derivativeCutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    @staticmethod
+    def smoothing(cutoff, elapsed):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / elapsed)
+
+    def filter(self, value, timestamp):
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None or timestamp <= self.timestamp:
+            if self.value is None:
+                self.value = value
+                self.derivative = np.zeros_like(value)
+            self.timestamp = timestamp
+            return self.value
+        elapsed = timestamp - self.timestamp
+        derivative = (value - self.value) / elapsed
+        a = OneEuroFilter.smoothing(self.derivativeCutoff, elapsed)
+        self.derivative = self.derivative + a * (derivative - self.derivative)
+        speed = np.sqrt((self.derivative ** 2).sum())
+        a = OneEuroFilter.smoothing(self.minCutoff + self.beta * speed,
+                                    elapsed)
+        self.value = self.value + a * (value - self.value)
+        self.timestamp = timestamp
+        return self.value
@@ -0,0 +1,50 @@
+import math
+import unittest
+import numpy as np
+from oneEuroFilter import OneEuroFilter
+
+
+def run(smoother, values, rate=30.0):
+    return np.array([smoother.filter(value, i / rate)
+                     for i, value in enumerate(values)])
+
+
+class OneEuroFilterTest(unittest.TestCase):
+    def testFirstValuePassesThrough(self):
+        smoother = OneEuroFilter()
+        np.testing.assert_array_equal(smoother.filter((3, 4), 0.0), (3, 4))
+
+    # At rest the cutoff is minCutoff: a first order low-pass step
+    def testStepAtRest(self):
+        smoother = OneEuroFilter(minCutoff=1.0, beta=0.0)
+        smoother.filter(0.0, 0.0)
+        a = 1 / (1 + 30 / (2 * math.pi))
+        self.assertAlmostEqual(float(smoother.filter(1.0, 1 / 30.0)), a)
+
+    # A still hand's jitter is smoothed away
+    def testJitterSmoothed(self):
+        rng = np.random.RandomState(0)
+        noisy = 100 + rng.randn(300, 2)
+        smoothed = run(OneEuroFilter(), noisy)[60:]
+        self.assertLess(smoothed.std(0).max(), 0.5 * noisy.std(0).min())
+
+    # The cutoff rises with speed, so a fast movement lags far less than
+    # with a fixed cutoff
+    def testFastMovementFollowed(self):
+        ramp = [(20 * i, 0) for i in xrange(60)]  # 600 pixels per second
+        fixed = run(OneEuroFilter(beta=0.0), ramp)[-1]
+        adaptive = run(OneEuroFilter(beta=0.05), ramp)[-1]
+        self.assertLess(ramp[-1][0] - adaptive[0],
+                        0.2 * (ramp[-1][0] - fixed[0]))
+
+    # Repeated or out of order timestamps don't divide by zero
+    def testSameTimestamp(self):
+        smoother = OneEuroFilter()
+        smoother.filter(1.0, 1.0)
+        self.assertEqual(float(smoother.filter(5.0, 1.0)), 1.0)
+        smoother.reset()
+        self.assertEqual(float(smoother.filter(5.0, 1.0)), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
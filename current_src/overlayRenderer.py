@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+
+# Draws the debugging overlay (contour, hull, defects, palm center, ...) into
+# a canvas which is kept between frames. Instead of allocating and zeroing a
+# whole new image each frame, only the region drawn to during the previous
+# frame is cleared. Coordinates are given in camera pixels and scaled to the
+# canvas size, so the overlay can be rendered directly at the size it will be
+# displayed at.
+class OverlayRenderer(object):
+    def __init__(self, markerSegments=12):
+        self.canvas = None
+        self.dirty = None  # [x0, y0, x1, y1] drawn to since the last begin
+        self.scale = np.ones(2, dtype=np.float32)
+        self.radiusScale = 1.0
+        self.markerSegments = markerSegments
+        self.outlineStamps = {}
+        self.discStamps = {}
+
+    # Prepares the canvas for a new frame. sourceShape is the shape of the
+    # camera image, width and height the size to render at (defaults to the
+    # camera size).
+    def begin(self, sourceShape, width=None, height=None):
+        sourceHeight, sourceWidth = sourceShape[:2]
+        if width is None or height is None:
+            width, height = sourceWidth, sourceHeight
+        shape = (height, width, 3)
+        if self.canvas is None or self.canvas.shape != shape:
+            self.canvas = np.zeros(shape, np.uint8)
+        elif self.dirty is not None:
+            x0, y0, x1, y1 = self.dirty
+            self.canvas[y0:y1, x0:x1] = 0
+        self.dirty = None
+        self.scale = np.array([width / float(sourceWidth),
+                               height / float(sourceHeight)], np.float32)
+        self.radiusScale = float(self.scale.mean())
+        return self.canvas
+
+    def toCanvas(self, points):
+        points = np.asarray(points).reshape(-1, 2)
+        if self.scale[0] == 1 and self.scale[1] == 1:
+            return points.astype(np.int32)
+        return np.round(points * self.scale).astype(np.int32)
+
+    def scaleLength(self, length):
+        return max(int(round(length * self.radiusScale)), 1)
+
+    def markDirty(self, points, margin):
+        if len(points) == 0:
+            return
+        low = points.min(0) - margin
+        high = points.max(0) + margin + 1
+        height, width = self.canvas.shape[:2]
+        box = [max(low[0], 0), max(low[1], 0),
+               min(high[0], width), min(high[1], height)]
+        if self.dirty is None:
+            self.dirty = box
+        else:
+            self.dirty = [min(self.dirty[0], box[0]),
+                          min(self.dirty[1], box[1]),
+                          max(self.dirty[2], box[2]),
+                          max(self.dirty[3], box[3])]
+
+# ----------------------------------- Stamps ----------------------------------
+# Offsets of a marker relative to its center, cached per radius.
+
+    def outlineStamp(self, radius):
+        if radius not in self.outlineStamps:
+            t = np.linspace(0, 2 * np.pi, self.markerSegments, endpoint=False)
+            ring = np.column_stack((np.cos(t), np.sin(t))) * radius
+            self.outlineStamps[radius] = np.round(ring).astype(np.int32)
+        return self.outlineStamps[radius]
+
+    def discStamp(self, radius):
+        if radius not in self.discStamps:
+            dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+            inside = dx ** 2 + dy ** 2 <= radius ** 2
+            self.discStamps[radius] = np.column_stack((dx[inside],
+                                                       dy[inside]))
+        return self.discStamps[radius]
+
+# ---------------------------------- Drawing ----------------------------------
+
+    def contour(self, points, color, thickness=1):
+        points = self.toCanvas(points)
+        if len(points) == 0:
+            return
+        thickness = self.scaleLength(thickness)
+        cv2.drawContours(self.canvas, [points.reshape(-1, 1, 2)], 0, color,
+                         thickness)
+        self.markDirty(points, thickness)
+
+    def circle(self, center, radius, color, thickness=1):
+        center = self.toCanvas(center)
+        radius = self.scaleLength(radius)
+        if thickness > 0:
+            thickness = self.scaleLength(thickness)
+        cv2.circle(self.canvas, tuple(center[0]), radius, color, thickness)
+        self.markDirty(center, radius + max(thickness, 0))
+
+    # Outlined circles of a single color around every point, drawn with one
+    # polylines call instead of one circle call per point
+    def markers(self, points, color, radius=2):
+        points = self.toCanvas(points)
+        if len(points) == 0:
+            return
+        radius = self.scaleLength(radius)
+        stamps = points[:, np.newaxis, :] + self.outlineStamp(radius)
+        cv2.polylines(self.canvas, list(stamps), True, color)
+        self.markDirty(points, radius + 1)
+
+    # Filled circles around every point, with one color per point (or one for
+    # all of them), written into the canvas with a single fancy-index
+    # assignment. Later points are drawn over earlier ones.
+    def discs(self, points, colors, radius=5):
+        points = self.toCanvas(points)
+        if len(points) == 0:
+            return
+        radius = self.scaleLength(radius)
+        stamp = self.discStamp(radius)
+        coords = (points[:, np.newaxis, :] + stamp).reshape(-1, 2)
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        if len(colors) == 1:
+            colors = np.tile(colors, (len(coords), 1))
+        else:
+            colors = np.repeat(colors, len(stamp), axis=0)
+        height, width = self.canvas.shape[:2]
+        x, y = coords[:, 0], coords[:, 1]
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        self.canvas[y[inside], x[inside]] = colors[inside]
+        self.markDirty(points, radius)
@@ -0,0 +1,67 @@
+# The cost and accuracy knobs of GestureProcessor in one place. A config
+# starts from a named preset and takes per-knob overrides, i.e.
+# PipelineConfig("low-latency", blurSize=21). Pass one to the processor's
+# constructor, or switch at runtime with GestureProcessor.configure.
+class PipelineConfig(object):
+    # Every knob, at the values of the "balanced" preset
+    defaults = {
+        # Size requested from the camera
+        "cameraWidth": 1280,
+        "cameraHeight": 720,
+        # Gaussian blur kernel before the Otsu threshold (odd)
+        "blurSize": 31,
+        # Contour simplification, see contourEngine.py
+        "epsilonFactor": 0.001,
+        "maxPoints": 256,
+        # Contour scale of the coarse palm center search
+        "centerScale": 0.3,
+        # Hand positions kept for drawing the trail
+        "historyLength": 30,
+        # Movement, as a fraction of the smaller camera dimension (squared
+        # pixels), above which the hand is no longer still
+        "stationaryFactor": 0.04,
+        "stationaryWindowMs": 80.0,  # 3 frames at 30 fps
+        "gestureSampleMs": 1000 / 30.0,
+        # A gesture is rejected when its length differs from the template's
+        # by more than this ratio, or when its total distance to it is more
+        # than maxDistanceRatio times the shorter of the two lengths
+        "maxLengthRatio": 1.25,
+        "maxDistanceRatio": 2.0,
+        # Skip unchanged frames (see motionGate.py)
+        "motionGate": False,
+        # Full hand detection every trackEvery frames with a HandTracker in
+        # between, or None to detect on every frame. Single hand only: with
+        # maxHands above 1, every frame is a full detection
+        "trackEvery": None,
+        # Hands followed at once, each with its own gestures (multiHand.py)
+        "maxHands": 1,
+    }
+
+    presets = {
+        "low-latency": {"cameraWidth": 640, "cameraHeight": 360,
+                        "blurSize": 15, "epsilonFactor": 0.003,
+                        "maxPoints": 128, "centerScale": 0.2,
+                        "historyLength": 15, "motionGate": True,
+                        "trackEvery": 3},
+        "balanced": {},
+        "accurate": {"epsilonFactor": 0.0005, "maxPoints": 512,
+                     "centerScale": 0.5},
+    }
+
+    def __init__(self, preset="balanced", **overrides):
+        if preset not in PipelineConfig.presets:
+            raise KeyError("Unknown Preset")
+        self.preset = preset
+        self.__dict__.update(PipelineConfig.defaults)
+        self.__dict__.update(PipelineConfig.presets[preset])
+        self.update(**overrides)
+
+    def update(self, **overrides):
+        for name in overrides:
+            if name not in PipelineConfig.defaults:
+                raise KeyError("Unknown Setting")
+        self.__dict__.update(overrides)
+
+    def values(self):
+        return dict((name, getattr(self, name))
+                    for name in PipelineConfig.defaults)
@@ -0,0 +1,48 @@
+import time
+from oneEuroFilter import OneEuroFilter
+
+# Streams a smoothed hand position at camera rate for cursor-style apps. Each
+# step only reads the frame and runs the stages the position needs
+# (GestureProcessor.locateHand: segmentation, contours, center of mass), skips
+# even those while the motion gate sees no change, and passes the result
+# through a One Euro filter. Samples are (timestamp, x, y) tuples, with the
+# capture time of the frame in seconds and the position scaled to [0, 1]
+# like getScaledCenter(); they go to callback(sample) and/or queue.put(sample)
+# (i.e. a Queue.Queue read by a UI thread). Gesture and pose recognition do
+# not run in this mode.
+class PointerMode(object):
+    def __init__(self, processor, callback=None, queue=None, smoother=None):
+        self.processor = processor
+        self.callback = callback
+        self.queue = queue
+        if smoother is None:
+            smoother = OneEuroFilter()
+        self.smoother = smoother
+        self.position = None  # unsmoothed, in camera pixels
+        self.sample = None
+        # Seconds from reading the frame to publishing, of the last sample
+        # (on the wall clock, whatever clock the sample timestamps are on)
+        self.latency = 0.0
+
+    def step(self):
+        gp = self.processor
+        gp.readCamera()
+        unchanged = (gp.motionGate is not None and self.position is not None
+                     and not gp.motionGate.changed(gp.original))
+        if not unchanged:
+            self.position = gp.locateHand()
+        smoothed = self.smoother.filter(self.position, gp.frameTime)
+        self.sample = (gp.frameTime, smoothed[0] / gp.cameraWidth,
+                       smoothed[1] / gp.cameraHeight)
+        self.latency = time.time() - gp.readTime
+        if self.callback is not None:
+            self.callback(self.sample)
+        if self.queue is not None:
+            self.queue.put(self.sample)
+        return self.sample
+
+    def run(self, frames=None):
+        count = 0
+        while frames is None or count < frames:
+            self.step()
+            count += 1
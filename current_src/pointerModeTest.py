@@ -0,0 +1,20 @@
+import unittest
+from GesturesApiTest import makeProcessor
+from pointerMode import PointerMode
+
+
+class PointerModeTest(unittest.TestCase):
+    # Samples carry the capture's timestamps (here 1/30 s apart from 0), while
+    # the latency is measured on the wall clock
+    def testLatencyOnWallClock(self):
+        pointer = PointerMode(makeProcessor())
+        samples = [pointer.step() for i in xrange(3)]
+        self.assertAlmostEqual(samples[2][0], 2 / 30.0)
+        self.assertGreaterEqual(pointer.latency, 0)
+        self.assertLess(pointer.latency, 1)
+        for timestamp, x, y in samples:
+            self.assertTrue(0 <= x <= 1 and 0 <= y <= 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
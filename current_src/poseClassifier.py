@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+# Recognizes static hand poses (open palm, fist, pointing, ...) from values
+# the processor already computes every frame: the Hu moments of the contour
+# moments, the finger count and the solidity (contour area / hull area).
+# Templates are rows of a single float32 array, so matching a frame against
+# all of them is one weighted distance computation. A pose fires its action
+# once it has been held for holdFrames frames, and not again until the pose
+# changes. Actions are bound through GestureProcessor.bind by name; the
+# processor keeps the name of the last pose fired as lastPose.
+class PoseClassifier(object):
+    # Hu moments (log scaled, the last three are noisy), fingers, solidity
+    featureWeights = np.array([1, 1, 1, 1, 0.25, 0.25, 0.25, 4, 25],
+                              dtype=np.float32)
+
+    def __init__(self, maxDistance=2.0, holdFrames=5):
+        self.maxDistance = maxDistance
+        self.holdFrames = holdFrames
+        self.templates = np.zeros((0, len(self.featureWeights)), np.float32)
+        self.names = []
+        self.nameIndex = {}
+        self.actions = []
+        self.pose = None
+        self.heldFrames = 0
+
+    @staticmethod
+    def features(moments, fingerCount, hullArea):
+        hu = np.abs(cv2.HuMoments(moments).ravel())
+        hu = np.log10(np.maximum(hu, 1e-8))  # circles give ~0
+        solidity = moments["m00"] / hullArea if hullArea > 0 else 1.0
+        return np.concatenate((hu, [fingerCount, solidity])).astype(np.float32)
+
+    # Features of a contour which has not been through the processor, i.e. for
+    # building templates; analyzer is a handShape.HandShapeAnalyzer
+    @staticmethod
+    def featuresFromContour(contour, palmCenter, palmRadius, analyzer):
+        hullIndices = cv2.convexHull(contour, returnPoints=False)
+        hullPoints = contour[hullIndices[:, 0]]
+        defects = cv2.convexityDefects(contour, hullIndices)
+        analyzer.analyze(contour, hullPoints, defects, palmCenter, palmRadius)
+        return PoseClassifier.features(cv2.moments(contour),
+                                       analyzer.fingerCount,
+                                       cv2.contourArea(hullPoints))
+
+    def addPose(self, name, features, action=None):
+        if name in self.nameIndex:
+            raise KeyError("Pose Name Already Exists")
+        self.nameIndex[name] = len(self.names)
+        self.names.append(name)
+        self.actions.append(action)
+        self.templates = np.vstack((self.templates,
+                                    np.asarray(features, np.float32)))
+
+    def bind(self, name, fn):
+        self.actions[self.nameIndex[name]] = fn
+
+    # Index of the closest template, or None if none is close enough
+    def classify(self, features):
+        if len(self.templates) == 0:
+            return None
+        distances = (((self.templates - features) ** 2) *
+                     self.featureWeights).sum(1)
+        index = distances.argmin()
+        if distances[index] > self.maxDistance ** 2:
+            return None
+        return index
+
+    # Classifies the frame and returns the index of the pose whose action
+    # should fire now, if any
+    def update(self, features):
+        pose = self.classify(features)
+        if pose == self.pose:
+            self.heldFrames += 1
+        else:
+            self.pose = pose
+            self.heldFrames = 1
+        if pose is not None and self.heldFrames == self.holdFrames:
+            return pose
+        return None
+
+    # Poses without an action are recognized (see pose) but do nothing, so
+    # that applications which only use gestures are not affected by them
+    def fire(self, index):
+        if self.actions[index] is not None:
+            self.actions[index]()
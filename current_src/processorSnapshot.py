@@ -0,0 +1,155 @@
+import json
+import numpy as np
+from gestureLibrary import GestureLibrary
+from pipelineConfig import PipelineConfig
+from skinLut import SkinColorLUT
+
+# Warm restarts of a GestureProcessor. A snapshot holds what a new processor
+# would otherwise rebuild or relearn: the packed gesture library (and its
+# resampled rows), the poses, which gestures and poses had actions bound, the
+# configuration and calibration (camera size, palm offset, skin color table)
+# and the hand tracker and recent trajectory, so gestures are recognized from
+# the first frame after a restart instead of after a third of a second.
+# Actions themselves are code and are not saved; bindings made before the
+# restore are kept, and restore returns the names which still need binding.
+#
+# The snapshot is a single file: a magic line, a line of JSON describing the
+# arrays and holding the other values, then the raw arrays, each aligned so
+# restoring maps them copy-on-write rather than reading and parsing them.
+
+magic = "GESTURE SNAPSHOT 1\n"
+alignment = 64
+
+def aligned(offset):
+    return (offset + alignment - 1) // alignment * alignment
+
+def writeArrays(path, arrays, values):
+    layout, offset = {}, 0
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        arrays[name] = array
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset = aligned(offset + array.nbytes)
+    header = json.dumps({"arrays": layout, "values": values}) + "\n"
+    with open(path, "wb") as fout:
+        fout.write(magic + header)
+        start = aligned(fout.tell())
+        for name in sorted(arrays):
+            fout.seek(start + layout[name][2])
+            fout.write(arrays[name].tostring())
+        fout.truncate(start + offset)
+
+# (arrays, values) of a file from writeArrays. The arrays are copy-on-write
+# memory maps: writing to them never changes the file.
+def readArrays(path):
+    with open(path, "rb") as fin:
+        if fin.readline() != magic:
+            raise ValueError("Not A Processor Snapshot")
+        header = json.loads(fin.readline())
+        start = aligned(fin.tell())
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        shape = tuple(shape)
+        if np.prod(shape) == 0:  # nothing to map
+            arrays[str(name)] = np.zeros(shape, dtype)
+        else:
+            arrays[str(name)] = np.memmap(path, dtype, "c", start + offset,
+                                          shape)
+    return arrays, header["values"]
+
+def text(value):
+    return value.encode("utf-8")
+
+def saveProcessor(gp, path):
+    library = gp.gestures
+    arrays = dict(zip(["points", "distanceIndices", "distances", "offsets"],
+                      library.arrays()))
+    for count, rows in library.resampledCache.items():
+        arrays["resampled%d" % count] = rows
+    arrays["poseTemplates"] = gp.poses.templates
+    arrays["palmOffset"] = gp.palmOffset
+    # The recent trajectory, enough to start gestures straight away
+    keep = gp.config.historyLength
+    arrays["momentPositions"] = np.array(gp.handMomentPositions[-keep:],
+                                         np.float64).reshape(-1, 2)
+    arrays["centerPositions"] = np.array(gp.handCenterPositions[-keep:],
+                                         np.float64).reshape(-1, 2)
+    arrays["positionTimes"] = np.array(gp.handPositionTimes[-keep:],
+                                       np.float64)
+    values = {"gestureNames": library.names(),
+              "boundGestures": sorted(set(gesture.name for gesture in library
+                                          if gesture._action is not None)),
+              "poseNames": gp.poses.names,
+              "boundPoses": [gp.poses.names[i]
+                             for i in xrange(len(gp.poses.names))
+                             if gp.poses.actions[i] is not None],
+              "preset": gp.config.preset,
+              "config": gp.config.values(),
+              "cameraWidth": gp.cameraWidth,
+              "cameraHeight": gp.cameraHeight,
+              "stationary": gp.stationary}
+    if gp.tracker is not None and gp.tracker.position is not None:
+        tracker = gp.tracker
+        for name in ["position", "velocity", "rectOffset", "rectSize"]:
+            arrays["tracker." + name] = getattr(tracker, name)
+        values["tracker"] = {"handArea": tracker.handArea,
+                             "confidence": tracker.confidence,
+                             "framesSinceDetection":
+                                 tracker.framesSinceDetection}
+    if isinstance(gp.segmenter, SkinColorLUT):
+        arrays["skinTable"] = gp.segmenter.table
+        values["skinCleanupSize"] = gp.segmenter.cleanupSize
+    writeArrays(path, arrays, values)
+
+# Returns the names of the gestures and poses which were bound when the
+# snapshot was taken and have no action now
+def restoreProcessor(gp, path):
+    arrays, values = readArrays(path)
+    config = PipelineConfig(text(values["preset"]))
+    config.update(**dict((text(name), value)
+                         for name, value in values["config"].items()))
+    gp.configure(config)
+    gp.cameraWidth = values["cameraWidth"]
+    gp.cameraHeight = values["cameraHeight"]
+    # Bindings made before the restore carry over by name
+    actions = dict((gesture.name, gesture._action) for gesture in gp.gestures
+                   if gesture._action is not None)
+    names = [text(name) for name in values["gestureNames"]]
+    gp.gestures = GestureLibrary.fromArrays(
+        arrays["points"], arrays["distanceIndices"], arrays["distances"],
+        arrays["offsets"], names, [actions.get(name) for name in names])
+    # Restored rather than handed in, so it is still saved by close()
+    gp.ownsGestures = True
+    for name in arrays:
+        if name.startswith("resampled"):
+            gp.gestures.resampledCache[int(name[9:])] = arrays[name]
+    unbound = [text(name) for name in values["boundGestures"]
+               if text(name) not in actions]
+    poseActions = dict((gp.poses.names[i], gp.poses.actions[i])
+                       for i in xrange(len(gp.poses.names)))
+    gp.poses.templates = np.array(arrays["poseTemplates"])
+    gp.poses.names = [text(name) for name in values["poseNames"]]
+    gp.poses.nameIndex = dict((gp.poses.names[i], i)
+                              for i in xrange(len(gp.poses.names)))
+    gp.poses.actions = [poseActions.get(name) for name in gp.poses.names]
+    unbound += [text(name) for name in values["boundPoses"]
+                if poseActions.get(text(name)) is None]
+    gp.palmOffset = np.array(arrays["palmOffset"])
+    if "tracker" in values and gp.tracker is not None:
+        for name in ["position", "velocity", "rectOffset", "rectSize"]:
+            setattr(gp.tracker, name, np.array(arrays["tracker." + name]))
+        for name, value in values["tracker"].items():
+            setattr(gp.tracker, text(name), value)
+        # The threshold level and hand geometry tracked frames reuse are not
+        # saved, so the first frame gets a full detection
+        gp.tracker.framesSinceDetection = gp.tracker.detectEvery
+    if "skinTable" in arrays:
+        gp.segmenter = SkinColorLUT(np.array(arrays["skinTable"]),
+                                    values["skinCleanupSize"])
+    # Joined onto the first frame processed, see resumeTrajectory
+    gp.restoredTrajectory = (arrays["momentPositions"].tolist(),
+                             arrays["centerPositions"].tolist(),
+                             arrays["positionTimes"].tolist())
+    gp.stationary = values["stationary"]
+    gp.record = False
+    return unbound
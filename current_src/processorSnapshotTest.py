@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from GesturesApi import GestureProcessor
+from gesture import Gesture
+from gestureCore import GestureCore
+from gestureLibrary import GestureLibrary
+from GesturesApiTest import frames, makeProcessor
+from pipelineConfig import PipelineConfig
+from replayCapture import ReplayCapture
+
+
+class ProcessorSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "processor.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def restored(self, gp, gestureFile=""):
+        gp.snapshot(self.path)
+        return GestureProcessor(gestureFile,
+                                capture=ReplayCapture(frames, frameRate=30),
+                                snapshot=self.path)
+
+    def testRoundTrip(self):
+        gp = makeProcessor(PipelineConfig("accurate", cameraWidth=640,
+                                          cameraHeight=360))
+        gp.bind("CW Circle", lambda: None)
+        for i in xrange(len(frames)):  # long enough to start gestures
+            gp.process()
+        warm = self.restored(gp)
+        self.assertEqual(warm.config.values(), gp.config.values())
+        self.assertEqual(warm.getGestureNames(), gp.getGestureNames())
+        np.testing.assert_array_equal(warm.gestures.points,
+                                      gp.gestures.points)
+        np.testing.assert_allclose(warm.palmOffset, gp.palmOffset)
+        self.assertEqual(warm.restore(self.path), ["CW Circle"])
+        # Recognizes gestures from its first frame
+        warm.process()
+        self.assertEqual(len(warm.handPositionTimes), len(frames) + 1)
+        self.assertTrue(warm.canDoGestures)
+
+    # Gestures added after a restore are written to the gesture file
+    def testRestoredGesturesAreSaved(self):
+        gestureFile = os.path.join(self.directory, "gestures.txt")
+        warm = self.restored(makeProcessor(), gestureFile)
+        warm.gestures.append(Gesture([(0, 0), (5, 20), (30, 40)], "new"))
+        # The part of close() that saves; the rest needs a GUI build of OpenCV
+        GestureCore.close(warm)
+        saved = GestureLibrary.read(gestureFile)
+        self.assertEqual(saved.names(), warm.getGestureNames())
+        self.assertIn("new", saved.names())
+
+    # Snapshot taken right after a full detection, when the next frame would
+    # be tracked
+    def testRestoredTrackerProcesses(self):
+        gp = makeProcessor(PipelineConfig("low-latency", trackEvery=3))
+        gp.process()
+        self.assertFalse(gp.tracker.due())
+        warm = self.restored(gp)
+        self.assertTrue(warm.tracker.due())
+        for i in xrange(4):
+            warm.process()
+        self.assertIsNotNone(warm.palmCenter)
+
+
+if __name__ == "__main__":
+    unittest.main()
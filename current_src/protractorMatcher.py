@@ -0,0 +1,78 @@
+import numpy as np
+from gestureLibrary import lowestErrors
+
+# Closed-form matcher after Protractor (Li, 2010), an alternative to
+# compareGestures which tolerates slightly rotated strokes of any size (one
+# scale factor for both axes: a stroke stretched along one axis only still
+# scores lower). Every gesture is resampled to count points evenly spaced
+# along its length (see GestureLibrary.resampled), centered on their mean
+# and flattened into one unit vector, so its overall size drops out. The
+# rotation which best aligns a human gesture with a template then has a
+# closed form: with a the dot product of the two vectors and b that of one
+# with the other turned a quarter turn, the best angle is atan2(b, a) and
+# the best cosine similarity is a cos + b sin of it. The angle is limited
+# to maxRotation (radians): the default gestures include lines and
+# diagonals which are rotations of each other, and with more freedom any
+# straight movement becomes a line gesture. Scoring the whole library is
+# two matrix-vector products. A match is accepted when its angular distance
+# (the arc cosine of the similarity) is below maxDistance. Set as
+# GestureProcessor.classifier.
+class ProtractorMatcher(object):
+    def __init__(self, count=16, maxRotation=0.1, maxDistance=0.1):
+        self.count = count
+        self.maxRotation = maxRotation
+        self.maxDistance = maxDistance
+        self.library = None
+        self.libraryPoints = None
+        self.vectors = None
+
+    # Unit vectors of (n, count, 2) resampled rows, as an (n, count * 2) array
+    @staticmethod
+    def vectorize(rows):
+        centered = rows - rows.mean(1)[:, np.newaxis, :]
+        flat = centered.reshape(len(rows), -1).astype(np.float64)
+        norms = np.sqrt((flat ** 2).sum(1))
+        return flat / np.maximum(norms, 1e-9)[:, np.newaxis]
+
+    # The human gesture resampled like the library's templates
+    def humanVector(self, human):
+        at = np.linspace(0, 1, self.count) * human.distanceIndices[-1]
+        row = np.column_stack((np.interp(at, human.distanceIndices,
+                                         human.points[:, 0]),
+                               np.interp(at, human.distanceIndices,
+                                         human.points[:, 1])))
+        return self.vectorize(row[np.newaxis])[0]
+
+    # Rebuilds the template vectors if the library has changed since the
+    # last call (GestureLibrary.extend replaces the packed arrays)
+    def sync(self, library):
+        if library is self.library and library.points is self.libraryPoints:
+            return
+        self.library = library
+        self.libraryPoints = library.points
+        self.vectors = self.vectorize(library.resampled(self.count))
+
+    # The k templates closest to the human gesture, as (indices, angular
+    # distances, rotations), the rotation being the angle which turns the
+    # human gesture onto the template
+    def topK(self, library, human, k=1):
+        self.sync(library)
+        vector = self.humanVector(human)
+        turned = np.column_stack((-vector[1::2], vector[0::2])).ravel()
+        a = self.vectors.dot(vector)
+        b = self.vectors.dot(turned)
+        rotations = np.clip(np.arctan2(b, a), -self.maxRotation,
+                            self.maxRotation)
+        similarities = a * np.cos(rotations) + b * np.sin(rotations)
+        distances = np.arccos(np.clip(similarities, -1, 1))
+        best, distances, rotations = lowestErrors(distances, rotations, k)
+        return best, distances, rotations
+
+    # Whether an angular distance from topK is close enough to be a match
+    def accepts(self, distance):
+        return distance < self.maxDistance
+
+    def close(self):
+        self.library = None
+        self.libraryPoints = None
+        self.vectors = None
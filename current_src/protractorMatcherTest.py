@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+import defaultGesturesLoader
+from gesture import Gesture
+from gestureLibrary import GestureLibrary
+from protractorMatcher import ProtractorMatcher
+
+
+def rotated(points, angle):
+    turn = np.array([[np.cos(angle), -np.sin(angle)],
+                     [np.sin(angle), np.cos(angle)]])
+    return np.asarray(points, np.float64).dot(turn.T)
+
+
+class ProtractorMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.library = GestureLibrary(defaultGesturesLoader.defaultGestures)
+        self.matcher = ProtractorMatcher()
+        # CW Circle: direction and rotation both show in its points
+        self.index = self.library.index("CW Circle")
+        self.points = self.library[self.index].points
+
+    def match(self, points):
+        indices, distances, rotations = self.matcher.topK(
+            self.library, Gesture(points, "human"))
+        return indices[0], distances[0], rotations[0]
+
+    def testTemplatesMatchThemselves(self):
+        for i in xrange(len(self.library)):
+            index, distance, rotation = self.match(self.library[i].points)
+            self.assertEqual(index, i)
+            self.assertAlmostEqual(distance, 0, 3)
+            self.assertTrue(self.matcher.accepts(distance))
+
+    # The rotation returned turns the human gesture back onto the template
+    def testSmallRotation(self):
+        index, distance, rotation = self.match(rotated(self.points, 0.05))
+        self.assertEqual(index, self.index)
+        self.assertAlmostEqual(rotation, -0.05, 2)
+        self.assertTrue(self.matcher.accepts(distance))
+
+    # Beyond maxRotation the rest of the turn counts as distance
+    def testRotationIsBounded(self):
+        index, distance, rotation = self.match(rotated(self.points, 0.4))
+        self.assertAlmostEqual(abs(rotation), self.matcher.maxRotation)
+        self.assertAlmostEqual(distance, 0.3, 2)
+        self.assertFalse(self.matcher.accepts(distance))
+
+    # One scale factor drops out; stretching a single axis does not
+    def testScale(self):
+        distance = self.match(self.points * 0.25)[1]
+        self.assertAlmostEqual(distance, 0, 3)
+        distance = self.match(self.points * (1.0, 2.0))[1]
+        self.assertGreater(distance, 0.1)
+
+    # Templates added to the library are scored too
+    def testLibraryGrows(self):
+        self.match(self.points)
+        self.library.append(Gesture([(0, 0), (40, 5), (10, 60)], "new"))
+        index, distance, rotation = self.match([(0, 0), (40, 5), (10, 60)])
+        self.assertEqual(index, len(self.library) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
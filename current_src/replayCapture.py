@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+import math
+import time
+
+# Stand-in for cv2.VideoCapture which plays back a list of frames in a loop.
+# Pass an instance to GestureProcessor(capture=...) to run the pipeline
+# without a camera, i.e. for benchmarks or replaying recorded sessions. With a
+# frameRate, frames are timestamped as if captured at that rate rather than
+# when they are read.
+class ReplayCapture(object):
+    def __init__(self, frames, loop=True, frameRate=None):
+        self.frames = frames
+        self.loop = loop
+        self.frameRate = frameRate
+        self.index = 0
+        self.framesRead = 0
+        self.readTime = 0.0
+
+    def isOpened(self):
+        return len(self.frames) > 0
+
+    def set(self, prop, value):
+        return False
+
+    def read(self, image=None):
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        self.framesRead += 1
+        self.readTime = time.time()
+        # Mimic OpenCV: write into the given array if it is the right size,
+        # otherwise hand back a new one
+        if image is None or image.shape != frame.shape or \
+           image.dtype != frame.dtype:
+            return True, frame.copy()
+        np.copyto(image, frame)
+        return True, image
+
+    # Capture time of the last frame read, in seconds
+    def timestamp(self):
+        if self.frameRate is None:
+            return self.readTime
+        return (self.framesRead - 1) / float(self.frameRate)
+
+    def release(self):
+        self.index = 0
+
+
+# Hand-like blob (palm and five fingers). Bright by default, since with the
+# dark noisy background of syntheticHandFrames that is the lighting the
+# thresholding currently works best in.
+def drawSyntheticHand(frame, center, palmRadius, angle=0.0, fingers=5,
+                      color=(220, 220, 220)):
+    cx, cy = int(center[0]), int(center[1])
+    cv2.circle(frame, (cx, cy), palmRadius, color, -1)
+    fingerLength = int(palmRadius * 2.2)
+    fingerWidth = max(palmRadius / 3, 2)
+    for i in xrange(fingers):
+        theta = angle - math.pi / 2 + (i - 2) * 0.45
+        tip = (int(cx + fingerLength * math.cos(theta)),
+               int(cy + fingerLength * math.sin(theta)))
+        cv2.line(frame, (cx, cy), tip, color, fingerWidth)
+    return frame
+
+def defaultPath(count):
+    return lambda i: (0.5 + 0.25 * math.cos(2 * math.pi * i / count),
+                      0.5 + 0.25 * math.sin(2 * math.pi * i / count))
+
+# Frames of a synthetic hand following path, a function mapping the frame
+# index to a position scaled to [0, 1] in both directions. Defaults to a
+# slow circle around the center of the image. clutter adds that many bright,
+# randomly colored rectangles which stay in place for the whole sequence.
+def syntheticHandFrames(width=1280, height=720, count=60, path=None,
+                        seed=0, color=(220, 220, 220), clutter=0):
+    if path is None:
+        path = defaultPath(count)
+    rng = np.random.RandomState(seed)
+    palmRadius = max(min(width, height) / 12, 4)
+    background = np.zeros((height, width, 3), np.uint8)
+    for i in xrange(clutter):
+        x, y = rng.randint(0, width), rng.randint(0, height)
+        size = rng.randint(palmRadius / 2, palmRadius * 2, 2)
+        cv2.rectangle(background, (x, y), (x + size[0], y + size[1]),
+                      tuple(int(c) for c in rng.randint(100, 256, 3)), -1)
+    frames = []
+    for i in xrange(count):
+        frame = rng.randint(20, 40, (height, width, 3)).astype(np.uint8)
+        np.maximum(frame, background, out=frame)
+        x, y = path(i)
+        drawSyntheticHand(frame, (x * width, y * height), palmRadius,
+                          color=color)
+        frames.append(frame)
+    return frames
+
+# Ground truth hand masks matching syntheticHandFrames
+def syntheticHandMasks(width=1280, height=720, count=60, path=None):
+    if path is None:
+        path = defaultPath(count)
+    palmRadius = max(min(width, height) / 12, 4)
+    masks = []
+    for i in xrange(count):
+        mask = np.zeros((height, width), np.uint8)
+        x, y = path(i)
+        drawSyntheticHand(mask, (x * width, y * height), palmRadius,
+                          color=255)
+        masks.append(mask)
+    return masks
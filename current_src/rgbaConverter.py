@@ -0,0 +1,23 @@
+import cv2
+from bufferPool import BufferPool
+
+# Resizes and converts BGR or greyscale images to RGBA for display, writing
+# into buffers which are reused every frame (one set per named image). The
+# returned array is overwritten by the next conversion of the same name.
+class RGBAConverter(object):
+    def __init__(self):
+        self.buffers = BufferPool()
+
+    def convert(self, name, image, width, height):
+        if image.shape[:2] != (height, width):
+            resized = self.buffers.get(name + " resized",
+                                       (height, width) + image.shape[2:],
+                                       image.dtype)
+            cv2.resize(image, (width, height), dst=resized)
+            image = resized
+        rgba = self.buffers.get(name, (height, width, 4))
+        if image.ndim == 2:
+            cv2.cvtColor(image, cv2.COLOR_GRAY2RGBA, dst=rgba)
+        else:
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGBA, dst=rgba)
+        return rgba
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+from gestureLibrary import sliceArrays, compareLibrary, lowestErrors
+
+# Classifies against very large gesture libraries on several cores. The
+# packed library arrays are written once to .npy files which every worker of
+# a persistent process pool memory maps, so the templates are shared through
+# the page cache instead of being copied into each worker. A human gesture is
+# scored as one task per shard (a contiguous range of templates); workers
+# return their local top k and the parent merges them. Libraries smaller than
+# minTemplates are scored in the calling process, where the pool would cost
+# more than it saves. Set as GestureProcessor.classifier, and close it (or
+# the processor) when done.
+class ShardedClassifier(object):
+    arrayNames = ["points", "distanceIndices", "distances", "offsets"]
+
+    def __init__(self, processes=None, shardsPerProcess=2, minTemplates=5000):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self.processes = processes
+        self.shardsPerProcess = shardsPerProcess
+        self.minTemplates = minTemplates
+        self.pool = None
+        self.directory = None
+        self.library = None
+        self.libraryPoints = None
+
+    # Writes the library out for the workers if it has changed since the
+    # last call (GestureLibrary.extend replaces the packed arrays)
+    def sync(self, library):
+        if library is self.library and library.points is self.libraryPoints:
+            return
+        self.library = library
+        self.libraryPoints = library.points
+        self.removeFiles()
+        if len(library) < self.minTemplates:
+            return
+        self.directory = tempfile.mkdtemp(prefix="gestures")
+        for name, array in zip(self.arrayNames, library.arrays()):
+            np.save(os.path.join(self.directory, name + ".npy"), array)
+
+    def shards(self):
+        count = min(self.processes * self.shardsPerProcess, len(self.library))
+        bounds = np.linspace(0, len(self.library), count + 1).astype(int)
+        return zip(bounds[:-1], bounds[1:])
+
+    # Same result as GestureLibrary.topK
+    def topK(self, library, human, k=1):
+        self.sync(library)
+        if self.directory is None:
+            return library.topK(human, k)
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes)
+        humanArrays = (human.points, human.distanceIndices, human.distance)
+        tasks = [(self.directory, start, end, humanArrays, k)
+                 for start, end in self.shards()]
+        results = self.pool.map(scoreShard, tasks)
+        indices, errors, totals = [np.concatenate(parts)
+                                   for parts in zip(*results)]
+        best, errors, totals = lowestErrors(errors, totals, k)
+        return indices[best], errors, totals
+
+    def removeFiles(self):
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.removeFiles()
+        self.library = None
+        self.libraryPoints = None
+
+# ---------------------------------- Workers ----------------------------------
+# Run inside the pool processes.
+
+mappedLibrary = {}  # directory -> memory mapped arrays, the latest only
+
+def mapLibrary(directory):
+    if directory not in mappedLibrary:
+        mappedLibrary.clear()
+        mappedLibrary[directory] = tuple(
+            np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+            for name in ShardedClassifier.arrayNames)
+    return mappedLibrary[directory]
+
+def scoreShard(task):
+    directory, start, end, humanArrays, k = task
+    shard = sliceArrays(*(mapLibrary(directory) + (start, end)))
+    errors, totals = compareLibrary(*(shard + humanArrays))
+    best, errors, totals = lowestErrors(errors, totals, k)
+    return best + start, errors, totals
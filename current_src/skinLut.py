@@ -0,0 +1,109 @@
+import sys
+import cv2
+import numpy as np
+from bufferPool import BufferPool
+
+# Segments the hand by color instead of brightness. The BGR cube is quantized
+# into bins x bins x bins cells and a precomputed table says which cells are
+# skin. Every pixel is quantized with one cv2.LUT pass, the three cell
+# coordinates are packed into a single index and the mask is a single take()
+# from the flattened table, followed by a small morphological opening to
+# remove specks. All intermediate images live in reused buffers.
+# Tables are built from labeled frames or from crops of skin, and saved as
+# .npy files (see the command line usage at the bottom).
+# Plug into the processor with gp.segmenter = SkinColorLUT.load(path).
+class SkinColorLUT(object):
+    ranges = [0, 256, 0, 256, 0, 256]
+
+    def __init__(self, table, cleanupSize=5):
+        # bins x bins x bins, 255 for skin and 0 otherwise
+        self.table = np.asarray(table, dtype=np.uint8)
+        self.bins = self.table.shape[0]
+        self.flatTable = self.table.ravel()
+        # Maps a channel value to its bin
+        self.quantizer = (np.arange(256) * self.bins / 256).astype(np.uint8)
+        self.cleanupSize = cleanupSize
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
+                                                (cleanupSize, cleanupSize))
+        self.buffers = BufferPool()
+
+    # Writes the mask for image (or only its roi, a pair of slices) into out,
+    # which must have the image's height and width
+    def segment(self, image, out, roi=None):
+        quantized = self.buffers.like("quantized", image)
+        index = self.buffers.get("index", image.shape[:2], np.int32)
+        if roi is not None:
+            image, out = image[roi], out[roi]
+            quantized, index = quantized[roi], index[roi]
+        cv2.LUT(image, self.quantizer, dst=quantized)
+        np.copyto(index, quantized[..., 0])
+        index *= self.bins
+        index += quantized[..., 1]
+        index *= self.bins
+        index += quantized[..., 2]
+        np.take(self.flatTable, index, out=out)
+        cv2.morphologyEx(out, cv2.MORPH_OPEN, self.kernel, dst=out)
+        return out
+
+# ---------------------------------- Training ---------------------------------
+
+    @staticmethod
+    def histogram(images, masks, bins):
+        hist = np.zeros((bins, bins, bins), np.float32)
+        for image, mask in zip(images, masks):
+            hist += cv2.calcHist([image], [0, 1, 2], mask, [bins] * 3,
+                                 SkinColorLUT.ranges)
+        return hist
+
+    # From frames with masks marking the hand (255) and everything else (0):
+    # a cell is skin when most of the pixels falling into it were skin
+    @staticmethod
+    def fromLabeledFrames(frames, masks, bins=32, minProbability=0.5,
+                          minCount=5):
+        skin = SkinColorLUT.histogram(frames, masks, bins)
+        other = SkinColorLUT.histogram(frames,
+                                       [cv2.bitwise_not(m) for m in masks],
+                                       bins)
+        probability = skin / np.maximum(skin + other, 1)
+        table = (probability > minProbability) & (skin >= minCount)
+        return SkinColorLUT(table * 255)
+
+    # From crops containing only skin (histogram back-projection): the most
+    # common cells which together cover the given fraction of the pixels
+    @staticmethod
+    def fromSamples(samples, bins=32, coverage=0.95):
+        hist = SkinColorLUT.histogram(samples, [None] * len(samples),
+                                      bins).ravel()
+        order = np.argsort(hist)[::-1]
+        cumulative = np.cumsum(hist[order])
+        keep = order[:np.searchsorted(cumulative,
+                                      coverage * cumulative[-1]) + 1]
+        table = np.zeros(bins ** 3, np.uint8)
+        table[keep] = 255
+        return SkinColorLUT(table.reshape(bins, bins, bins))
+
+    def save(self, path):
+        np.save(path, self.table)
+
+    @staticmethod
+    def load(path, cleanupSize=5):
+        return SkinColorLUT(np.load(path), cleanupSize)
+
+
+# Usage:
+#   python skinLut.py labeled table.npy frame.png mask.png [frame mask ...]
+#   python skinLut.py samples table.npy crop.png [crop.png ...]
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] not in ["labeled", "samples"]:
+        print "usage: python skinLut.py labeled table.npy frame mask ..."
+        print "       python skinLut.py samples table.npy crop ..."
+        sys.exit(1)
+    mode, output, files = sys.argv[1], sys.argv[2], sys.argv[3:]
+    if mode == "labeled":
+        frames = [cv2.imread(f) for f in files[0::2]]
+        masks = [cv2.imread(f, 0) for f in files[1::2]]
+        lut = SkinColorLUT.fromLabeledFrames(frames, masks)
+    else:
+        lut = SkinColorLUT.fromSamples([cv2.imread(f) for f in files])
+    lut.save(output)
+    print "Saved", output, "with", int((lut.table > 0).sum()), "skin cells"
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from skinLut import SkinColorLUT
+
+skin, other = (80, 120, 200), (200, 120, 80)
+
+
+# A frame of one color with a block of skin, and the mask of the block
+def labeledFrame():
+    frame = np.empty((60, 80, 3), np.uint8)
+    frame[:] = other
+    frame[10:40, 20:50] = skin
+    mask = np.zeros((60, 80), np.uint8)
+    mask[10:40, 20:50] = 255
+    return frame, mask
+
+
+# The mask as the segmenter's opening leaves it (rounded corners)
+def opened(mask, lut):
+    return cv2.morphologyEx(mask, cv2.MORPH_OPEN, lut.kernel)
+
+
+class SkinColorLUTTest(unittest.TestCase):
+    # Every pixel is looked up in the cell of its quantized color
+    def testSegmentLooksUpCells(self):
+        table = np.zeros((32, 32, 32), np.uint8)
+        table[tuple(np.array(skin) * 32 // 256)] = 255
+        frame, mask = labeledFrame()
+        frame[0, 0] = np.array(skin) + 3  # same cell
+        mask[0, 0] = 255
+        out = np.zeros(mask.shape, np.uint8)
+        SkinColorLUT(table, cleanupSize=1).segment(frame, out)
+        np.testing.assert_array_equal(out, mask)
+
+    def testLearnedFromLabeledFrames(self):
+        frame, mask = labeledFrame()
+        lut = SkinColorLUT.fromLabeledFrames([frame], [mask])
+        out = np.zeros(mask.shape, np.uint8)
+        lut.segment(frame, out)
+        np.testing.assert_array_equal(out, opened(mask, lut))
+
+    def testLearnedFromSamples(self):
+        frame, mask = labeledFrame()
+        lut = SkinColorLUT.fromSamples([frame[10:40, 20:50]])
+        out = np.zeros(mask.shape, np.uint8)
+        lut.segment(frame, out)
+        np.testing.assert_array_equal(out, opened(mask, lut))
+
+    # Specks of skin color are cleaned up
+    def testSpecksRemoved(self):
+        frame, mask = labeledFrame()
+        lut = SkinColorLUT.fromLabeledFrames([frame], [mask])
+        frame[50, 5] = skin
+        out = np.zeros(mask.shape, np.uint8)
+        lut.segment(frame, out)
+        self.assertEqual(out[50, 5], 0)
+
+    # Only the region is written, the rest of out is left alone
+    def testRegion(self):
+        frame, mask = labeledFrame()
+        lut = SkinColorLUT.fromLabeledFrames([frame], [mask])
+        out = np.full(mask.shape, 7, np.uint8)
+        roi = (slice(0, 30), slice(0, 40))
+        lut.segment(frame, out, roi)
+        np.testing.assert_array_equal(out[roi], opened(mask[roi], lut))
+        self.assertTrue((out[30:] == 7).all() and (out[:, 40:] == 7).all())
+
+    def testSaveAndLoad(self):
+        frame, mask = labeledFrame()
+        lut = SkinColorLUT.fromLabeledFrames([frame], [mask])
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "skin.npy")
+            lut.save(path)
+            loaded = SkinColorLUT.load(path)
+        finally:
+            shutil.rmtree(directory)
+        np.testing.assert_array_equal(loaded.table, lut.table)
+
+
+if __name__ == "__main__":
+    unittest.main()
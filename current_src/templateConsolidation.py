@@ -0,0 +1,79 @@
+import sys
+import numpy as np
+from gesture import Gesture
+from gestureLibrary import GestureLibrary
+
+# Shrinks a gesture library by merging near-duplicate samples of each gesture
+# class (the templates sharing a name), so that classification cost stays flat
+# however many samples are recorded. Templates are compared on their
+# resampled points (GestureLibrary.resampled), where the mean squared point
+# distance is compareGestures' total error per point; all pairs of a class
+# come out of one matrix product. Within a class, clusters are merged by
+# complete linkage while every pair in a cluster stays within maxError (an
+# RMS point distance, gestures being scaled to 1024), and beyond that until
+# at most maxPerClass are left. Each cluster is then replaced by its medoid,
+# the sample with the least error to the rest, or by the mean of its samples.
+
+# (n, n) mean squared point distances between the (n, count, 2) rows
+def pairwiseErrors(rows):
+    flat = rows.reshape(len(rows), -1).astype(np.float64)
+    squares = (flat ** 2).sum(1)
+    errors = squares[:, np.newaxis] + squares - 2 * flat.dot(flat.T)
+    return np.maximum(errors, 0) / rows.shape[1]
+
+# Lists of indices into errors, one per cluster
+def cluster(errors, maxError, maxClusters):
+    clusters = [[i] for i in xrange(len(errors))]
+    linkage = errors.copy()  # worst error between two clusters
+    np.fill_diagonal(linkage, np.inf)
+    while len(clusters) > 1:
+        a, b = np.unravel_index(linkage.argmin(), linkage.shape)
+        if linkage[a, b] > maxError ** 2 and len(clusters) <= maxClusters:
+            break
+        a, b = min(a, b), max(a, b)
+        clusters[a] += clusters[b]
+        del clusters[b]
+        merged = np.maximum(linkage[a], linkage[b])
+        linkage[a], linkage[:, a] = merged, merged
+        linkage = np.delete(np.delete(linkage, b, 0), b, 1)
+    return clusters
+
+def consolidate(library, maxPerClass=3, maxError=64.0, method="medoid",
+                count=64):
+    if method not in ["medoid", "mean"]:
+        raise ValueError("Unknown Consolidation Method")
+    rows = library.resampled(count)
+    names = library.names()
+    gestures = []
+    for name in sorted(set(names), key=names.index):
+        indices = np.array(library.indicesOf(name))
+        errors = pairwiseErrors(rows[indices])
+        action = library[indices[0]]._action
+        for members in cluster(errors, maxError, maxPerClass):
+            if method == "mean":
+                gesture = Gesture(rows[indices[members]].mean(0), name)
+            else:
+                spread = errors[np.ix_(members, members)].sum(1)
+                gesture = library[indices[members[spread.argmin()]]]
+            gestures.append(Gesture.fromArrays(gesture.points,
+                                               gesture.distanceIndices,
+                                               gesture.distance, name, action))
+    return GestureLibrary(gestures)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print "usage: python templateConsolidation.py gestureData.txt " + \
+              "[maxPerClass] [maxError] [medoid|mean]"
+        sys.exit(1)
+    path = sys.argv[1]
+    maxPerClass = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    maxError = float(sys.argv[3]) if len(sys.argv) > 3 else 64.0
+    method = sys.argv[4] if len(sys.argv) > 4 else "medoid"
+    library = GestureLibrary.read(path)
+    if library is None:
+        print "No gestures in", path
+        sys.exit(1)
+    consolidated = consolidate(library, maxPerClass, maxError, method)
+    consolidated.write(path)
+    print "Consolidated", len(library), "templates into", len(consolidated)
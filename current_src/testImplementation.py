@@ -1,6 +1,10 @@
 from eventBasedAnimationClass import EventBasedAnimationClass
 from Tkinter import *
 from GesturesApi import GestureProcessor
+from tkDisplay import TkImageDisplay
+from frameScheduler import FrameScheduler
+from frameBus import FrameBus, FrameSubscriber
+from frameTracer import FrameTracer, traceCall
 from PIL import Image, ImageTk
 # Import statements from: 
 # http://stackoverflow.com/questions/16366857/show-webcam-sequence-tkinter
@@ -65,22 +69,29 @@ class Smiley(object):
 class GestureDemo(EventBasedAnimationClass):
     def __init__(self):
         self.gp = GestureProcessor("Gesture_data.txt")  # default to usual file
+        # The images are read back from the processor's frame bus, which a
+        # recorder or debug viewer in another process can subscribe to too
+        self.gp.bus = FrameBus()
+        self.frames = FrameSubscriber(self.gp.bus.directory)
         self.width = 1920
         self.height = 1080
         super(GestureDemo, self).__init__(width=self.width, height=self.height)
         self.timerDelay = 1000 / 30 # 30 FPS
+        # Processes every frame, skips redraws when falling behind
+        self.scheduler = FrameScheduler(deadline=self.timerDelay)
         # self.bindGestures()
-        self.CVHandles = []
         self.bgHandle = None
         self.trackCenter = False
         self.showSmiley = False
         self.showLukas = False
         self.trail = False
+        self.result = None  # what the processor found in the last frame
 
     def initAnimation(self):
         self.smiley = Smiley(self.width * 3 / 4, self.height / 4)
         self.lukas = Smiley(self.width * 3 / 4, self.height / 4,
                             image="lbp.jpg")
+        self.display = TkImageDisplay(self.canvas)
         self.drawBG()
 
     def drawSmiley(self):
@@ -114,28 +125,33 @@ class GestureDemo(EventBasedAnimationClass):
             self.trail = not self.trail
         elif event.char == 'd':
             self.canvas.delete(ALL)
+            self.display.reset()
             self.drawBG()
         elif event.char == 'b':
             self.bindGestures()
+        elif event.char == 't':
+            # First press starts tracing (dumping frames slower than two
+            # timer ticks), the next ones dump the trace so far
+            if self.gp.tracer is None:
+                self.gp.tracer = FrameTracer(slowFrameMs=2 * self.timerDelay)
+            else:
+                print "Trace written to", self.gp.tracer.dump()
         elif event.char == 'q':
             self.onClose()
             exit()
 
     def onTimerFired(self):
-        self.gp.process()
+        self.result = self.gp.process()
         self.updateSmiley()
 
     def updateSmiley(self):
         if self.trackCenter:
-            self.smiley.x = int((self.gp.getScaledCenter()[0] + 1) *
-                                (self.width / 2))
-            self.smiley.y = int((self.gp.getScaledCenter()[1]) *
-                                (self.height / 2))
-            self.smiley.radius = int(self.gp.handDistance) * 2
-            self.lukas.x = int((self.gp.getScaledCenter()[0] + 1) *
-                                (self.width / 2))
-            self.lukas.y = int((self.gp.getScaledCenter()[1]) *
-                                (self.height / 2))
+            center = self.result.scaledCenter
+            self.smiley.x = int((center[0] + 1) * (self.width / 2))
+            self.smiley.y = int(center[1] * (self.height / 2))
+            self.smiley.radius = int(self.result.distance) * 2
+            self.lukas.x = int((center[0] + 1) * (self.width / 2))
+            self.lukas.y = int(center[1] * (self.height / 2))
         if self.trail:
             self.smiley.clearImage = False
             self.lukas.clearImage = False
@@ -145,44 +161,31 @@ class GestureDemo(EventBasedAnimationClass):
 
     # OpenCV Image drawing adapted from:
     # http://stackoverflow.com/questions/16366857/show-webcam-sequence-tkinter
+    # The canvas items are created once by self.display and updated in place,
+    # and only when the bus has a newer image
     def drawCVImages(self):
-        for handle in self.CVHandles:
-            self.canvas.delete(handle)
-        self.CVHandles = []
-
-        cv2image = GestureProcessor.getRGBAFromBGR(self.gp.original,
-                                                   self.width / 2,
-                                                   self.height / 2)
-        self.imagetk = ImageTk.PhotoImage(image=Image.fromarray(cv2image))
-
-        self.gp.draw()
-        cv2image = GestureProcessor.getRGBAFromBGR(self.gp.drawingCanvas,
-                                                   self.width / 2,
-                                                   self.height / 2)
-        self.imagetk2 = ImageTk.PhotoImage(image=Image.fromarray(cv2image))
-
-        cv2image = GestureProcessor.getRGBAFromGray(self.gp.thresholded,
-                                                    self.width / 2,
-                                                    self.height / 2)
-        self.imagetk3 = ImageTk.PhotoImage(image=Image.fromarray(cv2image))
-
-        self.CVHandles.append(self.canvas.create_image(0, 0, image=self.imagetk,
-                              anchor="nw"))
-        self.CVHandles.append(self.canvas.create_image(1920, 1080,
-                              image=self.imagetk2, anchor="se"))
-        self.CVHandles.append(self.canvas.create_image(0, 1080,
-                              image=self.imagetk3, anchor="sw"))
-
-        self.CVHandles.append(self.canvas.create_text(1920, 0,
-                              text=self.gp.lastAction, anchor="ne",
-                              font="15"))
-        self.CVHandles.append(self.canvas.create_text(1920, 20,
-                              text="Distance: " + str(round(
-                                                      self.gp.handDistance, 3)),
-                              anchor="ne", font="15"))
-        self.CVHandles.append(self.canvas.create_text(1920, 40,
-                              text=str(self.gp.getScaledCenter()),
-                              anchor="ne", font="15"))
+        halfWidth, halfHeight = self.width / 2, self.height / 2
+        self.gp.draw(halfWidth, halfHeight)
+        positions = {"original": (0, 0, "nw"),
+                     "canvas": (self.width, self.height, "se"),
+                     "thresholded": (0, self.height, "sw")}
+        for name, (x, y, anchor) in positions.items():
+            frame = self.frames.latest(name)
+            if frame is not None:
+                self.display.showImage(name, frame[2], x, y,
+                                       halfWidth, halfHeight, anchor=anchor)
+
+        self.display.showText("action", self.gp.lastAction, self.width, 0,
+                              anchor="ne", font="15")
+        self.display.showText("distance", "Distance: " +
+                              str(round(self.result.distance, 3)),
+                              self.width, 20, anchor="ne", font="15")
+        self.display.showText("center", str(self.result.scaledCenter),
+                              self.width, 40, anchor="ne", font="15")
+        self.display.showText("fps", "FPS: %.1f (display %.1f), missed: %d" %
+                              (self.scheduler.fps, self.scheduler.displayFps,
+                               self.scheduler.deadlineMisses),
+                              self.width, 60, anchor="ne", font="15")
 
     def drawBG(self):
         self.bgHandle = self.canvas.create_rectangle(self.width/2, 0,
@@ -190,6 +193,9 @@ class GestureDemo(EventBasedAnimationClass):
                                                      fill="white")
 
     def redrawAll(self):
+        traceCall(self.gp.tracer, "redrawAll", "display", self.drawAll)
+
+    def drawAll(self):
         self.drawCVImages()
         if self.showSmiley:
             self.smiley.drawSmiley(self.canvas)
@@ -0,0 +1,48 @@
+from PIL import Image, ImageTk
+from rgbaConverter import RGBAConverter
+
+# Shows OpenCV images and text on a Tkinter canvas without rebuilding anything
+# per frame: the canvas items and PhotoImages are created the first time a
+# name is shown and updated in place afterwards. Images are converted into
+# reused RGBA buffers, wrapped by PIL without copying and pasted into the
+# existing PhotoImage. Text items are only touched when the text changes.
+class TkImageDisplay(object):
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.converter = RGBAConverter()
+        self.images = {}  # name -> [photo, item, (width, height)]
+        self.texts = {}  # name -> [item, text]
+
+    def showImage(self, name, image, x, y, width, height, anchor="nw"):
+        rgba = self.converter.convert(name, image, width, height)
+        frame = Image.frombuffer("RGBA", (width, height), rgba,
+                                 "raw", "RGBA", 0, 1)
+        if name in self.images and self.images[name][2] != (width, height):
+            self.canvas.delete(self.images.pop(name)[1])
+        if name not in self.images:
+            photo = ImageTk.PhotoImage(frame)
+            item = self.canvas.create_image(x, y, image=photo, anchor=anchor)
+            self.images[name] = [photo, item, (width, height)]
+        else:
+            self.images[name][0].paste(frame)
+
+    def showText(self, name, text, x, y, **options):
+        if name not in self.texts:
+            item = self.canvas.create_text(x, y, text=text, **options)
+            self.texts[name] = [item, text]
+        elif self.texts[name][1] != text:
+            self.canvas.itemconfig(self.texts[name][0], text=text)
+            self.texts[name][1] = text
+
+    # Forget the items, i.e. after they were deleted with canvas.delete(ALL);
+    # they are created again the next time they are shown
+    def reset(self):
+        self.images = {}
+        self.texts = {}
+
+    def clear(self):
+        for photo, item, size in self.images.values():
+            self.canvas.delete(item)
+        for item, text in self.texts.values():
+            self.canvas.delete(item)
+        self.reset()